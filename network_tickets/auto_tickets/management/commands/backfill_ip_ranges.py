@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from auto_tickets.models import IPDB, IP_Application, network_range
+
+
+class Command(BaseCommand):
+    help = (
+        'Populate ip_version / net_start / net_end on IPDB and IP_Application '
+        '(run once after the migration that adds the columns; save() keeps them in sync afterwards).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help='Recompute every row, not only rows with no range yet')
+
+    def handle(self, *args, **options):
+        for model in (IPDB, IP_Application):
+            updated = self._backfill(model, options['batch_size'], options['all'])
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {updated} rows updated'))
+
+    def _backfill(self, model, batch_size, recompute_all):
+        queryset = model.objects.order_by('id')
+        if not recompute_all:
+            queryset = queryset.filter(net_start__isnull=True)
+
+        updated = 0
+        batch = []
+        for row in queryset.iterator(chunk_size=batch_size):
+            row.ip_version, row.net_start, row.net_end = network_range(row.network())
+            if row.net_start is None:
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                updated += self._flush(model, batch)
+        if batch:
+            updated += self._flush(model, batch)
+        return updated
+
+    @staticmethod
+    def _flush(model, batch):
+        with transaction.atomic():
+            model.objects.bulk_update(batch, ['ip_version', 'net_start', 'net_end'])
+        count = len(batch)
+        batch.clear()
+        return count
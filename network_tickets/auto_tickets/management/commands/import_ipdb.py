@@ -0,0 +1,118 @@
+from itertools import islice
+
+import openpyxl
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from auto_tickets.models import IPDB, network_range
+from auto_tickets.services import ipdb_index
+from auto_tickets.services.ipdb_index import parse_ipdb_network
+
+DATA_FIELDS = ('mask', 'traffic_oam', 'location', 'device')
+RANGE_FIELDS = ('ip_version', 'net_start', 'net_end')
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+class Command(BaseCommand):
+    help = (
+        'Load the IPDB prefix sheet (columns: ip, mask, traffic oam, location, device) and sync the '
+        'IPDB table to it: new prefixes are inserted, changed ones updated and, unless --keep-missing, '
+        'prefixes no longer in the sheet deleted. Safe to re-run. Running web workers rebuild their IPDB '
+        'lookup index within a second: through the Redis version stamp, or without REDIS_URL by noticing the '
+        'changed table (row count / latest change time).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file_path', help='Path to the .xlsx prefix sheet')
+        parser.add_argument('--sheet', help='Worksheet name (default: active sheet)')
+        parser.add_argument('--min-row', type=int, default=1, help='First data row (default: 1)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--keep-missing', action='store_true', help='Do not delete IPDB rows missing from the sheet')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        try:
+            workbook = openpyxl.load_workbook(options['file_path'], read_only=True, data_only=True)
+        except Exception as e:
+            raise CommandError(f'Cannot open {options["file_path"]}: {e}')
+        try:
+            sheet = workbook[options['sheet']] if options['sheet'] else workbook.active
+            incoming = self._read_sheet(sheet, options['min_row'], chunk_size)
+        finally:
+            workbook.close()
+
+        current = {
+            row[1]: row
+            for row in IPDB.objects.values_list('id', 'ip', *DATA_FIELDS).iterator(chunk_size=chunk_size)
+        }
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for ip, values in incoming.items():
+            existing = current.get(ip)
+            if existing is None:
+                to_create.append(IPDB(ip=ip, **values))
+            elif tuple(values[field] for field in DATA_FIELDS) != tuple(existing[2:]):
+                to_update.append(IPDB(id=existing[0], ip=ip, change_datetime=now, **values))
+        delete_ids = [] if options['keep_missing'] else [row[0] for ip, row in current.items() if ip not in incoming]
+
+        self.stdout.write(
+            f'{len(incoming)} prefixes in sheet: {len(to_create)} new, {len(to_update)} changed, '
+            f'{len(delete_ids)} to delete, {len(incoming) - len(to_create) - len(to_update)} unchanged'
+        )
+        if options['dry_run']:
+            return
+
+        for obj in to_create + to_update:
+            # bulk_create / bulk_update bypass IPDB.save()
+            obj.ip_version, obj.net_start, obj.net_end = network_range(obj.network())
+
+        with transaction.atomic():
+            for start in range(0, len(delete_ids), chunk_size):
+                # A plain DELETE: QuerySet.delete() would send post_delete (an index invalidation) per row.
+                # Nothing references IPDB, so there is no cascade to collect.
+                stale = IPDB.objects.filter(id__in=delete_ids[start:start + chunk_size])
+                stale._raw_delete(stale.db)
+            IPDB.objects.bulk_update(to_update, DATA_FIELDS + RANGE_FIELDS + ('change_datetime',), batch_size=chunk_size)
+            IPDB.objects.bulk_create(to_create, batch_size=chunk_size)
+            if to_create or to_update or delete_ids:
+                # Bulk operations send no post_save / post_delete signals: one index rebuild for the whole load.
+                # This only bumps the Redis stamp; with a per-process cache the web workers see the new
+                # table version instead (ipdb_index.get_ipdb_version), which every write here changes.
+                transaction.on_commit(ipdb_index.invalidate)
+
+        self.stdout.write(self.style.SUCCESS('IPDB import complete'))
+
+    def _read_sheet(self, sheet, min_row, chunk_size):
+        """{ip: {mask, traffic_oam, location, device}} for the valid rows; the first row for an ip wins."""
+        incoming = {}
+        rows = enumerate(sheet.iter_rows(min_row=min_row, max_col=5, values_only=True), start=min_row)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            for row_num, row in chunk:
+                ip, mask, traffic_oam, location, device = (tuple(row) + (None,) * 5)[:5]
+                ip, mask = _text(ip), _text(mask)
+                if not ip and not mask:
+                    continue
+                try:
+                    parse_ipdb_network(ip, mask)
+                except ValueError:
+                    self.stderr.write(f'Row {row_num}: skipped invalid prefix {ip} / {mask}')
+                    continue
+                if ip in incoming:
+                    self.stderr.write(f'Row {row_num}: skipped duplicate prefix {ip}')
+                    continue
+                incoming[ip] = {
+                    'mask': mask,
+                    'traffic_oam': _text(traffic_oam),
+                    'location': _text(location),
+                    'device': _text(device),
+                }
+        return incoming
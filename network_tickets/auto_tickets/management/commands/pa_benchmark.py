@@ -0,0 +1,87 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from auto_tickets.services.pa_sessions import session_pool
+from auto_tickets.services.pa_simulator import PanosSimulator, SimulatorServer, synthetic_workbook
+
+
+def _command_latency(values):
+    latency = {}
+    for value in values or []:
+        prefix, _, seconds = value.rpartition('=')
+        try:
+            latency[prefix.strip()] = float(seconds)
+        except ValueError:
+            raise CommandError(f'--command-latency expects "<command prefix>=<seconds>", got {value!r}')
+    return latency
+
+
+class Command(BaseCommand):
+    help = (
+        'Run auto_tickets_pa_tools against the local PAN-OS simulator with synthetic workbooks '
+        'and report firewall commands and wall time per size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000], help='Workbook sizes to run')
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every simulated command')
+        parser.add_argument(
+            '--command-latency', action='append', metavar='PREFIX=SECONDS',
+            help='Per-command latency, e.g. "test routing fib-lookup=0.3" (repeatable)',
+        )
+        parser.add_argument('--job-seconds', type=float, default=2.0, help='How long validate / commit jobs run')
+        parser.add_argument('--zones', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--rerun', action='store_true', help='Run each workbook a second time on the same firewall')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        from auto_tickets.tools import auto_tickets_pa_tools
+
+        command_latency = _command_latency(options['command_latency'])
+        results = []
+        for rows in options['rows']:
+            simulator = PanosSimulator(zones=options['zones'], job_seconds=options['job_seconds'])
+            with SimulatorServer(simulator, latency=options['latency'], command_latency=command_latency) as server:
+                overrides = override_settings(
+                    PA_FIREWALL_HOST=server.host,
+                    PA_FIREWALL_PORT=server.port,
+                    PA_FIB_SNAPSHOT_DIR='',
+                    PA_ZONE_CACHE_TTL=0,
+                    PA_JOB_POLL_INITIAL=1,
+                )
+                with overrides:
+                    passes = ['first', 'rerun'] if options['rerun'] else ['first']
+                    for name in passes:
+                        wb = synthetic_workbook(rows, zones=options['zones'], seed=options['seed'])
+                        before = simulator.commands.copy()
+                        logins = server.logins
+                        started = time.monotonic()
+                        res_log = auto_tickets_pa_tools(wb, 'benchmark', 'benchmark')
+                        sent = simulator.commands - before
+                        results.append({
+                            'rows': rows,
+                            'pass': name,
+                            'seconds': round(time.monotonic() - started, 2),
+                            'commands': sum(sent.values()),
+                            'logins': server.logins - logins,
+                            'errors': sum(1 for line in res_log if str(line).startswith('ERROR')),
+                            'by_command': dict(sent.most_common()),
+                        })
+                        session_pool.close_all()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=1))
+            return
+        self.stdout.write(f"{'rows':>6} {'pass':>6} {'seconds':>9} {'commands':>9} {'logins':>7} {'errors':>7}")
+        for result in results:
+            self.stdout.write(
+                f"{result['rows']:>6} {result['pass']:>6} {result['seconds']:>9} "
+                f"{result['commands']:>9} {result['logins']:>7} {result['errors']:>7}"
+            )
+        for result in results:
+            top = ', '.join(f'{name}: {count}' for name, count in list(result['by_command'].items())[:8])
+            self.stdout.write(f"{result['rows']} rows ({result['pass']}): {top}")
@@ -0,0 +1,58 @@
+import re
+
+import openpyxl
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_tickets.services.pa_fib import FibSnapshot
+from auto_tickets.services.pa_zones import ZoneResolver
+
+# Same cell splitting as auto_tickets_pa_tools
+_SPLIT_PATTERN = r'[ ,\n、，/]'
+_IPV4_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+
+
+def _cell_ips(value):
+    if value is None:
+        return []
+    return [item.replace('\u200b', '') for item in re.split(_SPLIT_PATTERN, str(value)) if _IPV4_RE.search(item)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay the zone mapping of an auto_tickets_pa workbook against a saved FIB snapshot '
+        '(fib_snapshot_*.json) without connecting to the firewall.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('workbook', help='auto_tickets_pa .xlsx (data from row 4, source IPs in C, destination IPs in E)')
+        parser.add_argument('--snapshot', required=True, help='FIB snapshot JSON written by auto_tickets_pa_tools')
+
+    def handle(self, *args, **options):
+        try:
+            snapshot = FibSnapshot.load(options['snapshot'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read snapshot {options["snapshot"]}: {e}')
+        resolver = ZoneResolver(None, virtual_router=snapshot.virtual_router or None, ttl=0, snapshot=snapshot)
+
+        wb = openpyxl.load_workbook(options['workbook'], read_only=True, data_only=True)
+        try:
+            sheet = wb.active
+            for row_num, row in enumerate(sheet.iter_rows(min_row=4, max_col=7, values_only=True), start=4):
+                row = tuple(row) + (None,) * 7
+                source_zones = self._zones(resolver, row_num, _cell_ips(row[2]))
+                destination_zones = self._zones(resolver, row_num, _cell_ips(row[4]))
+                for sip, s_zone in source_zones.items():
+                    for dip, d_zone in destination_zones.items():
+                        verdict = 'cross-zone' if s_zone != d_zone else 'same zone'
+                        self.stdout.write(f'Row {row_num}: {sip} ({s_zone}) -> {dip} ({d_zone}): {verdict}')
+        finally:
+            wb.close()
+
+    def _zones(self, resolver, row_num, ips):
+        zones = {}
+        for ip in ips:
+            try:
+                zones[ip] = resolver.zone_for(ip)
+            except Exception as e:
+                self.stderr.write(f'Row {row_num}: cannot resolve {ip}: {e}')
+        return zones
@@ -0,0 +1,58 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_tickets.services import eoms_task_queue, shared_cache
+
+logger = logging.getLogger(__name__)
+
+_STALE_CHECK_INTERVAL = 30.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued EOMS ticket creations (api_create_eoms_ticket with EOMS_TASK_QUEUE on) in a bounded pool, '
+        'outside the Gunicorn web workers. Several worker processes can run side by side. Needs REDIS_URL; '
+        'while no worker is running the web processes create tickets in-process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.EOMS_BROWSER_POOL_SIZE or 2,
+            help='Tickets created at once (default: EOMS_BROWSER_POOL_SIZE)',
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between queue polls when idle')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        from auto_tickets.views.multi_split import run_eoms_ticket_task
+
+        if not shared_cache.is_shared():
+            raise CommandError(
+                'run_eoms_ticket_worker needs a cache shared with the web processes (set REDIS_URL): '
+                'queued credentials are handed over through the cache.'
+            )
+        concurrency = max(1, options['concurrency'])
+        running = {}
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='eoms-ticket') as pool:
+            while True:
+                if time.monotonic() - last_stale_check >= _STALE_CHECK_INTERVAL:
+                    last_stale_check = time.monotonic()
+                    eoms_task_queue.worker_heartbeat()
+                    eoms_task_queue.heartbeat(running.values())
+                    eoms_task_queue.requeue_stale()
+                running = {future: tid for future, tid in running.items() if not future.done()}
+                task_id = eoms_task_queue.claim_next() if len(running) < concurrency else None
+                if task_id:
+                    logger.info('EOMS worker: starting task %s', task_id)
+                    running[pool.submit(run_eoms_ticket_task, task_id)] = task_id
+                    continue
+                if options['once'] and not running:
+                    break
+                time.sleep(options['poll_interval'])
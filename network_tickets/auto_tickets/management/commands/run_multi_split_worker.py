@@ -0,0 +1,75 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from auto_tickets.models import MultiSplitJob
+
+logger = logging.getLogger(__name__)
+
+_STALE_CHECK_INTERVAL = 30.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Process queued multi_split uploads (POST multi_split/ with async=1) in a bounded pool, '
+        'outside the Gunicorn web workers. Several worker processes can run side by side.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs processed at once (default: 2)')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between queue polls when idle')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        from auto_tickets.views.multi_split import run_multi_split_job, sweep_multi_split_jobs
+
+        concurrency = max(1, options['concurrency'])
+        running = {}
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='multi-split') as pool:
+            while True:
+                if time.monotonic() - last_stale_check >= _STALE_CHECK_INTERVAL:
+                    last_stale_check = time.monotonic()
+                    self._heartbeat(running.values())
+                    sweep_multi_split_jobs()
+                running = {future: jid for future, jid in running.items() if not future.done()}
+                job_id = self._claim_next() if len(running) < concurrency else None
+                if job_id:
+                    logger.info('multi_split worker: starting job %s', job_id)
+                    running[pool.submit(run_multi_split_job, job_id)] = job_id
+                    continue
+                if options['once'] and not running:
+                    break
+                time.sleep(options['poll_interval'])
+
+    @staticmethod
+    def _claim_next():
+        """Move the oldest queued job to processing; skip_locked lets several workers poll safely."""
+        close_old_connections()
+        with transaction.atomic():
+            job = (
+                MultiSplitJob.objects.select_for_update(skip_locked=True)
+                .filter(status='queued')
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+            MultiSplitJob.objects.filter(pk=job.pk).update(
+                status='processing',
+                attempts=F('attempts') + 1,
+                heartbeat_at=timezone.now(),
+            )
+            return job.job_id
+
+    @staticmethod
+    def _heartbeat(job_ids):
+        """Refresh ``heartbeat_at`` of the jobs this worker is still running (see sweep_multi_split_jobs)."""
+        job_ids = list(job_ids)
+        if job_ids:
+            MultiSplitJob.objects.filter(job_id__in=job_ids, status='processing').update(heartbeat_at=timezone.now())
@@ -1,6 +1,40 @@
+import ipaddress
+
 from django.db import models
 # Create your models here.
 
+# net_start / net_end hold the first / last address of a network as an integer.
+# DECIMAL(39, 0) fits a full IPv6 address, so one column pair covers both
+# families; ip_version keeps IPv4 and IPv4-mapped integers apart.
+_ADDRESS_INT_FIELD = dict(max_digits=39, decimal_places=0, null=True, blank=True, editable=False)
+
+
+def network_range(network):
+    """(ip_version, net_start, net_end) for an ipaddress network, or (None, None, None)."""
+    if network is None:
+        return None, None, None
+    return network.version, int(network.network_address), int(network.broadcast_address)
+
+
+class NetworkRangeQuerySet(models.QuerySet):
+    """Containment / overlap filters on the net_start / net_end columns (one indexed range scan)."""
+
+    def containing(self, address):
+        """Rows whose network contains ``address`` (an ipaddress address or string)."""
+        address = ipaddress.ip_address(address)
+        value = int(address)
+        return self.filter(ip_version=address.version, net_start__lte=value, net_end__gte=value)
+
+    def overlapping(self, network):
+        """Rows whose network overlaps ``network`` (an ipaddress network or CIDR string)."""
+        network = ipaddress.ip_network(network, strict=False)
+        return self.filter(
+            ip_version=network.version,
+            net_start__lte=int(network.broadcast_address),
+            net_end__gte=int(network.network_address),
+        )
+
+
 class IPDB(models.Model):
     
     ip = models.CharField(max_length=100, unique=True, verbose_name='IP')
@@ -17,6 +51,32 @@ class IPDB(models.Model):
 
     device = models.CharField(max_length=100, unique=False, verbose_name='device')
 
+    ip_version = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+
+    net_start = models.DecimalField(**_ADDRESS_INT_FIELD)
+
+    net_end = models.DecimalField(**_ADDRESS_INT_FIELD)
+
+    objects = NetworkRangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ip_version', 'net_start', 'net_end']),
+        ]
+
+    def network(self):
+        """ip/mask as an ipaddress network, or None when the row is not a valid network."""
+        from auto_tickets.services.ipdb_index import parse_ipdb_network
+        try:
+            return parse_ipdb_network(self.ip, self.mask)
+        except ValueError:
+            return None
+
+    def save(self, *args, **kwargs):
+        # Keep the integer range columns in sync with ip / mask
+        self.ip_version, self.net_start, self.net_end = network_range(self.network())
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.__class__.__name__}(ip: {self.ip} | mask: {self.mask})"
 
@@ -51,11 +111,48 @@ class IP_Application(models.Model):
     subnet = models.CharField(max_length=100, unique=True, blank=True, verbose_name='subnet')
     staff_number = models.CharField(max_length=10, null=True, blank=True, verbose_name='staff number')
     create_datetime = models.DateTimeField(auto_now_add=True, verbose_name='create time')
+    ip_version = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    net_start = models.DecimalField(**_ADDRESS_INT_FIELD)
+    net_end = models.DecimalField(**_ADDRESS_INT_FIELD)
+
+    objects = NetworkRangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ip_version', 'net_start', 'net_end']),
+        ]
+
+    def network(self):
+        """subnet as an ipaddress network (host bits ignored), or None when empty / invalid."""
+        try:
+            return ipaddress.ip_network(self.subnet.strip(), strict=False) if self.subnet else None
+        except ValueError:
+            return None
+
+    def save(self, *args, **kwargs):
+        # Keep the integer range columns in sync with subnet
+        self.ip_version, self.net_start, self.net_end = network_range(self.network())
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.__class__.__name__}(location: {self.location} | usage: {self.usage} | number: {self.number} | subnet: {self.subnet} | staff_number: {self.staff_number} | description: {self.description})"
 
 
+class SubnetPool(models.Model):
+    """
+    One row per parent pool (services/subnet_allocator.PARENT_POOLS).
+
+    allocate_subnet locks this row with select_for_update, so allocations
+    from a pool run one at a time even while the pool has no IP_Application
+    rows to lock yet.
+    """
+
+    network = models.CharField(max_length=64, unique=True, verbose_name='parent network')
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(network: {self.network})"
+
+
 class Vendor_VPN(models.Model):
     vendor_name = models.CharField(max_length=100, unique=True, verbose_name='vendor name')
     vendor_openid = models.CharField(max_length=100, unique=True, verbose_name='vendor openid')
@@ -127,13 +224,15 @@ class EomsTicketCreationTask(models.Model):
     Background EOMS ticket creation status (shared across Gunicorn workers via DB).
 
     Used by api_create_eoms_ticket + api_check_ticket_status instead of in-memory dict.
+    With EOMS_TASK_QUEUE on, rows are created 'queued' and run by
+    manage.py run_eoms_ticket_worker (see services/eoms_task_queue.py).
     """
 
     task_id = models.CharField(max_length=64, unique=True, db_index=True)
     status = models.CharField(
         max_length=32,
         default='processing',
-        help_text='processing | completed | error | need_captcha',
+        help_text='queued | processing | completed | error | need_captcha',
     )
     department = models.CharField(max_length=16, blank=True, default='')
     requestor = models.CharField(max_length=255, blank=True, default='')
@@ -148,17 +247,118 @@ class EomsTicketCreationTask(models.Model):
         default='',
         help_text='Playwright storage resume id for CAS SMS second step',
     )
+    file_path = models.CharField(max_length=500, blank=True, default='')
+    session_key = models.CharField(max_length=40, blank=True, default='')
+    department_results = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Combined Cloud+SN task: per-department input (file_path, requestor) and outcome',
+    )
+    workflow_sent = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Departments whose EOMS startWorkflow request was sent; such a task is never run again',
+    )
+    attempts = models.IntegerField(default=0)
+    available_at = models.DateTimeField(null=True, blank=True, help_text='Queued retry not before this time')
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Claimed by a worker; refreshed by its heartbeat while the run is alive',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['-created_at']),
+            models.Index(fields=['status', 'created_at']),
         ]
 
     def __str__(self):
         return f'EomsTicketCreationTask({self.task_id}, {self.status})'
 
+
+class MultiSplitJob(models.Model):
+    """
+    Queued multi_split upload processed outside the web workers (manage.py run_multi_split_worker).
+
+    The worker updates rows_processed / partial_results while it runs and
+    refreshes ``heartbeat_at``, so a job whose worker died is queued again or
+    failed (multi_split.sweep_multi_split_jobs); the final outcome (results,
+    detected departments, generated file paths) is stored in ``result`` and
+    copied into the uploader's session on first poll.
+    """
+
+    job_id = models.CharField(max_length=64, unique=True, db_index=True)
+    status = models.CharField(
+        max_length=32,
+        default='queued',
+        help_text='queued | processing | completed | error',
+    )
+    session_key = models.CharField(max_length=40, blank=True, default='')
+    upload_path = models.CharField(max_length=500)
+    upload_name = models.CharField(max_length=255, blank=True, default='')
+    rows_total = models.IntegerField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    partial_results = models.JSONField(default=list, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    session_applied = models.BooleanField(default=False)
+    error = models.TextField(blank=True, default='')
+    attempts = models.IntegerField(default=0, help_text='Worker runs started (claims)')
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Refreshed by run_multi_split_worker while the job is processing',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'heartbeat_at']),
+        ]
+
+    def __str__(self):
+        return f'MultiSplitJob({self.job_id}, {self.status})'
+
+
+class PaCommitJob(models.Model):
+    """
+    Background validate + commit for an auto_tickets_pa upload (see services/pa_jobs.py).
+
+    The upload request pushes the config, then hands its firewall session
+    to a daemon thread; this row carries the job's progress for
+    api_pa_commit_job_status.  The thread refreshes ``heartbeat_at`` as it
+    goes, so a job whose thread died can be told apart (pa_jobs.fail_stale_jobs).
+    """
+
+    job_id = models.CharField(max_length=64, unique=True, db_index=True)
+    status = models.CharField(
+        max_length=32,
+        default='queued',
+        help_text='queued | validating | committing | completed | error | skipped',
+    )
+    session_key = models.CharField(max_length=40, blank=True, default='')
+    username = models.CharField(max_length=255, blank=True, default='')
+    validate_job_id = models.CharField(max_length=32, blank=True, default='')
+    commit_job_id = models.CharField(max_length=32, blank=True, default='')
+    log = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default='')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text='Last progress from the commit thread')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['status', 'heartbeat_at']),
+        ]
+
+    def __str__(self):
+        return f'PaCommitJob({self.job_id}, {self.status})'
+
 # ---
 
 # To create this table in your MySQL database, run the following Django management commands from your project root:
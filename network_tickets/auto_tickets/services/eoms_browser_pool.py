@@ -0,0 +1,239 @@
+"""
+Warm Chromium pool for the EOMS automation.
+
+Every ``create_ticket`` used to start Playwright, launch a fresh Chromium
+and open a context before it could even load the CAS page; that cold start
+was a large part of the per-ticket latency.  This module keeps up to
+``EOMS_BROWSER_POOL_SIZE`` headless browsers per process, each with one
+pre-created (empty) context waiting, and leases one browser per task:
+
+    lease = await pool.acquire(storage_state=cached_ss)
+    ...lease.context...
+    await lease.release()
+
+A browser is closed instead of being returned after
+``EOMS_BROWSER_MAX_USES`` leases, when it has disconnected (crash) or when
+the caller releases it with ``discard=True``; the next lease launches a new
+one.  After a normal release the used context is closed and a new spare
+context is created, so the next lease with no storage state gets a ready one.
+
+Playwright objects belong to the event loop that created them, while the
+callers run ``asyncio.run`` per task.  The pool therefore lives on one
+long-lived loop thread: :func:`run_sync` runs a coroutine there, and
+:func:`get_pool` only returns the pool to code running on that loop (any
+other caller gets ``None`` and launches its own browser as before).
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_OPTIONS = {
+    'ignore_https_errors': True,
+    'viewport': {'width': 1280, 'height': 800},
+}
+
+
+class BrowserPoolTimeout(Exception):
+    """No pooled browser became free within the acquire timeout."""
+
+
+class _PooledBrowser:
+    __slots__ = ('browser', 'uses', 'spare')
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.spare = None
+
+
+def _is_connected(browser):
+    try:
+        return browser.is_connected()
+    except Exception:
+        return False
+
+
+async def _quietly(awaitable):
+    try:
+        await awaitable
+    except Exception:
+        logger.debug('EOMS browser pool: close failed', exc_info=True)
+
+
+class BrowserLease:
+    """One leased browser and the context handed out with it."""
+
+    def __init__(self, pool, entry, context):
+        self._pool = pool
+        self._entry = entry
+        self.browser = entry.browser
+        self.context = context
+        self._released = False
+
+    async def release(self, discard=False):
+        """Close the context and give the browser back (``discard=True`` closes the browser too)."""
+        if self._released:
+            return
+        self._released = True
+        await self._pool._release(self._entry, self.context, discard)
+
+
+class BrowserPool:
+    """
+    At most ``size`` browsers, each leased to one task at a time.
+
+    ``launch`` is an async callable returning a Playwright ``Browser``.
+    """
+
+    def __init__(self, launch, size=2, max_uses=50, acquire_timeout=300, context_options=None):
+        self._launch = launch
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self.acquire_timeout = acquire_timeout
+        self.context_options = dict(CONTEXT_OPTIONS if context_options is None else context_options)
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.size)
+        self.launches = 0
+
+    async def _new_context(self, browser, storage_state=None):
+        options = dict(self.context_options)
+        if storage_state:
+            options['storage_state'] = storage_state
+        return await browser.new_context(**options)
+
+    async def _checkout(self):
+        while self._idle:
+            entry = self._idle.pop()
+            if _is_connected(entry.browser):
+                return entry
+            logger.warning('EOMS browser pool: dropping disconnected browser after %s uses', entry.uses)
+            await _quietly(entry.browser.close())
+        entry = _PooledBrowser(await self._launch())
+        self.launches += 1
+        return entry
+
+    async def acquire(self, storage_state=None):
+        """Lease a browser; the context is the warm spare unless ``storage_state`` is given."""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolTimeout(f'no EOMS browser free after {self.acquire_timeout}s') from None
+        try:
+            entry = await self._checkout()
+            context = None
+            if not storage_state and entry.spare is not None:
+                context, entry.spare = entry.spare, None
+            if context is None:
+                context = await self._new_context(entry.browser, storage_state)
+        except BaseException:
+            self._slots.release()
+            raise
+        return BrowserLease(self, entry, context)
+
+    async def _release(self, entry, context, discard):
+        try:
+            await _quietly(context.close())
+            entry.uses += 1
+            if discard or entry.uses >= self.max_uses or not _is_connected(entry.browser):
+                await self._retire(entry)
+                return
+            if entry.spare is None:
+                try:
+                    entry.spare = await self._new_context(entry.browser)
+                except Exception:
+                    logger.warning('EOMS browser pool: could not pre-create a context, retiring browser', exc_info=True)
+                    await self._retire(entry)
+                    return
+            self._idle.append(entry)
+        finally:
+            self._slots.release()
+
+    async def _retire(self, entry):
+        if entry.spare is not None:
+            await _quietly(entry.spare.close())
+            entry.spare = None
+        await _quietly(entry.browser.close())
+
+    async def close_all(self):
+        """Close every idle browser (leased ones are closed when released)."""
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            await self._retire(entry)
+
+
+_lock = threading.Lock()
+_loop = None
+_pool = None
+_playwright = None
+
+
+def _pool_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='eoms-browser-pool', daemon=True).start()
+            _loop = loop
+            atexit.register(shutdown)
+        return _loop
+
+
+async def _launch_chromium():
+    global _playwright
+    if _playwright is None:
+        from playwright.async_api import async_playwright
+
+        _playwright = await async_playwright().start()
+    return await _playwright.chromium.launch(headless=True)
+
+
+def run_sync(coro, timeout=None):
+    """Run ``coro`` on the pool's loop thread and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _pool_loop()).result(timeout)
+
+
+def get_pool():
+    """The process pool when called on the pool loop (and pooling is on); otherwise ``None``."""
+    global _pool
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    if running is not _loop or settings.EOMS_BROWSER_POOL_SIZE <= 0:
+        return None
+    if _pool is None:
+        _pool = BrowserPool(
+            _launch_chromium,
+            size=settings.EOMS_BROWSER_POOL_SIZE,
+            max_uses=settings.EOMS_BROWSER_MAX_USES,
+            acquire_timeout=settings.EOMS_BROWSER_ACQUIRE_TIMEOUT,
+        )
+    return _pool
+
+
+async def _shutdown():
+    global _pool, _playwright
+    if _pool is not None:
+        await _pool.close_all()
+        _pool = None
+    if _playwright is not None:
+        await _quietly(_playwright.stop())
+        _playwright = None
+
+
+def shutdown():
+    """Close the pooled browsers and stop Playwright (registered at exit)."""
+    loop = _loop
+    if loop is None or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(30)
+    except Exception:
+        logger.warning('EOMS browser pool: shutdown failed', exc_info=True)
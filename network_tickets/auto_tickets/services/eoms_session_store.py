@@ -0,0 +1,246 @@
+"""
+Shared EOMS (CAS) session state in the Django cache (or host-wide files without one).
+
+The EOMS automation used to keep each user's Playwright storage state and
+``def_id`` in JSON files under the temp dir (checked by mtime), and the
+SMS-step resume state in ``eoms_cas_resume_<token>.json``.  Those files
+were local to one host, so every Gunicorn worker / app node logged in to
+CAS on its own and could trigger another SMS / captcha.
+
+Everything now lives in the default cache when it is shared between
+processes (Redis when ``REDIS_URL`` is set).  Without one, the per-process
+``LocMemCache`` would make every Gunicorn worker log in on its own and break
+an SMS second step served by another worker, so the same entries are kept
+as JSON files in ``EOMS_SESSION_DIR`` instead (:class:`FileStore`, shared
+by every process on the host, as the old temp-dir files were):
+
+* ``eoms:session:<user>`` - storage state, ``def_id``, replay headers and a
+  ``login_id``, kept for ``EOMS_SESSION_TTL`` seconds;
+* ``eoms:resume:<token>`` - storage state between the two SMS steps,
+  ``EOMS_RESUME_TTL`` seconds;
+* :func:`login_lock` - per-user single-flight lock (``cache.add``) so only
+  one worker performs a CAS login at a time; the others wait and re-check
+  the cache;
+* :func:`needs_refresh` / :func:`claim_refresh` - once a session is older
+  than ``EOMS_SESSION_REFRESH_AFTER`` the next user of it refreshes it
+  (one worker at a time) before it expires.
+
+Cache errors are logged and treated as a miss, so EOMS creation degrades to
+logging in every time rather than failing.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from auto_tickets.services import shared_cache
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = 'eoms'
+
+
+class FileStore:
+    """
+    The cache calls this module uses (get / set / add / delete), on JSON files in ``directory``.
+
+    Files are written atomically (temp file + rename) with mode 0600, since
+    they hold CAS cookies; ``add`` creates its file with ``O_EXCL`` so the
+    login lock stays single-flight across processes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _entry(self, value, timeout):
+        return json.dumps({'value': value, 'expires': time.time() + timeout})
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires'] <= time.time():
+            self.delete(key)
+            return None
+        return entry['value']
+
+    def set(self, key, value, timeout):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self._entry(value, timeout))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def add(self, key, value, timeout):
+        if self.get(key) is not None:
+            return False
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(self._path(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(self._entry(value, timeout))
+        return True
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _store():
+    """The shared cache, or the host-wide :class:`FileStore` when the cache is per-process."""
+    if shared_cache.is_shared():
+        return cache
+    return FileStore(settings.EOMS_SESSION_DIR)
+
+
+def _user_key(kind, username):
+    return f"{_PREFIX}:{kind}:{re.sub(r'[^a-zA-Z0-9]', '_', (username or '').lower())}"
+
+
+def load_session(username):
+    """Cached session dict (storage_state, def_id, headers, login_id, saved_at) or ``None``."""
+    try:
+        entry = _store().get(_user_key('session', username))
+    except Exception:
+        logger.warning('EOMS session store: cache read failed', exc_info=True)
+        return None
+    if not entry or not entry.get('storage_state'):
+        return None
+    return entry
+
+
+def save_session(username, storage_state, def_id, headers=None, login_id=None):
+    """Store a logged-in session for every worker; ``login_id`` is kept across refreshes."""
+    entry = {
+        'storage_state': storage_state,
+        'def_id': def_id,
+        'headers': dict(headers or {}),
+        'login_id': login_id or uuid.uuid4().hex,
+        'saved_at': time.time(),
+    }
+    try:
+        _store().set(_user_key('session', username), entry, settings.EOMS_SESSION_TTL)
+    except Exception:
+        logger.warning('EOMS session store: cache write failed', exc_info=True)
+        return None
+    return entry
+
+
+def invalidate_session(username):
+    try:
+        _store().delete(_user_key('session', username))
+    except Exception:
+        logger.warning('EOMS session store: cache delete failed', exc_info=True)
+
+
+def session_age(entry):
+    return time.time() - float(entry.get('saved_at') or 0)
+
+
+def needs_refresh(entry):
+    """True once the session is old enough to be refreshed before it expires."""
+    return session_age(entry) >= settings.EOMS_SESSION_REFRESH_AFTER
+
+
+def claim_refresh(username):
+    """Non-blocking: True for the one caller that should refresh this user's session now."""
+    try:
+        return bool(_store().add(_user_key('refresh', username), True, settings.EOMS_LOGIN_LOCK_TIMEOUT))
+    except Exception:
+        return False
+
+
+def release_refresh(username):
+    try:
+        _store().delete(_user_key('refresh', username))
+    except Exception:
+        pass
+
+
+def save_resume_state(token, storage_state):
+    """Keep the half-finished CAS login for the SMS second step; False when the cache is unavailable."""
+    try:
+        _store().set(f'{_PREFIX}:resume:{token}', storage_state, settings.EOMS_RESUME_TTL)
+        return True
+    except Exception:
+        logger.warning('EOMS session store: could not save resume state', exc_info=True)
+        return False
+
+
+def load_resume_state(token):
+    try:
+        return _store().get(f'{_PREFIX}:resume:{token}')
+    except Exception:
+        logger.warning('EOMS session store: cache read failed', exc_info=True)
+        return None
+
+
+def delete_resume_state(token):
+    try:
+        _store().delete(f'{_PREFIX}:resume:{token}')
+    except Exception:
+        pass
+
+
+@asynccontextmanager
+async def login_lock(username, wait=None, poll_interval=1.0):
+    """
+    Hold the per-user login lock while performing a CAS login.
+
+    Waits up to ``wait`` seconds (default ``EOMS_LOGIN_LOCK_WAIT``) for
+    another worker's login to finish; yields ``True`` when the lock was
+    taken and ``False`` when it timed out (the caller logs in anyway).
+    Callers should re-check :func:`load_session` after entering.
+    """
+    key = _user_key('login', username)
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + (settings.EOMS_LOGIN_LOCK_WAIT if wait is None else wait)
+    acquired = False
+    while True:
+        try:
+            acquired = bool(_store().add(key, owner, settings.EOMS_LOGIN_LOCK_TIMEOUT))
+        except Exception:
+            logger.warning('EOMS session store: login lock unavailable', exc_info=True)
+            break
+        if acquired or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(poll_interval)
+    if not acquired:
+        logger.info('EOMS login lock for %s not acquired, logging in without it', username)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                if _store().get(key) == owner:
+                    _store().delete(key)
+            except Exception:
+                pass
@@ -0,0 +1,315 @@
+"""
+DB-backed queue for EOMS ticket creation (``EomsTicketCreationTask``).
+
+``api_create_eoms_ticket`` used to start one daemon thread per request
+inside the web worker: nothing bounded how many browsers ran at once and a
+worker restart lost the work in progress.  When :func:`enabled`, the view
+only inserts a ``queued`` row and ``manage.py run_eoms_ticket_worker`` runs
+the tasks with a fixed concurrency.  That needs all three of:
+``EOMS_TASK_QUEUE`` on, a shared cache (Redis: the worker reads the
+credentials the web process stored) and a running worker (it keeps a
+heartbeat in the cache); otherwise the view keeps its in-process thread.
+In the worker:
+
+* :func:`claim_next` moves the oldest due row to ``processing``
+  (``select_for_update(skip_locked=True)``, so several worker processes can
+  poll the same table);
+* creating a ticket is not idempotent, so the runner records each
+  department in ``workflow_sent`` (:func:`mark_workflow_sent`) before its
+  startWorkflow request goes out, and a task with anything recorded there
+  is never run again;
+* a task whose run raised before that point is re-queued with exponential
+  backoff (:func:`schedule_retry`) up to ``EOMS_TASK_MAX_ATTEMPTS`` runs;
+  EOMS answers (login refused, captcha, business errors) are final;
+* the worker refreshes ``started_at`` of its running tasks
+  (:func:`heartbeat`); :func:`requeue_stale` hands back rows whose
+  heartbeat stopped (the worker died) or fails them when a startWorkflow
+  may already have been sent.
+
+Every status write goes through :func:`update_task`, which also bumps a
+per-task version in the cache (``eoms:task_version:<id>``).
+``api_check_ticket_status`` (an async view) long-polls on that version
+(:func:`wait_for_change`) instead of the page re-reading the row every two
+seconds.  Versions only exist with a shared cache: with a per-process one
+the task may be updated by another worker than the one holding the poll.
+
+The EOMS password never goes into the table: the credentials are kept in the
+cache under the task id (``EOMS_TASK_CREDENTIALS_TTL``) and removed once the
+task is finished.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from auto_tickets.services import shared_cache
+
+logger = logging.getLogger(__name__)
+
+_WORKER_KEY = 'eoms:task_worker'
+_WORKER_TTL = 60
+
+_CREDENTIAL_FIELDS = ('username', 'password', 'captcha_code', 'resume_token')
+
+
+def worker_heartbeat():
+    """Called by run_eoms_ticket_worker while it polls: tells the web processes a worker is up."""
+    try:
+        cache.set(_WORKER_KEY, timezone.now().isoformat(), _WORKER_TTL)
+    except Exception:
+        logger.warning('EOMS task queue: could not write worker heartbeat', exc_info=True)
+
+
+def worker_alive():
+    try:
+        return cache.get(_WORKER_KEY) is not None
+    except Exception:
+        return False
+
+
+def enabled():
+    """Whether api_create_eoms_ticket should queue (True) or run the task in a thread (False)."""
+    if not settings.EOMS_TASK_QUEUE:
+        return False
+    if not shared_cache.is_shared():
+        logger.warning('EOMS_TASK_QUEUE is on but the cache is not shared between processes (set REDIS_URL)')
+        return False
+    if not worker_alive():
+        logger.warning('EOMS_TASK_QUEUE is on but no run_eoms_ticket_worker heartbeat was seen')
+        return False
+    return True
+
+
+def _credentials_key(task_id):
+    return f'eoms:task_credentials:{task_id}'
+
+
+def store_credentials(task_id, **credentials):
+    """Keep the task's login data for the worker; False when the cache is unavailable."""
+    try:
+        cache.set(
+            _credentials_key(task_id),
+            {field: credentials.get(field) or '' for field in _CREDENTIAL_FIELDS},
+            settings.EOMS_TASK_CREDENTIALS_TTL,
+        )
+        return True
+    except Exception:
+        logger.warning('EOMS task queue: could not store credentials', exc_info=True)
+        return False
+
+
+def load_credentials(task_id):
+    try:
+        return cache.get(_credentials_key(task_id))
+    except Exception:
+        logger.warning('EOMS task queue: could not read credentials', exc_info=True)
+        return None
+
+
+def clear_credentials(task_id):
+    try:
+        cache.delete(_credentials_key(task_id))
+    except Exception:
+        pass
+
+
+def _version_key(task_id):
+    return f'eoms:task_version:{task_id}'
+
+
+def status_version(task_id):
+    """Current status version of a task (``None`` when unknown or the cache is not shared / unavailable)."""
+    if not shared_cache.is_shared():
+        return None
+    try:
+        return cache.get(_version_key(task_id))
+    except Exception:
+        return None
+
+
+def bump_version(task_id):
+    if not shared_cache.is_shared():
+        return
+    try:
+        cache.set(_version_key(task_id), uuid.uuid4().hex[:12], settings.EOMS_TASK_CREDENTIALS_TTL)
+    except Exception:
+        logger.warning('EOMS task queue: could not bump status version', exc_info=True)
+
+
+def update_task(task_id, **fields):
+    """Update one task row and wake up its long-polling status requests."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    updated = EomsTicketCreationTask.objects.filter(task_id=task_id).update(**fields)
+    bump_version(task_id)
+    return updated
+
+
+async def wait_for_change(task_id, since, timeout, poll_interval=None):
+    """
+    Wait up to ``timeout`` seconds until the task's version differs from ``since``.
+
+    Only the cache is read while waiting (``cache.aget``, without holding a
+    thread), the caller reads the row once afterwards.  Returns the current
+    version; returns ``None`` at once when the cache is not shared or is
+    unavailable (the page then falls back to its plain poll delay).
+    """
+    if not shared_cache.is_shared():
+        return None
+    poll_interval = settings.EOMS_STATUS_POLL_INTERVAL if poll_interval is None else poll_interval
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            version = await cache.aget(_version_key(task_id))
+        except Exception:
+            return None
+        if version != since or time.monotonic() + poll_interval > deadline:
+            return version
+        await asyncio.sleep(poll_interval)
+
+
+def retry_delay(attempts):
+    """Seconds before run number ``attempts + 1``: EOMS_TASK_RETRY_DELAY doubled per failed run."""
+    return settings.EOMS_TASK_RETRY_DELAY * (2 ** max(attempts - 1, 0))
+
+
+def enqueue(task_id, department, requestor, file_path, session_key, department_results=None, **credentials):
+    """Insert a queued task row; ``None`` (nothing created) when the credentials cannot be stored."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    if not store_credentials(task_id, **credentials):
+        return None
+    task = EomsTicketCreationTask.objects.create(
+        task_id=task_id,
+        status='queued',
+        department=department,
+        requestor=requestor or '',
+        file_path=file_path,
+        session_key=session_key or '',
+        department_results=department_results or {},
+    )
+    bump_version(task_id)
+    return task
+
+
+def claim_next():
+    """Move the oldest due queued task to processing and return its task_id (or ``None``)."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    close_old_connections()
+    now = timezone.now()
+    with transaction.atomic():
+        task = (
+            EomsTicketCreationTask.objects.select_for_update(skip_locked=True)
+            .filter(status='queued')
+            .filter(Q(available_at__isnull=True) | Q(available_at__lte=now))
+            .order_by('created_at')
+            .first()
+        )
+        if task is None:
+            return None
+        EomsTicketCreationTask.objects.filter(pk=task.pk).update(
+            status='processing',
+            attempts=task.attempts + 1,
+            started_at=now,
+        )
+    bump_version(task.task_id)
+    return task.task_id
+
+
+def mark_workflow_sent(task_id, department):
+    """Record, before the request goes out, that ``department``'s startWorkflow is being sent."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    with transaction.atomic():
+        task = EomsTicketCreationTask.objects.select_for_update().only('workflow_sent').get(task_id=task_id)
+        if department not in task.workflow_sent:
+            task.workflow_sent = [*task.workflow_sent, department]
+            task.save(update_fields=['workflow_sent'])
+
+
+def workflow_was_sent(task_id):
+    from auto_tickets.models import EomsTicketCreationTask
+
+    return bool(
+        EomsTicketCreationTask.objects.filter(task_id=task_id).values_list('workflow_sent', flat=True).first()
+    )
+
+
+def heartbeat(task_ids):
+    """Refresh ``started_at`` of tasks this worker is still running (see :func:`requeue_stale`)."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    if task_ids:
+        EomsTicketCreationTask.objects.filter(task_id__in=list(task_ids), status='processing').update(
+            started_at=timezone.now(),
+        )
+
+
+def schedule_retry(task_id, error):
+    """Re-queue a task whose run raised; False when out of attempts or a startWorkflow was already sent."""
+    from auto_tickets.models import EomsTicketCreationTask
+
+    task = EomsTicketCreationTask.objects.filter(task_id=task_id).only('attempts', 'workflow_sent').first()
+    if task is None or task.attempts >= settings.EOMS_TASK_MAX_ATTEMPTS:
+        return False
+    if task.workflow_sent:
+        logger.warning('EOMS task %s failed after startWorkflow was sent, not retrying: %s', task_id, error)
+        return False
+    delay = retry_delay(task.attempts)
+    logger.warning('EOMS task %s failed (attempt %s), retrying in %ss: %s', task_id, task.attempts, delay, error)
+    update_task(
+        task_id,
+        status='queued',
+        available_at=timezone.now() + timedelta(seconds=delay),
+        error=str(error),
+    )
+    return True
+
+
+def requeue_stale():
+    """
+    Handle queued-path tasks whose worker heartbeat stopped; returns the count.
+
+    A task is only re-queued when no startWorkflow was sent and it has
+    attempts left; otherwise it fails with a "check EOMS" message, since
+    the ticket may already exist.
+    """
+    from auto_tickets.models import EomsTicketCreationTask
+
+    cutoff = timezone.now() - timedelta(seconds=settings.EOMS_TASK_STALE_AFTER)
+    stale = list(
+        EomsTicketCreationTask.objects.filter(status='processing', started_at__lt=cutoff)
+        .only('task_id', 'attempts', 'workflow_sent')
+    )
+    if not stale:
+        return 0
+    retry_ids = [
+        task.task_id for task in stale
+        if not task.workflow_sent and task.attempts < settings.EOMS_TASK_MAX_ATTEMPTS
+    ]
+    fail_ids = [task.task_id for task in stale if task.task_id not in retry_ids]
+    stale_ids = retry_ids + fail_ids
+    failed = EomsTicketCreationTask.objects.filter(task_id__in=fail_ids, status='processing').update(
+        status='error',
+        success=False,
+        error='The EOMS worker stopped while creating this ticket. Check EOMS before submitting again.',
+    )
+    requeued = EomsTicketCreationTask.objects.filter(task_id__in=retry_ids, status='processing').update(
+        status='queued',
+        available_at=None,
+    )
+    for task_id in stale_ids:
+        bump_version(task_id)
+    if failed or requeued:
+        logger.warning('EOMS task queue: %s stale tasks re-queued, %s failed', requeued, failed)
+    return failed + requeued
@@ -0,0 +1,323 @@
+"""
+In-memory longest-prefix-match index over the IPDB table.
+
+``get_location`` / ``get_device`` used to read every IPDB row, rebuild the
+``ip_network`` objects and scan them for each IP.  The index is built once
+per process and keeps, per IP version, one dict per prefix length
+(network int -> record), so an address lookup is at most one dict probe per
+distinct prefix length.
+
+Invalidation: ``post_save`` / ``post_delete`` on IPDB (see ``signals.py``)
+call :func:`invalidate`, which drops the local index and, with a shared
+cache (Redis), bumps a version stamp there so other Gunicorn workers rebuild
+on their next lookup.  With the per-process LocMemCache fallback that stamp
+would never leave the process, so the version is read from the table itself
+instead (row count, highest id, latest ``change_datetime``), which also
+catches bulk writes that send no signals (``manage.py import_ipdb``).
+Either version is re-checked at most every ``_VERSION_CHECK_INTERVAL``
+seconds.
+
+Batches (:func:`lookup_many`) are resolved with one ``numpy.searchsorted``
+over a flattened table of disjoint IPv4 intervals, each labelled with its
+longest-prefix record.  Without numpy, or for subnets / IPv6 inputs, the
+per-item dict lookup is used instead.
+"""
+from __future__ import annotations
+
+import bisect
+import ipaddress
+import logging
+import threading
+import time
+import uuid
+from typing import Iterable, NamedTuple
+
+from django.core.cache import cache
+
+from auto_tickets.services import shared_cache
+
+try:
+    import numpy as np
+except ImportError:  # optional: lookup_many falls back to per-item lookups
+    np = None
+
+logger = logging.getLogger(__name__)
+
+IPDB_VERSION_CACHE_KEY = 'auto_tickets:ipdb_version'
+_VERSION_CHECK_INTERVAL = 1.0
+
+
+class IPDBRecord(NamedTuple):
+    """Immutable snapshot of one IPDB row, as held by the index."""
+
+    id: int
+    ip: str
+    mask: str
+    traffic_oam: str
+    location: str
+    device: str
+    network: ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_ipdb_network(ip, mask):
+    """
+    Build the network for an IPDB ``ip`` / ``mask`` pair.
+
+    Same rules as the original scan: spaces in the mask are ignored and rows
+    with host bits set are rejected (``ValueError``).
+    """
+    return ipaddress.ip_network(f"{ip}/{str(mask).replace(' ', '')}")
+
+
+def clean_ip_input(ip_input):
+    """Strip zero-width spaces / whitespace from a user-supplied IP or subnet."""
+    if not ip_input:
+        return ''
+    return str(ip_input).replace('\u200b', '').strip()
+
+
+class IPDBIndex:
+    """
+    Longest-prefix-match table built from IPDB records.
+
+    ``_by_len[version]`` maps prefix length -> {network int: record};
+    ``_lengths[version]`` lists the present prefix lengths, longest first;
+    ``_starts`` / ``_sorted`` keep the networks sorted by start address for
+    "which IPDB networks sit inside this subnet" queries.
+    """
+
+    def __init__(self, records: Iterable[IPDBRecord] = ()):
+        self._by_len = {4: {}, 6: {}}
+        self._lengths = {4: [], 6: []}
+        self._sorted = {4: [], 6: []}
+        self._starts = {4: [], 6: []}
+        self._intervals = None
+        self.size = 0
+        for record in records:
+            self._add(record)
+        for version in (4, 6):
+            self._lengths[version] = sorted(self._by_len[version], reverse=True)
+            self._sorted[version].sort(key=lambda r: (int(r.network.network_address), r.network.prefixlen, r.id))
+            self._starts[version] = [int(r.network.network_address) for r in self._sorted[version]]
+
+    def _add(self, record):
+        net = record.network
+        bucket = self._by_len[net.version].setdefault(net.prefixlen, {})
+        key = int(net.network_address)
+        # Duplicate prefixes: records arrive in id order, so the oldest row wins
+        # like the original table scan.
+        if key in bucket:
+            return
+        bucket[key] = record
+        self._sorted[net.version].append(record)
+        self.size += 1
+
+    def longest_match(self, address):
+        """Most specific record whose network contains ``address`` (or ``None``)."""
+        version = address.version
+        value = int(address)
+        max_len = address.max_prefixlen
+        by_len = self._by_len[version]
+        for prefixlen in self._lengths[version]:
+            key = (value >> (max_len - prefixlen)) << (max_len - prefixlen) if prefixlen else 0
+            record = by_len[prefixlen].get(key)
+            if record is not None:
+                return record
+        return None
+
+    def lookup_network(self, network):
+        """
+        Record for a subnet query.
+
+        Prefers the most specific IPDB network containing ``network``; otherwise
+        the first (lowest address) IPDB network that sits inside it.
+        """
+        version = network.version
+        start = int(network.network_address)
+        max_len = network.max_prefixlen
+        by_len = self._by_len[version]
+        for prefixlen in self._lengths[version]:
+            if prefixlen > network.prefixlen:
+                continue
+            key = (start >> (max_len - prefixlen)) << (max_len - prefixlen) if prefixlen else 0
+            record = by_len[prefixlen].get(key)
+            if record is not None:
+                return record
+
+        end = int(network.broadcast_address)
+        starts = self._starts[version]
+        ordered = self._sorted[version]
+        pos = bisect.bisect_left(starts, start)
+        while pos < len(starts) and starts[pos] <= end:
+            record = ordered[pos]
+            if record.network.prefixlen >= network.prefixlen:
+                return record
+            pos += 1
+        return None
+
+    def _interval_table(self):
+        """
+        (boundaries, record positions, records) for the IPv4 networks, built on first use.
+
+        Every start / end+1 address is a boundary; the span between two
+        consecutive boundaries has a single longest-prefix owner (``-1`` = gap).
+        """
+        if self._intervals is None:
+            records = self._sorted[4]
+            edges = set()
+            for record in records:
+                edges.add(int(record.network.network_address))
+                edges.add(int(record.network.broadcast_address) + 1)
+            boundaries = sorted(edges)
+            positions = {id(record): pos for pos, record in enumerate(records)}
+            owners = []
+            for edge in boundaries:
+                owner = self.longest_match(ipaddress.IPv4Address(edge)) if edge <= 0xFFFFFFFF else None
+                owners.append(positions[id(owner)] if owner is not None else -1)
+            self._intervals = (
+                np.array(boundaries, dtype=np.int64),
+                np.array(owners, dtype=np.int64),
+                records,
+            )
+        return self._intervals
+
+    def lookup_many(self, ip_inputs):
+        """
+        Records for a batch of IP / CIDR strings, in input order (``None`` when not covered).
+
+        Plain IPv4 addresses go through one vectorized interval search; subnets
+        and IPv6 addresses use :meth:`lookup`.
+        """
+        results = [None] * len(ip_inputs)
+        batch_positions = []
+        batch_values = []
+        for pos, ip_input in enumerate(ip_inputs):
+            cleaned = clean_ip_input(ip_input)
+            if not cleaned:
+                continue
+            if np is not None and '/' not in cleaned and ':' not in cleaned:
+                try:
+                    batch_values.append(int(ipaddress.IPv4Address(cleaned)))
+                except ValueError:
+                    continue
+                batch_positions.append(pos)
+            else:
+                results[pos] = self.lookup(cleaned)
+
+        if batch_values:
+            boundaries, owners, records = self._interval_table()
+            if len(boundaries):
+                slots = np.searchsorted(boundaries, np.array(batch_values, dtype=np.int64), side='right') - 1
+                matched = np.where(slots >= 0, owners[np.clip(slots, 0, None)], -1)
+                for pos, owner in zip(batch_positions, matched.tolist()):
+                    if owner >= 0:
+                        results[pos] = records[owner]
+        return results
+
+    def lookup(self, ip_input):
+        """Record for an IP address or CIDR string, or ``None`` when not covered / invalid."""
+        ip_input = clean_ip_input(ip_input)
+        if not ip_input:
+            return None
+        try:
+            if '/' in ip_input:
+                return self.lookup_network(ipaddress.ip_network(ip_input, strict=False))
+            return self.longest_match(ipaddress.ip_address(ip_input))
+        except ValueError:
+            return None
+
+
+def _load_records():
+    from auto_tickets.models import IPDB
+
+    records = []
+    rows = IPDB.objects.order_by('id').values_list('id', 'ip', 'mask', 'traffic_oam', 'location', 'device')
+    for pk, ip, mask, traffic_oam, location, device in rows:
+        try:
+            network = parse_ipdb_network(ip, mask)
+        except ValueError:
+            # Skip invalid network configurations
+            continue
+        records.append(IPDBRecord(pk, ip, mask, traffic_oam, location, device, network))
+    return records
+
+
+def _table_version():
+    """IPDB version derived from the table: changes on every insert, delete and save / bulk_update."""
+    from django.db.models import Count, Max
+    from auto_tickets.models import IPDB
+
+    stats = IPDB.objects.aggregate(rows=Count('id'), last_id=Max('id'), changed=Max('change_datetime'))
+    changed = stats['changed'].isoformat() if stats['changed'] else ''
+    return f"db:{stats['rows']}:{stats['last_id'] or 0}:{changed}"
+
+
+def get_ipdb_version():
+    """
+    IPDB version seen by every process (changes whenever an IPDB row is saved or deleted).
+
+    The cache stamp when the cache is shared, otherwise :func:`_table_version`.
+    """
+    if not shared_cache.is_shared():
+        return _table_version()
+    try:
+        version = cache.get(IPDB_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(IPDB_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(IPDB_VERSION_CACHE_KEY)
+        return version or ''
+    except Exception:
+        logger.warning('IPDB index: cache unavailable, using process-local version', exc_info=True)
+        return ''
+
+
+_lock = threading.Lock()
+_index: IPDBIndex | None = None
+_index_version = None
+_last_version_check = 0.0
+
+
+def get_index():
+    """Process-wide index, (re)built lazily when the shared IPDB version changes."""
+    global _index, _index_version, _last_version_check
+
+    now = time.monotonic()
+    index = _index
+    if index is not None and now - _last_version_check < _VERSION_CHECK_INTERVAL:
+        return index
+
+    version = get_ipdb_version()
+    with _lock:
+        _last_version_check = now
+        if _index is None or version != _index_version:
+            started = time.monotonic()
+            _index = IPDBIndex(_load_records())
+            _index_version = version
+            logger.info(
+                'IPDB index built: %s prefixes in %.1f ms',
+                _index.size,
+                (time.monotonic() - started) * 1000,
+            )
+        return _index
+
+
+def invalidate(bump_version=True):
+    """Drop the local index; optionally bump the shared version so other workers rebuild too."""
+    global _index
+    with _lock:
+        _index = None
+    if bump_version and shared_cache.is_shared():
+        try:
+            cache.set(IPDB_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        except Exception:
+            logger.warning('IPDB index: could not bump shared version', exc_info=True)
+
+
+def lookup(ip_input):
+    """IPDB record (:class:`IPDBRecord`) for an IP or subnet string, or ``None``."""
+    return get_index().lookup(ip_input)
+
+
+def lookup_many(ip_inputs):
+    """IPDB records for a list of IP / subnet strings, in input order."""
+    return get_index().lookup_many(list(ip_inputs))
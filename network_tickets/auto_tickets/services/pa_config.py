@@ -0,0 +1,374 @@
+"""
+Plan-then-apply candidate config for auto_tickets_pa.
+
+The workbook is first compiled into a :class:`ConfigPlan`: every address,
+address-group, service and security-rule command for all rows, in flat
+``set`` form, deduplicated across rows (an address used by ten rows is
+created once) and remembering which rows asked for each command.
+:func:`apply_plan` then enters config mode once and pushes the plan in a
+few large ``send_config_set`` batches; errors in the echoed output are
+mapped back to the commands, and so to the workbook rows, that caused
+them.
+
+:class:`ExistingConfig` holds the address objects, address groups, services
+and security rules already on the firewall (fetched once per run in
+``set`` output format); the plan consults it so objects and rules that are
+already there are not pushed again.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import re
+import shlex
+import time
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = 'generated-by-netcare'
+
+# Apply order: objects must exist before the groups / rules that reference them
+_PHASES = ('address', 'address-group', 'service', 'rule', 'move')
+
+_ERROR_RE = re.compile(r'(Invalid syntax|Unknown command|Server error|Validation Error|\berror\b)', re.IGNORECASE)
+# Config-mode echo of a sent command: "<user>@<host># <command>"
+_ECHO_RE = re.compile(r'^\S+#\s?(.*)$')
+
+
+_SHOW_SECTIONS = ('address', 'address-group', 'service', 'rulebase security')
+
+# Rule attributes that narrow the traffic an allow rule matches: anything but "any" means the rule
+# may not cover a ticket's flow
+_RULE_RESTRICTIONS = ('source-user', 'source-hip', 'destination-hip', 'category')
+# Service attributes besides the destination port: such a service matches less than plain <protocol>/<port>
+_SERVICE_RESTRICTIONS = ('source-port', 'override')
+
+
+def _normalize_ip(value):
+    """'10.1.1.1' and '10.1.1.1/32' compare equal; anything unparseable is kept as-is."""
+    try:
+        return str(ipaddress.ip_network(str(value).strip(), strict=False))
+    except ValueError:
+        return str(value).strip()
+
+
+def _quote(name):
+    """CLI form of an object name: names reused from the firewall may contain spaces."""
+    return f'"{name}"' if any(ch.isspace() for ch in name) else name
+
+
+def _parse_set_line(line, vsys='vsys1'):
+    """Tokens after ``set`` for one line of set-format config output (None for other lines)."""
+    line = line.strip()
+    if not line.startswith('set '):
+        return None
+    try:
+        tokens = shlex.split(line)[1:]
+    except ValueError:
+        return None
+    if tokens[:1] == ['vsys']:
+        if tokens[1:2] != [vsys]:
+            return None
+        tokens = tokens[2:]
+    return [token for token in tokens if token not in ('[', ']')]
+
+
+class ExistingConfig:
+    """
+    In-memory index of what is already configured.
+
+    ``addresses`` maps name -> value, ``address_groups`` name -> static
+    members, ``services`` name -> (protocol, port) and ``rules`` name ->
+    {attribute: [values]}.  Rules are also indexed by
+    (from zone, to zone, service) for the "already allowed" check.
+    ``restricted_services`` are services with a source port or timeout
+    override; they are never reused for a plain protocol / port.
+    """
+
+    def __init__(self, addresses=None, address_groups=None, services=None, rules=None, restricted_services=()):
+        self.addresses = dict(addresses or {})
+        self.address_groups = {name: set(members) for name, members in (address_groups or {}).items()}
+        self.services = dict(services or {})
+        self.restricted_services = set(restricted_services)
+        self.rules = {name: dict(attrs) for name, attrs in (rules or {}).items()}
+        self._address_by_value = {}
+        for name, value in self.addresses.items():
+            self._address_by_value.setdefault(_normalize_ip(value), []).append(name)
+        self._service_by_port = {}
+        for name, key in self.services.items():
+            if name not in self.restricted_services:
+                self._service_by_port.setdefault(key, []).append(name)
+        self._rules_by_key = {}
+        for name, attrs in self.rules.items():
+            for from_zone in attrs.get('from', ()):
+                for to_zone in attrs.get('to', ()):
+                    for service in attrs.get('service', ()):
+                        self._rules_by_key.setdefault((from_zone, to_zone, service), []).append(name)
+
+    @classmethod
+    def from_output(cls, output, vsys='vsys1'):
+        addresses = {}
+        address_groups = {}
+        services = {}
+        service_parts = {}
+        rules = {}
+        for line in (output or '').splitlines():
+            tokens = _parse_set_line(line, vsys)
+            if not tokens or len(tokens) < 3:
+                continue
+            kind, name, rest = tokens[0], tokens[1], tokens[2:]
+            if kind == 'address' and rest[0] in ('ip-netmask', 'ip-range', 'fqdn') and len(rest) > 1:
+                addresses[name] = rest[1]
+            elif kind == 'address-group':
+                members = address_groups.setdefault(name, set())
+                if rest[0] == 'static':
+                    members.update(rest[1:])
+            elif kind == 'service' and rest[0] == 'protocol' and len(rest) > 1:
+                parts = service_parts.setdefault(name, {})
+                parts['protocol'] = rest[1]
+                options = rest[2:]
+                for key, value in zip(options[::2], options[1::2]):
+                    parts[key] = value
+            elif kind == 'rulebase' and name == 'security' and len(rest) > 2 and rest[0] == 'rules':
+                attrs = rules.setdefault(rest[1], {})
+                if len(rest) > 3:
+                    attrs.setdefault(rest[2], []).extend(rest[3:])
+        for name, parts in service_parts.items():
+            services[name] = (parts['protocol'], parts.get('port', ''))
+        restricted = [
+            name for name, parts in service_parts.items()
+            if any(parts.get(key, 'no') != 'no' for key in _SERVICE_RESTRICTIONS)
+        ]
+        return cls(addresses, address_groups, services, rules, restricted)
+
+    @classmethod
+    def fetch(cls, connection, vsys='vsys1', read_timeout=120):
+        """Read the objects and security rules in config mode (candidate config, set format)."""
+        started = time.monotonic()
+        connection.send_command('set cli config-output-format set')
+        connection.config_mode()
+        try:
+            outputs = [
+                connection.send_command(f'show {section}', read_timeout=read_timeout)
+                for section in _SHOW_SECTIONS
+            ]
+        finally:
+            connection.exit_config_mode()
+        existing = cls.from_output('\n'.join(outputs), vsys)
+        logger.info(
+            'Existing PA config: %s addresses, %s groups, %s services, %s rules in %.1f s',
+            len(existing.addresses), len(existing.address_groups), len(existing.services),
+            len(existing.rules), time.monotonic() - started,
+        )
+        return existing
+
+    def address_for(self, ip):
+        """Name of an existing address object for ``ip`` (an object named after the IP first)."""
+        names = self._address_by_value.get(_normalize_ip(ip), [])
+        if ip in names:
+            return ip
+        return names[0] if names else None
+
+    def service_for(self, protocol, port):
+        """Name of an existing plain service for protocol / port (the netcare-named one first)."""
+        names = self._service_by_port.get((protocol, str(port)), [])
+        preferred = f'{protocol}-{port}-netcare'
+        if preferred in names:
+            return preferred
+        return names[0] if names else None
+
+    def missing_members(self, group, members):
+        """Members not yet in ``group`` (all of them when the group does not exist)."""
+        static = self.address_groups.get(group, set())
+        return [member for member in members if member not in static]
+
+    def allows(self, from_zone, to_zone, service, source, destination, application=None):
+        """
+        True when an allow rule for (from, to, service) already covers source -> destination.
+
+        Only an enabled, non-negated rule for application ``any`` (or
+        ``application`` itself, e.g. icmp) without user / HIP / URL category
+        restrictions counts; anything narrower gets its own rule as before.
+        """
+        for name in self._rules_by_key.get((from_zone, to_zone, service), ()):
+            attrs = self.rules[name]
+            if attrs.get('action') != ['allow'] or attrs.get('disabled') == ['yes']:
+                continue
+            if attrs.get('negate-source') == ['yes'] or attrs.get('negate-destination') == ['yes']:
+                continue
+            if any(attrs.get(key, ['any']) != ['any'] for key in _RULE_RESTRICTIONS):
+                continue
+            applications = attrs.get('application', ())
+            if 'any' not in applications and (application is None or application not in applications):
+                continue
+            sources = attrs.get('source', ())
+            destinations = attrs.get('destination', ())
+            if (source in sources or 'any' in sources) and (destination in destinations or 'any' in destinations):
+                return True
+        return False
+
+
+class ConfigPlan:
+    """Ordered, deduplicated config commands with the workbook rows that need each one."""
+
+    def __init__(self, existing=None):
+        self.existing = existing if existing is not None else ExistingConfig()
+        self.skipped = 0
+        self._commands = {phase: {} for phase in _PHASES}
+
+    def commands(self):
+        """[(command, rows)] in apply order."""
+        return [
+            (command, rows)
+            for phase in _PHASES
+            for command, rows in self._commands[phase].items()
+        ]
+
+    def __len__(self):
+        return sum(len(commands) for commands in self._commands.values())
+
+    def add(self, phase, command, row):
+        self._commands[phase].setdefault(command, set()).add(row)
+
+    def add_row(self, row, ticket_number, src_zone_ip_dic, dst_zone_ip_dic, protocol, dports):
+        """
+        Add everything one workbook row needs: address objects, one source /
+        destination address-group per zone, services and a security rule per
+        cross-zone pair and port (ICMP goes to the shared icmp-netcare rule).
+        Anything :attr:`existing` already has is skipped (counted in :attr:`skipped`).
+
+        Returns a list of error messages for the row (e.g. unknown protocol).
+        """
+        existing = self.existing
+        ticket_number = str(ticket_number)
+        errors = []
+        address_names = {}
+        for zone_ips in (src_zone_ip_dic, dst_zone_ip_dic):
+            for ips in zone_ips.values():
+                for ip in ips:
+                    name = existing.address_for(ip)
+                    if name is None:
+                        name = ip
+                        self.add('address', f'set address {ip} description {DESCRIPTION} ip-netmask {ip}', row)
+                    else:
+                        self.skipped += 1
+                    address_names[ip] = name
+
+        def group_name(direction, zone):
+            return f'{ticket_number}-{direction}-row{row}-{zone}'
+
+        for direction, zone_ips in (('src', src_zone_ip_dic), ('dst', dst_zone_ip_dic)):
+            for zone, ips in zone_ips.items():
+                name = group_name(direction, zone)
+                missing = existing.missing_members(name, [address_names[ip] for ip in ips])
+                if missing:
+                    self.add('address-group', f"set address-group {name} static [ {' '.join(_quote(member) for member in missing)} ]", row)
+                else:
+                    self.skipped += 1
+                if name not in existing.address_groups:
+                    self.add('address-group', f'set address-group {name} description {DESCRIPTION}', row)
+
+        protocol = str(protocol).strip().lower()
+        for src_zone in src_zone_ip_dic:
+            for dst_zone in dst_zone_ip_dic:
+                if src_zone == dst_zone:
+                    continue
+                source = group_name('src', src_zone)
+                destination = group_name('dst', dst_zone)
+                if protocol in ('tcp', 'udp'):
+                    for dport in dports:
+                        if dport.lower() == 'icmp':
+                            self._add_icmp_rule(row, source, destination)
+                            continue
+                        service = existing.service_for(protocol, dport)
+                        if service is None:
+                            service = f'{protocol}-{dport}-netcare'
+                            self.add('service', f'set service {service} description {DESCRIPTION} protocol {protocol} port {dport}', row)
+                        if existing.allows(src_zone, dst_zone, service, source, destination):
+                            self.skipped += 1
+                            continue
+                        rule = f'{ticket_number}-{protocol}{dport}-row{row}-{src_zone}-{dst_zone}-netcare'
+                        self.add('rule', (
+                            f'set rulebase security rules {rule} source {source} destination {destination} '
+                            f'from {src_zone} to {dst_zone} service {_quote(service)} application any action allow '
+                            f'description {DESCRIPTION}'
+                        ), row)
+                        self.add('move', f'move rulebase security rules {rule} top', row)
+                elif protocol == 'icmp':
+                    self._add_icmp_rule(row, source, destination)
+                else:
+                    errors.append('Pls check the protocol and port in the excel file.')
+        return errors
+
+    def _add_icmp_rule(self, row, source, destination):
+        if self.existing.allows('any', 'any', 'application-default', source, destination, application='icmp'):
+            self.skipped += 1
+            return
+        self.add('rule', (
+            f'set rulebase security rules icmp-netcare source {source} destination {destination} '
+            f'from any to any service application-default application icmp action allow '
+            f'description {DESCRIPTION}'
+        ), row)
+
+
+def _command_errors(output, commands):
+    """
+    {command: [error lines]} from the echoed output of one send_config_set batch.
+
+    Error lines belong to the last prompt-prefixed echo line whose command
+    equals one of ``commands`` exactly; an error message quoting a command
+    is not mistaken for its echo.
+    """
+    sent = set(commands)
+    errors = {}
+    current = None
+    for line in (output or '').splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        echo = _ECHO_RE.match(stripped)
+        if echo is not None:
+            command = echo.group(1).strip()
+            current = command if command in sent else None
+            continue
+        if current is not None and _ERROR_RE.search(stripped):
+            errors.setdefault(current, []).append(stripped)
+    return errors
+
+
+def apply_plan(connection, plan, batch_size=200, on_batch=None):
+    """
+    Push ``plan`` in config mode in batches of ``batch_size`` commands.
+
+    Returns {row: [error message]} for the commands the firewall rejected.
+    ``on_batch(index, count, output)`` is called after each batch for logging.
+    A batch that raises is reported against every row in it.
+    """
+    row_errors = {}
+    commands = plan.commands()
+    if not commands:
+        return row_errors
+
+    connection.config_mode()
+    try:
+        for index, start in enumerate(range(0, len(commands), batch_size), 1):
+            batch = commands[start:start + batch_size]
+            batch_commands = [command for command, _rows in batch]
+            try:
+                output = connection.send_config_set(batch_commands, exit_config_mode=False)
+            except Exception as e:
+                logger.exception('PA config batch %s failed', index)
+                for command, rows in batch:
+                    for row in rows:
+                        row_errors.setdefault(row, []).append(f'{command}: {e}')
+                continue
+            if on_batch:
+                on_batch(index, len(batch), output)
+            failures = _command_errors(output, batch_commands)
+            for command, rows in batch:
+                for message in failures.get(command, ()):
+                    for row in rows:
+                        row_errors.setdefault(row, []).append(f'{command}: {message}')
+    finally:
+        connection.exit_config_mode()
+    return row_errors
@@ -0,0 +1,160 @@
+"""
+Offline snapshot of the PA firewall's forwarding table and interface zones.
+
+One ``show routing fib virtual-router <vr>`` plus one ``show interface all``
+per run replace the per-IP ``test routing fib-lookup`` / ``show interface``
+round trips: :class:`FibSnapshot` parses both into a longest-prefix-match
+table and an interface -> zone map, and :class:`~auto_tickets.services.pa_zones.ZoneResolver`
+consults it before falling back to the CLI.
+
+Snapshots can be written to / read from JSON (``dump`` / ``load``) so a run
+can be replayed offline (``manage.py pa_zone_dry_run``);
+:func:`save_run_snapshot` keeps the last few runs' snapshots in a directory.
+"""
+from __future__ import annotations
+
+import glob
+import ipaddress
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# id  destination  nexthop  flags  interface  [mtu]
+_FIB_ROUTE_RE = re.compile(r'^\s*\d+\s+(\S+/\d+)\s+(\S+)\s+(\S+)\s+(\S+)')
+_FORWARDING_PREFIXES = ('vr:', 'vw:', 'vlan:', 'N/A')
+
+
+def parse_fib_routes(output):
+    """[(network, interface)] for the up routes in ``show routing fib`` output; preferred (*) paths first."""
+    preferred = []
+    others = []
+    for line in (output or '').splitlines():
+        match = _FIB_ROUTE_RE.match(line)
+        if not match:
+            continue
+        destination, _nexthop, flags, interface = match.groups()
+        if 'u' not in flags:
+            continue
+        try:
+            network = ipaddress.ip_network(destination, strict=False)
+        except ValueError:
+            continue
+        (preferred if '*' in flags else others).append((network, interface))
+    return preferred + others
+
+
+def parse_interface_zones(output):
+    """{interface: zone} from the logical-interface table of ``show interface all``."""
+    zones = {}
+    for line in (output or '').splitlines():
+        tokens = line.split()
+        # name  id  vsys  zone  forwarding  tag  address
+        if len(tokens) < 5 or not tokens[1].isdigit() or not tokens[2].isdigit():
+            continue
+        zone = tokens[3]
+        if zone.startswith(_FORWARDING_PREFIXES):
+            continue  # interface without a zone: the forwarding column moved left
+        zones.setdefault(tokens[0], zone)
+    return zones
+
+
+class FibSnapshot:
+    """Longest-prefix-match table (network -> egress interface) plus interface -> zone map."""
+
+    def __init__(self, routes=(), interface_zones=None, virtual_router='', captured_at=None):
+        self.routes = []
+        self.interface_zones = dict(interface_zones or {})
+        self.virtual_router = virtual_router
+        self.captured_at = captured_at if captured_at is not None else time.time()
+        self._by_len = {4: {}, 6: {}}
+        self._lengths = {4: [], 6: []}
+        for network, interface in routes:
+            network = ipaddress.ip_network(network, strict=False)
+            bucket = self._by_len[network.version].setdefault(network.prefixlen, {})
+            # ECMP / duplicate prefixes: the first (preferred) path wins
+            if int(network.network_address) not in bucket:
+                bucket[int(network.network_address)] = interface
+                self.routes.append((network, interface))
+        for version in (4, 6):
+            self._lengths[version] = sorted(self._by_len[version], reverse=True)
+
+    @classmethod
+    def from_outputs(cls, fib_output, interface_output, virtual_router=''):
+        return cls(parse_fib_routes(fib_output), parse_interface_zones(interface_output), virtual_router)
+
+    @classmethod
+    def capture(cls, connection, virtual_router, read_timeout=120):
+        """Pull the FIB and interface table over ``connection`` (netmiko, operational mode)."""
+        started = time.monotonic()
+        fib_output = connection.send_command(
+            f'show routing fib virtual-router {virtual_router}', read_timeout=read_timeout,
+        )
+        interface_output = connection.send_command('show interface all', read_timeout=read_timeout)
+        snapshot = cls.from_outputs(fib_output, interface_output, virtual_router)
+        logger.info(
+            'FIB snapshot: %s routes, %s interfaces in %.1f s',
+            len(snapshot.routes), len(snapshot.interface_zones), time.monotonic() - started,
+        )
+        return snapshot
+
+    def interface_for(self, ip):
+        """Egress interface for ``ip`` by longest-prefix match, or None when no route covers it."""
+        address = ipaddress.ip_address(str(ip).strip())
+        value = int(address)
+        max_len = address.max_prefixlen
+        by_len = self._by_len[address.version]
+        for prefixlen in self._lengths[address.version]:
+            key = (value >> (max_len - prefixlen)) << (max_len - prefixlen) if prefixlen else 0
+            interface = by_len[prefixlen].get(key)
+            if interface is not None:
+                return interface
+        return None
+
+    def zone_for_interface(self, interface):
+        return self.interface_zones.get(interface)
+
+    def to_dict(self):
+        return {
+            'virtual_router': self.virtual_router,
+            'captured_at': self.captured_at,
+            'routes': [[str(network), interface] for network, interface in self.routes],
+            'interface_zones': self.interface_zones,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            [(network, interface) for network, interface in data.get('routes', [])],
+            data.get('interface_zones', {}),
+            data.get('virtual_router', ''),
+            data.get('captured_at'),
+        )
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(self.to_dict(), fh, indent=1)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def save_run_snapshot(snapshot, directory, keep):
+    """
+    Write ``snapshot`` as ``fib_snapshot_<timestamp>.json`` in ``directory``
+    and delete all but the newest ``keep`` snapshot files; returns the path.
+    """
+    path = snapshot.dump(os.path.join(directory, f"fib_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+    for old in sorted(glob.glob(os.path.join(directory, 'fib_snapshot_*.json')))[:-max(keep, 1)]:
+        try:
+            os.remove(old)
+        except OSError as e:
+            logger.warning('Could not remove old FIB snapshot %s: %s', old, e)
+    return path
@@ -0,0 +1,201 @@
+"""
+Validate / commit for auto_tickets_pa, with adaptive job polling.
+
+``validate partial`` and ``commit partial`` start firewall jobs; their
+progress used to be polled with a fixed ``sleep(60)``.  :func:`wait_for_job`
+and :func:`wait_for_idle` poll with exponential backoff instead
+(``PA_JOB_POLL_INITIAL`` seconds doubling up to ``PA_JOB_POLL_MAX``), so a
+ten-second validation is noticed after a few seconds.
+
+:func:`start_commit_job` runs :func:`validate_and_commit` in a daemon thread
+on the connection the upload already opened, tracking progress in a
+:class:`~auto_tickets.models.PaCommitJob` row so the web request returns as
+soon as the config is pushed (status: ``api/pa_commit_job/<job_id>/``).
+The thread lives in the web worker, so it stamps ``heartbeat_at`` on every
+progress update; :func:`fail_stale_jobs` marks a job whose heartbeat stopped
+(worker restarted / recycled) as ``error`` instead of leaving it
+``validating`` / ``committing`` forever.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_JOB_ID_RE = re.compile(r'jobid\s+(\d+)', re.IGNORECASE)
+
+
+class PaJobError(Exception):
+    """A firewall job failed, timed out or could not be started."""
+
+
+def backoff_delays(initial=None, maximum=None, factor=2):
+    """Endless poll delays: initial, initial*factor, ... capped at maximum (seconds)."""
+    delay = settings.PA_JOB_POLL_INITIAL if initial is None else initial
+    maximum = settings.PA_JOB_POLL_MAX if maximum is None else maximum
+    while True:
+        yield min(delay, maximum)
+        delay = min(delay * factor, maximum)
+
+
+def _poll(connection, command, done, log, sleep, timeout):
+    """Send ``command`` until ``done(output)``; returns the last output."""
+    deadline = time.monotonic() + (settings.PA_JOB_TIMEOUT if timeout is None else timeout)
+    for delay in backoff_delays():
+        output = connection.send_command(command)
+        if done(output):
+            return output
+        if time.monotonic() + delay > deadline:
+            raise PaJobError(f'Timed out waiting for: {command}')
+        log(f"{command}: still running, next check in {delay}s")
+        sleep(delay)
+
+
+def wait_for_idle(connection, log=logger.info, sleep=time.sleep, timeout=None):
+    """Wait until ``show jobs all`` has no active (ACT) job."""
+    return _poll(connection, 'show jobs all', lambda output: 'ACT' not in output, log, sleep, timeout)
+
+
+def wait_for_job(connection, job_id, log=logger.info, sleep=time.sleep, timeout=None):
+    """Wait for job ``job_id`` to finish; returns its ``show jobs id`` output, raises PaJobError on FAIL."""
+    output = _poll(
+        connection, f'show jobs id {job_id}',
+        lambda output: 'FIN' in output or 'FAIL' in output, log, sleep, timeout,
+    )
+    if 'FAIL' in output or 'OK' not in output:
+        raise PaJobError(f'Job {job_id} failed: {output}')
+    return output
+
+
+def validate_and_commit(connection, username, log=logger.info, sleep=time.sleep, on_phase=None):
+    """
+    ``validate partial admin <username>`` then ``commit partial admin <username>``,
+    each waited on with backoff.  ``on_phase(phase, job_id)`` is called as each job starts.
+    Raises PaJobError when a job fails.
+    """
+    wait_for_idle(connection, log, sleep)
+    connection.config_mode()
+    output = connection.send_command(f'validate partial admin {username}')
+    connection.exit_config_mode()
+    log(f"Validate status: {output}")
+    match = _JOB_ID_RE.search(output)
+    if not match:
+        raise PaJobError(f'Validation did not start: {output}')
+    validate_job_id = match.group(1)
+    log(f"Validate job id: {validate_job_id}")
+    if on_phase:
+        on_phase('validating', validate_job_id)
+    wait_for_job(connection, validate_job_id, log, sleep)
+    log("Validation completed successfully")
+
+    wait_for_idle(connection, log, sleep)
+    connection.config_mode()
+    output = connection.send_command_timing(
+        f'commit partial admin {username} description commit-by-netcare', read_timeout=0,
+    )
+    if 'Ctrl+C' in output:
+        # Leave the progress display; the commit job keeps running on the firewall
+        connection.write_channel('\x03')
+    connection.exit_config_mode()
+    log(f"Commit status: {output}")
+    match = _JOB_ID_RE.search(output) or re.search(r'[Jj]ob (\d+)', output)
+    if not match:
+        # Nothing to commit (or an older release that commits synchronously)
+        return output
+    commit_job_id = match.group(1)
+    if on_phase:
+        on_phase('committing', commit_job_id)
+    output = wait_for_job(connection, commit_job_id, log, sleep)
+    log("Commit completed successfully")
+    return output
+
+
+def run_commit_job(job_id, connection, username, release=None):
+    """
+    Daemon-thread body: validate + commit on ``connection``, recording progress on the PaCommitJob row.
+
+    ``release(discard=...)`` hands a pooled session back when done; without it the connection is closed.
+    """
+    from django.db import close_old_connections
+    from auto_tickets.models import PaCommitJob
+
+    close_old_connections()
+    job_log = []
+
+    def _log(message):
+        logger.info(message)
+        job_log.append(message)
+        PaCommitJob.objects.filter(job_id=job_id).update(log=list(job_log), heartbeat_at=timezone.now())
+
+    def _phase(phase, firewall_job_id):
+        fields = {'status': phase, 'heartbeat_at': timezone.now()}
+        fields['validate_job_id' if phase == 'validating' else 'commit_job_id'] = firewall_job_id
+        PaCommitJob.objects.filter(job_id=job_id).update(**fields)
+
+    failed = True
+    try:
+        validate_and_commit(connection, username, log=_log, on_phase=_phase)
+        PaCommitJob.objects.filter(job_id=job_id).update(status='completed', log=job_log)
+        failed = False
+    except Exception as e:
+        logger.exception('PA commit job %s failed', job_id)
+        PaCommitJob.objects.filter(job_id=job_id).update(status='error', error=str(e), log=job_log)
+    finally:
+        try:
+            if release is not None:
+                release(discard=failed)
+            else:
+                connection.disconnect()
+        except Exception:
+            pass
+        close_old_connections()
+
+
+def start_commit_job(job_id, connection, username, release=None):
+    """Hand ``connection`` to a daemon thread that validates and commits (see :func:`run_commit_job`)."""
+    from auto_tickets.models import PaCommitJob
+
+    # Marked before the thread starts so the caller never sees a started job as 'queued'
+    PaCommitJob.objects.filter(job_id=job_id).update(status='validating', heartbeat_at=timezone.now())
+    thread = threading.Thread(target=run_commit_job, args=(job_id, connection, username, release))
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+STALE_JOB_ERROR = (
+    'The background validate / commit stopped (the web worker was restarted). '
+    'Check "show jobs all" on the firewall before uploading again.'
+)
+
+
+def fail_stale_jobs(job_id=None):
+    """
+    Mark commit jobs whose thread is gone as ``error``; returns the count.
+
+    A running job is stale once its heartbeat is older than
+    ``PA_COMMIT_JOB_STALE_AFTER``; a job still ``queued`` after
+    ``PA_JOB_TIMEOUT`` belongs to an upload request that never finished.
+    Limited to ``job_id`` when given.
+    """
+    from auto_tickets.models import PaCommitJob
+
+    now = timezone.now()
+    jobs = PaCommitJob.objects.all() if job_id is None else PaCommitJob.objects.filter(job_id=job_id)
+    heartbeat_cutoff = now - timedelta(seconds=settings.PA_COMMIT_JOB_STALE_AFTER)
+    stale = jobs.filter(
+        Q(status__in=('validating', 'committing'), heartbeat_at__lt=heartbeat_cutoff)
+        | Q(status='queued', created_at__lt=now - timedelta(seconds=settings.PA_JOB_TIMEOUT))
+    )
+    count = stale.update(status='error', error=STALE_JOB_ERROR)
+    if count:
+        logger.warning('PA commit jobs: %s stale job(s) marked as failed', count)
+    return count
@@ -0,0 +1,162 @@
+"""
+Streaming parser and summary for PA session-table NAT lookups.
+
+``show session all filter | match <ip>`` can return tens of thousands of
+lines on a busy firewall.  :func:`iter_command_lines` reads the command's
+output off the SSH channel line by line, :func:`parse_session_lines` turns
+each line into a :class:`SessionRecord`, and :class:`NatSummary` folds the
+records into counts (unique NAT mappings, top applications) while keeping
+at most ``limit`` individual records - memory stays flat however many
+sessions match.
+
+Session-table lines come in two shapes::
+
+    1380783  ssl  ACTIVE  FLOW  NS   172.19.1.193[64363]/Internal/6  (43.252.52.2[53865])
+    vsys1                            43.252.52.231[2123]/External  (43.252.52.231[2123])
+
+the first is the source side of a session (id, application, state, type,
+flag, source and its translation), the second its destination side.  With
+``| match`` either line can be filtered out on its own, so each line is
+kept as its own record rather than paired up.
+"""
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from typing import NamedTuple
+
+_ENDPOINT = r'(\d{1,3}(?:\.\d{1,3}){3})\[(\d+)\]'
+_SOURCE_LINE_RE = re.compile(
+    rf'^\s*(\d+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(?:(\S+)\s+)?{_ENDPOINT}/([^/\s]*)/(\d+)\s+\({_ENDPOINT}\)'
+)
+_DESTINATION_LINE_RE = re.compile(rf'^\s*(\S+)\s+{_ENDPOINT}/(\S*)\s+\({_ENDPOINT}\)')
+# Fallback for unexpected layouts: "ip[port] ... (ip[port])", as the old single regex matched
+_ANY_LINE_RE = re.compile(rf'{_ENDPOINT}[^(]*\({_ENDPOINT}\)')
+
+
+class SessionRecord(NamedTuple):
+    """One side of a session-table entry: the address as seen and as translated."""
+
+    side: str  # 'source' | 'destination'
+    ip: str
+    port: int
+    nat_ip: str
+    nat_port: int
+    zone: str = ''
+    protocol: str = ''
+    session_id: str = ''
+    application: str = ''
+    state: str = ''
+    type: str = ''
+    flag: str = ''
+    vsys: str = ''
+
+    @property
+    def translated(self):
+        return (self.ip, self.port) != (self.nat_ip, self.nat_port)
+
+
+def parse_session_line(line):
+    """:class:`SessionRecord` for one session-table line, or None for headers / other output."""
+    match = _SOURCE_LINE_RE.match(line)
+    if match:
+        session_id, application, state, type_, flag, ip, port, zone, protocol, nat_ip, nat_port = match.groups()
+        return SessionRecord(
+            'source', ip, int(port), nat_ip, int(nat_port), zone, protocol,
+            session_id, application, state, type_, flag or '',
+        )
+    match = _DESTINATION_LINE_RE.match(line)
+    if match:
+        vsys, ip, port, zone, nat_ip, nat_port = match.groups()
+        return SessionRecord('destination', ip, int(port), nat_ip, int(nat_port), zone, vsys=vsys)
+    match = _ANY_LINE_RE.search(line)
+    if match:
+        ip, port, nat_ip, nat_port = match.groups()
+        return SessionRecord('source', ip, int(port), nat_ip, int(nat_port))
+    return None
+
+
+def parse_session_lines(lines):
+    """Yield :class:`SessionRecord` for each session-table line in ``lines`` (any iterable)."""
+    for line in lines:
+        record = parse_session_line(line)
+        if record is not None:
+            yield record
+
+
+def iter_command_lines(connection, command, read_timeout=120, poll_interval=0.05):
+    """
+    Run ``command`` on a Netmiko session and yield its output lines as they arrive.
+
+    Stops at the next prompt; raises TimeoutError when no output arrives for
+    ``read_timeout`` seconds.  The command echo is skipped.
+    """
+    prompt = connection.find_prompt().strip()
+    connection.write_channel(connection.normalize_cmd(command))
+    pending = ''
+    echo_seen = False
+    idle_since = time.monotonic()
+    while True:
+        chunk = connection.read_channel()
+        if not chunk:
+            if time.monotonic() - idle_since > read_timeout:
+                raise TimeoutError(f'No output for {read_timeout}s from: {command}')
+            time.sleep(poll_interval)
+            continue
+        idle_since = time.monotonic()
+        *lines, pending = (pending + chunk).split('\n')
+        for line in lines:
+            line = line.rstrip('\r')
+            if not echo_seen and command in line:
+                echo_seen = True
+                continue
+            yield line
+        if pending.strip() == prompt:
+            return
+
+
+class NatSummary:
+    """
+    Running aggregate of session records.
+
+    ``mappings`` counts (side, ip, nat_ip) translations, ``applications``
+    counts applications of source-side records; only the first ``limit``
+    records are kept in ``records``.
+    """
+
+    def __init__(self, limit=200):
+        self.limit = limit
+        self.total = 0
+        self.records = []
+        self.mappings = Counter()
+        self.applications = Counter()
+
+    def add(self, record):
+        self.total += 1
+        if len(self.records) < self.limit:
+            self.records.append(record)
+        self.mappings[(record.side, record.ip, record.nat_ip)] += 1
+        if record.application:
+            self.applications[record.application] += 1
+
+    @classmethod
+    def from_records(cls, records, limit=200):
+        summary = cls(limit)
+        for record in records:
+            summary.add(record)
+        return summary
+
+    @property
+    def truncated(self):
+        return self.total > len(self.records)
+
+    def top_mappings(self, n=20):
+        """[{'side', 'ip', 'nat_ip', 'count'}] for the n most frequent translations."""
+        return [
+            {'side': side, 'ip': ip, 'nat_ip': nat_ip, 'count': count}
+            for (side, ip, nat_ip), count in self.mappings.most_common(n)
+        ]
+
+    def top_applications(self, n=10):
+        return [{'application': app, 'count': count} for app, count in self.applications.most_common(n)]
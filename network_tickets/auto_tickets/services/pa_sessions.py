@@ -0,0 +1,181 @@
+"""
+Reusable Netmiko sessions to the PA firewall.
+
+Opening a PAN-OS SSH session (handshake, login banner, pager / width
+setup) takes several seconds, which used to be paid by every NAT lookup
+(``get_nat_config``) and every auto_tickets_pa upload.  :data:`session_pool`
+keeps a few logged-in sessions per (host, port, username, password) and hands
+them out one caller at a time:
+
+    with session_pool.session(device) as connection:
+        connection.send_command(...)
+
+A session is health-checked with ``find_prompt()`` before reuse, returned
+to operational mode on release, dropped after ``PA_SESSION_IDLE_TIMEOUT``
+seconds unused, and discarded when the caller's block raised.  Long-lived
+users (the background validate / commit thread) use :meth:`SessionPool.acquire`
+and call ``lease.release()`` themselves.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _connect(device):
+    from netmiko import ConnectHandler
+
+    return ConnectHandler(**device)
+
+
+def _pool_key(device):
+    secret = hashlib.sha256(str(device.get('password', '')).encode()).hexdigest()
+    return (device.get('device_type'), device.get('host'), device.get('port'), device.get('username'), secret)
+
+
+class _PooledSession:
+    def __init__(self, connection):
+        self.connection = connection
+        self.in_use = False
+        self.last_used = time.monotonic()
+
+
+class Lease:
+    """One checked-out session; :meth:`release` exactly once (extra calls are ignored)."""
+
+    def __init__(self, pool, key, pooled):
+        self._pool = pool
+        self._key = key
+        self._pooled = pooled
+        self._released = False
+        self.connection = pooled.connection
+
+    def release(self, discard=False):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._key, self._pooled, discard)
+
+
+class SessionPool:
+    """Per-credential pool of at most ``max_size`` sessions, each used by one caller at a time."""
+
+    def __init__(self, connect=_connect, max_size=None, idle_timeout=None, acquire_timeout=None):
+        self._connect = connect
+        self.max_size = settings.PA_SESSION_POOL_SIZE if max_size is None else max_size
+        self.idle_timeout = settings.PA_SESSION_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.acquire_timeout = settings.PA_SESSION_ACQUIRE_TIMEOUT if acquire_timeout is None else acquire_timeout
+        self._sessions = {}
+        self._cond = threading.Condition()
+        self.connects = 0
+
+    def acquire(self, device):
+        """Lease a healthy session for ``device`` (netmiko ConnectHandler kwargs), connecting if needed."""
+        key = _pool_key(device)
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                self._drop_idle()
+                sessions = self._sessions.setdefault(key, [])
+                pooled = next((s for s in sessions if not s.in_use), None)
+                if pooled is None and len(sessions) < self.max_size:
+                    pooled = _PooledSession(None)  # reserve the slot while connecting
+                    sessions.append(pooled)
+                if pooled is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No free firewall session for {device.get('host')}")
+                    self._cond.wait(remaining)
+                    continue
+                pooled.in_use = True
+
+            if pooled.connection is not None and self._healthy(pooled.connection):
+                return Lease(self, key, pooled)
+            if pooled.connection is not None:
+                self._close(pooled.connection)
+            try:
+                pooled.connection = self._connect(device)
+                self.connects += 1
+            except Exception:
+                self._remove(key, pooled)
+                raise
+            return Lease(self, key, pooled)
+
+    @contextmanager
+    def session(self, device):
+        lease = self.acquire(device)
+        try:
+            yield lease.connection
+        except Exception:
+            lease.release(discard=True)
+            raise
+        lease.release()
+
+    def _release(self, key, pooled, discard):
+        if not discard:
+            try:
+                if pooled.connection.check_config_mode():
+                    pooled.connection.exit_config_mode()
+            except Exception:
+                discard = True
+        if discard:
+            self._close(pooled.connection)
+            self._remove(key, pooled)
+            return
+        with self._cond:
+            pooled.in_use = False
+            pooled.last_used = time.monotonic()
+            self._cond.notify()
+
+    def _remove(self, key, pooled):
+        with self._cond:
+            sessions = self._sessions.get(key, [])
+            if pooled in sessions:
+                sessions.remove(pooled)
+            self._cond.notify()
+
+    def _drop_idle(self):
+        """Close sessions unused for idle_timeout seconds (caller holds the lock)."""
+        now = time.monotonic()
+        for sessions in self._sessions.values():
+            for pooled in list(sessions):
+                if not pooled.in_use and now - pooled.last_used > self.idle_timeout:
+                    sessions.remove(pooled)
+                    self._close(pooled.connection)
+
+    @staticmethod
+    def _healthy(connection):
+        try:
+            connection.find_prompt()
+            return True
+        except Exception:
+            logger.info('Pooled firewall session is stale, reconnecting', exc_info=True)
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.disconnect()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self._cond:
+            for sessions in self._sessions.values():
+                for pooled in sessions:
+                    if not pooled.in_use and pooled.connection is not None:
+                        self._close(pooled.connection)
+            self._sessions = {
+                key: [pooled for pooled in sessions if pooled.in_use]
+                for key, sessions in self._sessions.items()
+            }
+
+
+session_pool = SessionPool()
@@ -0,0 +1,435 @@
+"""
+Local stand-in for the PA firewall, for benchmarks and end-to-end tests.
+
+:class:`PanosSimulator` emulates the parts of the PAN-OS CLI that
+auto_tickets_pa_tools and get_nat_config use: FIB / interface lookups,
+``configure`` with ``set`` / ``show`` / ``move``, ``validate`` / ``commit``
+jobs with ``show jobs``, ``check pending-changes`` and the session table.
+The topology is synthetic: ``10.<n>.0.0/16`` is routed out of
+``ethernet1/<n>``, which sits in zone ``Zone<n>``.
+
+:class:`SimulatorServer` puts it behind a local SSH server (paramiko,
+keyboard-interactive login like the real box) that Netmiko's
+``paloalto_panos`` driver can log into.  Every command can be given a
+latency (``latency`` plus per-prefix ``command_latency``) and is counted in
+``PanosSimulator.commands``, so ``manage.py pa_benchmark`` can report round
+trips and wall time for a given workbook size.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import shlex
+import socket
+import threading
+import time
+from collections import Counter
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+# Attributes stored as member lists (set appends) rather than single values
+_LIST_ATTRIBUTES = {'static', 'source', 'destination', 'from', 'to', 'service', 'application'}
+_KINDS = ('address', 'address-group', 'service')
+
+
+def command_category(command):
+    """Short label used to count commands ('set address', 'test routing fib-lookup', ...)."""
+    words = command.split()
+    if words[:2] == ['show', 'jobs']:
+        return 'show jobs'
+    if words[:1] == ['set'] and len(words) > 1 and words[1] in ('rulebase', 'address', 'address-group', 'service'):
+        return ' '.join(words[:2])
+    return ' '.join(words[:3]) if words[:1] in (['test'], ['show']) else ' '.join(words[:1])
+
+
+class PanosSimulator:
+    """CLI state machine: one instance is shared by every SSH session of a benchmark run."""
+
+    def __init__(self, zones=8, hostname='PA-SIM', job_seconds=0.5, virtual_router='vr_vsys1'):
+        self.hostname = hostname
+        self.virtual_router = virtual_router
+        self.job_seconds = job_seconds
+        self.interfaces = {f'ethernet1/{n}': f'Zone{n}' for n in range(1, zones + 1)}
+        self.routes = [
+            (ipaddress.ip_network(f'10.{n}.0.0/16'), f'ethernet1/{n}') for n in range(1, zones + 1)
+        ]
+        self.routes.append((ipaddress.ip_network('0.0.0.0/0'), 'ethernet1/1'))
+        self.objects = {kind: {} for kind in _KINDS}
+        self.rules = {}
+        self.rule_order = []
+        self.jobs = {}
+        self._next_job = 1
+        self.pending_changes = False
+        self.commands = Counter()
+        self._lock = threading.Lock()
+
+    # -- helpers ---------------------------------------------------------
+
+    def route_for(self, ip):
+        address = ipaddress.ip_address(ip)
+        best = None
+        for network, interface in self.routes:
+            if address in network and (best is None or network.prefixlen > best[0].prefixlen):
+                best = (network, interface)
+        return best
+
+    def _start_job(self, kind):
+        job_id = self._next_job
+        self._next_job += 1
+        self.jobs[job_id] = (kind, time.monotonic())
+        return job_id
+
+    def _job_status(self, job_id):
+        kind, started = self.jobs[job_id]
+        done = time.monotonic() - started >= self.job_seconds
+        return kind, ('FIN', 'OK', '100%') if done else ('ACT', 'PEND', '50%')
+
+    @staticmethod
+    def _attributes(tokens):
+        """[(key, [values])] from 'k v k [ v v ] ...' tokens."""
+        pairs = []
+        pos = 0
+        while pos < len(tokens):
+            key = tokens[pos]
+            pos += 1
+            if pos < len(tokens) and tokens[pos] == '[':
+                end = tokens.index(']', pos) if ']' in tokens[pos:] else len(tokens)
+                values = tokens[pos + 1:end]
+                pos = end + 1
+            elif pos < len(tokens):
+                values = [tokens[pos]]
+                pos += 1
+            else:
+                raise ValueError(key)
+            pairs.append((key, values))
+        return pairs
+
+    def _store(self, target, tokens):
+        for key, values in self._attributes(tokens):
+            if key in _LIST_ATTRIBUTES:
+                members = target.setdefault(key, [])
+                members.extend(value for value in values if value not in members)
+            else:
+                target[key] = values[:1]
+
+    @staticmethod
+    def _set_line(prefix, name, key, values):
+        value = values[0] if len(values) == 1 else f"[ {' '.join(values)} ]"
+        return f'set {prefix} {name} {key} {value}'
+
+    # -- commands --------------------------------------------------------
+
+    def run(self, command, config_mode):
+        """(output, config_mode after the command) for one CLI line."""
+        command = command.strip()
+        if not command:
+            return '', config_mode
+        with self._lock:
+            self.commands[command_category(command)] += 1
+            try:
+                return self._run(command, config_mode)
+            except (ValueError, IndexError, KeyError):
+                return 'Invalid syntax.', config_mode
+
+    def _run(self, command, config_mode):
+        words = command.split()
+        if words[0] in ('exit', 'quit'):
+            return '', False
+        if not config_mode:
+            if words[0] == 'configure':
+                return 'Entering configuration mode', True
+            return self._operational(command, words), False
+        return self._configuration(command, words), True
+
+    def _operational(self, command, words):
+        if words[:2] == ['set', 'cli']:
+            if words[2:4] == ['scripting-mode', 'on']:
+                return 'scripting mode on'
+            return ''
+        if words[:3] == ['show', 'system', 'info']:
+            return f'hostname: {self.hostname}\nmodel: PA-SIM\noperational-mode: normal'
+        if words[:3] == ['test', 'routing', 'fib-lookup']:
+            route = self.route_for(words[-1])
+            if route is None:
+                return 'no route'
+            network, interface = route
+            return f'runtime route lookup\ninterface {interface}, source {network.network_address + 1}, metric 10'
+        if words[:3] == ['show', 'routing', 'fib']:
+            lines = ['id   destination   nexthop   flags   interface   mtu']
+            for pos, (network, interface) in enumerate(self.routes, 1):
+                lines.append(f'{pos}   {network}   0.0.0.0   u*   {interface}   1500')
+            return '\n'.join(lines)
+        if words[:3] == ['show', 'interface', 'all']:
+            lines = ['name   id   vsys   zone   forwarding   tag   address']
+            for pos, (interface, zone) in enumerate(self.interfaces.items(), 16):
+                lines.append(f'{interface}   {pos}   1   {zone}   vr:{self.virtual_router}   0   N/A')
+            return '\n'.join(lines)
+        if words[:2] == ['show', 'interface']:
+            zone = self.interfaces.get(words[2])
+            if zone is None:
+                return 'Invalid syntax.'
+            return f'Name: {words[2]}, ID: 16\nZone: {zone}, virtual system: vsys1'
+        if words[:3] == ['show', 'jobs', 'all']:
+            lines = ['Enqueued   Dequeued   ID   Type   Status   Result   Completed']
+            for job_id in sorted(self.jobs):
+                kind, (status, result, progress) = self._job_status(job_id)
+                lines.append(f'2024/01/01 00:00:00   00:00:00   {job_id}   {kind}   {status}   {result}   {progress}')
+            return '\n'.join(lines)
+        if words[:3] == ['show', 'jobs', 'id']:
+            kind, (status, result, progress) = self._job_status(int(words[3]))
+            return (
+                'Enqueued   Dequeued   ID   Type   Status   Result   Completed\n'
+                f'2024/01/01 00:00:00   00:00:00   {words[3]}   {kind}   {status}   {result}   {progress}'
+            )
+        if words[:2] == ['check', 'pending-changes']:
+            return 'yes' if self.pending_changes else 'no'
+        if words[:3] == ['show', 'session', 'all'] and '| match' in command:
+            ip = words[-1]
+            return '\n'.join(
+                f'{1000 + n}   ssl   ACTIVE   FLOW   NS   {ip}[{40000 + n}]/Zone1/6  (203.0.113.10[{50000 + n}])'
+                for n in range(20)
+            )
+        return 'Invalid syntax.'
+
+    def _configuration(self, command, words):
+        if words[0] == 'set':
+            tokens = shlex.split(command)[1:]
+            kind = tokens[0]
+            if kind in _KINDS:
+                self._store(self.objects[kind].setdefault(tokens[1], {}), tokens[2:])
+            elif tokens[:3] == ['rulebase', 'security', 'rules']:
+                name = tokens[3]
+                if name not in self.rules:
+                    self.rules[name] = {}
+                    self.rule_order.append(name)
+                self._store(self.rules[name], tokens[4:])
+            else:
+                raise ValueError(kind)
+            self.pending_changes = True
+            return ''
+        if words[0] == 'move':
+            name = words[4]
+            if name not in self.rules:
+                return f'Server error : move failed. {name} does not exist'
+            self.rule_order.remove(name)
+            self.rule_order.insert(0, name)
+            return ''
+        if words[0] == 'show':
+            return self._show_config(' '.join(words[1:]))
+        if words[0] == 'validate':
+            return f'Validate job enqueued with jobid {self._start_job("Validate")}'
+        if words[0] == 'commit':
+            job_id = self._start_job('Commit')
+            self.pending_changes = False
+            return f'Commit job {job_id} is in progress. Use Ctrl+C to return to command prompt'
+        return 'Invalid syntax.'
+
+    def _show_config(self, section):
+        lines = []
+        if section in _KINDS:
+            for name, attrs in self.objects[section].items():
+                if section == 'service' and 'protocol' in attrs:
+                    lines.append(f"set service {name} protocol {attrs['protocol'][0]} port {attrs.get('port', [''])[0]}")
+                for key, values in attrs.items():
+                    if section == 'service' and key in ('protocol', 'port'):
+                        continue
+                    lines.append(self._set_line(section, name, key, values))
+        elif section == 'rulebase security':
+            for name in self.rule_order:
+                for key, values in self.rules[name].items():
+                    lines.append(self._set_line('rulebase security rules', name, key, values))
+        else:
+            return 'Invalid syntax.'
+        return '\n'.join(lines)
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    """Accepts any user, with keyboard-interactive (as Netmiko's PAN-OS driver uses) or password auth."""
+
+    def __init__(self):
+        self.username = 'admin'
+        self.shell_requested = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return 'keyboard-interactive,password'
+
+    def check_auth_password(self, username, password):
+        self.username = username
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_interactive(self, username, submethods):
+        self.username = username
+        return paramiko.InteractiveQuery('', '', ('Password: ', False))
+
+    def check_auth_interactive_response(self, responses):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell_requested.set()
+        return True
+
+
+class SimulatorServer:
+    """
+    SSH front end for a :class:`PanosSimulator` on 127.0.0.1 (random port unless given).
+
+    ``latency`` seconds are added to every command, ``command_latency`` maps
+    a command prefix (e.g. ``'test routing fib-lookup'``) to its own latency.
+    """
+
+    def __init__(self, simulator=None, host='127.0.0.1', port=0, latency=0.0, command_latency=None):
+        self.simulator = simulator or PanosSimulator()
+        self.latency = latency
+        self.command_latency = dict(command_latency or {})
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.logins = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen(16)
+        self.host, self.port = self._socket.getsockname()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._closed.set()
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+
+    def device(self, username='admin', password='admin', **extra):
+        """Netmiko ConnectHandler kwargs for this server."""
+        return dict(
+            device_type='paloalto_panos', host=self.host, port=self.port,
+            username=username, password=password, **extra,
+        )
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                client, _addr = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _delay(self, command):
+        delay = self.latency
+        matches = [prefix for prefix in self.command_latency if command.startswith(prefix)]
+        if matches:
+            delay = self.command_latency[max(matches, key=len)]
+        if delay:
+            time.sleep(delay)
+
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        server = _ServerInterface()
+        try:
+            transport.start_server(server=server)
+            channel = transport.accept(20)
+            if channel is None or not server.shell_requested.wait(10):
+                return
+            self.logins += 1
+            self._shell(channel, server.username)
+        except Exception:
+            logger.debug('Simulator session ended', exc_info=True)
+        finally:
+            transport.close()
+
+    def _shell(self, channel, username):
+        config_mode = False
+
+        def prompt():
+            if config_mode:
+                return f'\r\n[edit]\r\n{username}@{self.simulator.hostname}# '
+            return f'\r\n{username}@{self.simulator.hostname}> '
+
+        channel.sendall(f'Welcome to the PAN-OS simulator{prompt()}'.encode())
+        line = ''
+        previous = ''
+        while not self._closed.is_set():
+            data = channel.recv(4096)
+            if not data:
+                return
+            for char in data.decode(errors='replace'):
+                after_cr, previous = previous == '\r', char
+                if char == '\x03':
+                    line = ''
+                    channel.sendall(prompt().encode())
+                elif char in '\r\n':
+                    if char == '\n' and after_cr:
+                        continue
+                    command, line = line, ''
+                    channel.sendall(b'\r\n')
+                    was_config = config_mode
+                    self._delay(command)
+                    output, config_mode = self.simulator.run(command, config_mode)
+                    if command.strip() in ('exit', 'quit') and not was_config:
+                        channel.close()
+                        return
+                    text = output.replace('\n', '\r\n')
+                    channel.sendall(((text + '\r\n') if text else '').encode() + prompt().lstrip('\r\n').encode())
+                else:
+                    line += char
+                    channel.sendall(char.encode())
+
+
+def synthetic_workbook(rows, zones=8, seed=0):
+    """
+    auto_tickets_pa workbook with ``rows`` data rows (from row 4, same columns as the real template).
+
+    Addresses come from the simulator's 10.<zone>.0.0/16 ranges; about one
+    row in ten stays inside one zone so the "no cross-zone traffic" path is exercised.
+    """
+    import random
+
+    import openpyxl
+
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(['Ticket', 'Requestor', 'Source IP', 'Source Name', 'Destination IP', 'Protocol', 'Port'])
+    sheet.append([])
+    sheet.append([])
+
+    def addresses(zone, count):
+        return ','.join(f'10.{zone}.{rng.randint(0, 255)}.{rng.randint(1, 254)}' for _ in range(count))
+
+    for row in range(rows):
+        source_zone = rng.randint(1, zones)
+        destination_zone = source_zone if row % 10 == 9 else rng.choice(
+            [zone for zone in range(1, zones + 1) if zone != source_zone] or [source_zone]
+        )
+        protocol = rng.choice(['tcp', 'tcp', 'udp', 'icmp'])
+        sheet.append([
+            f'CR{10000 + row}',
+            'benchmark',
+            addresses(source_zone, rng.randint(1, 3)),
+            '',
+            addresses(destination_zone, rng.randint(1, 2)),
+            protocol,
+            'icmp' if protocol == 'icmp' else '/'.join(rng.sample(['22', '443', '8080', '3306', '53'], rng.randint(1, 2))),
+        ])
+    return wb
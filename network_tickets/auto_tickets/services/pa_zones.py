@@ -0,0 +1,132 @@
+"""
+IP -> egress interface -> security zone resolution on the PA firewall.
+
+``auto_tickets_pa_tools`` used to run ``test routing fib-lookup`` and
+``show interface`` for every IP of every row.  :class:`ZoneResolver` keeps
+both steps in two caches:
+
+* IP -> interface (the FIB answer), and
+* interface -> zone (a handful of interfaces serve most IPs),
+
+each held in a dict for the current run and persisted in the Django cache
+for ``settings.PA_ZONE_CACHE_TTL`` seconds so later runs skip the CLI
+round trips too.  Cache backend errors only disable the shared level.
+
+With a :class:`~auto_tickets.services.pa_fib.FibSnapshot` both levels are
+answered locally first; the CLI is only used for what the snapshot misses.
+"""
+from __future__ import annotations
+
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_FIB_INTERFACE_RE = re.compile(r'interface\s(ethernet\d/\d+),')
+_INTERFACE_ZONE_RE = re.compile(r'Zone:\s(\w+),')
+
+
+class ZoneLookupError(Exception):
+    """The firewall output did not contain the expected interface / zone."""
+
+
+def parse_fib_interface(output):
+    match = _FIB_INTERFACE_RE.search(output or '')
+    if not match:
+        raise ZoneLookupError(f'no egress interface in fib-lookup output: {output!r}')
+    return match.group(1)
+
+
+def parse_interface_zone(output):
+    match = _INTERFACE_ZONE_RE.search(output or '')
+    if not match:
+        raise ZoneLookupError(f'no zone in show interface output: {output!r}')
+    return match.group(1)
+
+
+class ZoneResolver:
+    """
+    Resolve the security zone of an IP through ``connection`` (a netmiko
+    session in operational mode), caching both lookup levels.
+
+    ``on_command`` is called with each CLI command actually sent, so callers
+    can keep their per-run command log.  ``connection`` may be None when a
+    ``snapshot`` is given (offline replay); misses then raise ZoneLookupError.
+    """
+
+    def __init__(self, connection, host=None, virtual_router=None, ttl=None, on_command=None, snapshot=None):
+        self.connection = connection
+        self.snapshot = snapshot
+        self.host = host or settings.PA_FIREWALL_HOST
+        self.virtual_router = virtual_router or settings.PA_VIRTUAL_ROUTER
+        self.ttl = settings.PA_ZONE_CACHE_TTL if ttl is None else ttl
+        self.on_command = on_command
+        self._interfaces = {}
+        self._zones = {}
+        self.commands_sent = 0
+
+    def _cache_key(self, kind, value):
+        return f'pa_zone:{self.host}:{self.virtual_router}:{kind}:{value}'
+
+    def _shared_get(self, kind, value):
+        if not self.ttl:
+            return None
+        try:
+            return cache.get(self._cache_key(kind, value))
+        except Exception:
+            logger.warning('PA zone cache unavailable', exc_info=True)
+            return None
+
+    def _shared_set(self, kind, value, result):
+        if not self.ttl:
+            return
+        try:
+            cache.set(self._cache_key(kind, value), result, self.ttl)
+        except Exception:
+            logger.warning('PA zone cache unavailable', exc_info=True)
+
+    def _send(self, command):
+        if self.connection is None:
+            raise ZoneLookupError(f'not in FIB snapshot and no firewall connection: {command}')
+        if self.on_command:
+            self.on_command(command)
+        self.commands_sent += 1
+        return self.connection.send_command(command)
+
+    def interface_for(self, ip):
+        """Egress interface for ``ip``: run cache, FIB snapshot, shared cache, then fib-lookup."""
+        interface = self._interfaces.get(ip)
+        if interface is not None:
+            return interface
+        if self.snapshot is not None:
+            interface = self.snapshot.interface_for(ip)
+        if interface is None:
+            interface = self._shared_get('ip', ip)
+        if interface is None:
+            output = self._send(f'test routing fib-lookup virtual-router {self.virtual_router} ip {ip}')
+            interface = parse_fib_interface(output)
+            self._shared_set('ip', ip, interface)
+        self._interfaces[ip] = interface
+        return interface
+
+    def zone_for_interface(self, interface):
+        """Zone of ``interface``: run cache, FIB snapshot, shared cache, then show interface."""
+        zone = self._zones.get(interface)
+        if zone is not None:
+            return zone
+        if self.snapshot is not None:
+            zone = self.snapshot.zone_for_interface(interface)
+        if zone is None:
+            zone = self._shared_get('interface', interface)
+        if zone is None:
+            zone = parse_interface_zone(self._send(f'show interface {interface}'))
+            self._shared_set('interface', interface, zone)
+        self._zones[interface] = zone
+        return zone
+
+    def zone_for(self, ip):
+        """Security zone for ``ip``; raises ZoneLookupError when the firewall output cannot be parsed."""
+        return self.zone_for_interface(self.interface_for(ip))
@@ -0,0 +1,154 @@
+"""
+Queue-based run logging for the PA automation.
+
+``setup_logging()`` used to open two new timestamped files per run, switch
+the whole ``netmiko`` logger to DEBUG and echo everything to stdout, so a
+large workbook paid synchronous disk and console I/O for every command.
+
+Now every run logs through a ``QueueHandler``; one ``QueueListener`` per
+process writes the records to a single file (``PA_LOG_DIR/auto_tickets_pa.log``),
+each line tagged with the run id.
+
+All Gunicorn workers append to that same file, so none of them rotates it:
+the listener uses a ``WatchedFileHandler`` and rotation is left to an external
+logrotate (see ``nginx/Gunicorn_Uvicorn_Systemd.md``).  Each record is one
+append-mode write, and after logrotate renames the file every worker reopens
+the new one on its next record, so runs from different workers are neither
+split across files nor lost at midnight.
+:class:`RunLog` also keeps the last ``PA_LOG_CAPTURE_LINES`` result lines
+for the UI (plus any ERROR lines that scrolled out of that window).
+Netmiko's own DEBUG output is only forwarded when ``PA_NETMIKO_DEBUG`` is on.
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+
+LOGGER_NAME = 'auto_tickets.pa_run'
+_FORMAT = '%(asctime)s - %(run_id)s - %(levelname)s - %(message)s'
+
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+
+class _RunIdDefault(logging.Filter):
+    """Records that did not come through a RunLog (e.g. netmiko) get run_id '-'."""
+
+    def filter(self, record):
+        if not hasattr(record, 'run_id'):
+            record.run_id = '-'
+        return True
+
+
+def _file_handler():
+    os.makedirs(settings.PA_LOG_DIR, exist_ok=True)
+    handler = logging.handlers.WatchedFileHandler(
+        os.path.join(settings.PA_LOG_DIR, 'auto_tickets_pa.log'),
+        encoding='utf-8',
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter(_FORMAT))
+    handler.addFilter(_RunIdDefault())
+    return handler
+
+
+def get_logger():
+    """The shared run logger; the queue listener is started on first use (once per process)."""
+    global _queue_handler, _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _queue_handler is not None:
+        return logger
+    with _lock:
+        if _queue_handler is None:
+            log_queue = queue.SimpleQueue()
+            try:
+                handlers = [_file_handler()]
+            except OSError:
+                logging.getLogger(__name__).warning('PA run log directory unavailable, not writing a file', exc_info=True)
+                handlers = []
+            _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            logger.setLevel(logging.DEBUG)
+            logger.addHandler(queue_handler)
+            logger.propagate = False
+            if settings.PA_NETMIKO_DEBUG:
+                netmiko_logger = logging.getLogger('netmiko')
+                netmiko_logger.setLevel(logging.DEBUG)
+                netmiko_logger.addHandler(queue_handler)
+            _queue_handler = queue_handler
+    return logger
+
+
+def shutdown():
+    """Flush and stop the listener (at exit, or to pick up changed settings); the next get_logger() restarts it."""
+    global _queue_handler, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        if _queue_handler is not None:
+            logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+            logging.getLogger('netmiko').removeHandler(_queue_handler)
+        _queue_handler = None
+        _listener = None
+
+
+atexit.register(shutdown)
+
+
+class RunLog:
+    """
+    Log + bounded capture for one run.
+
+    ``logger`` writes to the shared queue with this run's id; ``append``
+    only records a line for the UI (like the old ``res_log`` list) and
+    :meth:`result` returns what the UI should show.
+    """
+
+    def __init__(self, run_id=None, capture=None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.logger = logging.LoggerAdapter(get_logger(), {'run_id': self.run_id})
+        self._lines = deque(maxlen=settings.PA_LOG_CAPTURE_LINES if capture is None else capture)
+        self._errors = deque(maxlen=self._lines.maxlen)
+        self._counter = itertools.count()
+        self.total = 0
+
+    def append(self, message):
+        seq = next(self._counter)
+        self.total += 1
+        self._lines.append((seq, message))
+        if str(message).startswith('ERROR'):
+            self._errors.append((seq, message))
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return True
+
+    def result(self):
+        """Captured lines: an "omitted" note and the errors that scrolled out, then the last N lines."""
+        if not self._lines:
+            return []
+        first_kept = self._lines[0][0]
+        if first_kept == 0:
+            return [message for _seq, message in self._lines]
+        earlier_errors = [message for seq, message in self._errors if seq < first_kept]
+        note = (
+            f'... {first_kept} earlier lines omitted '
+            f'(full log: {os.path.join(settings.PA_LOG_DIR, "auto_tickets_pa.log")}, run {self.run_id})'
+        )
+        return [note] + earlier_errors + [message for _seq, message in self._lines]
@@ -0,0 +1,22 @@
+"""
+Whether the default Django cache is shared between processes.
+
+Queued EOMS task credentials and status versions, the worker heartbeat and
+the CAS session store all hand state from one process to another through
+the cache.  Without ``REDIS_URL`` the settings fall back to
+``LocMemCache``, which is private to each Gunicorn worker and to each
+``manage.py`` worker process, so those features have to keep to their
+single-process behaviour.
+"""
+from django.conf import settings
+
+_PROCESS_LOCAL_BACKENDS = frozenset({
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+})
+
+
+def is_shared(alias='default'):
+    """True when ``alias`` is backed by a store every process sees (Redis, Memcached, DB, files)."""
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    return bool(backend) and backend not in _PROCESS_LOCAL_BACKENDS
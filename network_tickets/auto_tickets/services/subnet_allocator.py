@@ -0,0 +1,96 @@
+"""
+Subnet reservation for IP applications.
+
+Each (location, usage) pair allocates from one parent pool.  The free block
+is chosen by ``tools.generate_subnet`` (first-fit over the allocated ranges)
+and the row is created inside the same transaction, after locking the pool's
+``SubnetPool`` row with ``select_for_update``: concurrent requests for the
+same pool queue up on that one row, so the second one reads the first one's
+allocation instead of picking an overlapping block (the unique ``subnet``
+column alone does not stop 10.0.192.0/29 and 10.0.192.0/28 from both being
+saved).  A collision on the pool row's first insert, a MySQL deadlock or a
+lock wait timeout rolls the transaction back and is retried.
+
+There is no persistent free-space index: each allocation reads the pool's
+existing rows and ``generate_subnet`` sorts and sweeps them, O(n log n) in the
+number of blocks already allocated, all while the pool row is locked.
+"""
+import logging
+
+from django.db import IntegrityError, OperationalError, transaction
+
+from auto_tickets.models import IP_Application, SubnetPool
+from auto_tickets.tools import generate_subnet
+
+logger = logging.getLogger(__name__)
+
+# (location, usage) -> parent network
+PARENT_POOLS = {
+    ('MITA', 'Traffic'): '10.1.96.0/19',
+    ('MITA', 'OAM'): '10.0.192.0/21',
+    ('GNC', 'Traffic'): '10.1.1.0/21',
+    ('GNC', 'OAM'): '10.0.208.0/21',
+    ('Taiping', 'Traffic'): '10.1.192.0/18',
+    ('Taiping', 'OAM'): '10.0.200.0/21',
+}
+
+_MAX_ATTEMPTS = 3
+
+# MySQL: ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK
+_RETRYABLE_MYSQL_ERRORS = (1205, 1213)
+
+
+def get_parent_pool(location, usage):
+    """Parent network for a location / usage; anything other than Traffic uses the OAM pool."""
+    return PARENT_POOLS.get((location, usage if usage == 'Traffic' else 'OAM'))
+
+
+def _is_lock_conflict(error):
+    """True for an OperationalError worth retrying (deadlock / lock wait timeout)."""
+    return bool(error.args) and error.args[0] in _RETRYABLE_MYSQL_ERRORS
+
+
+def _lock_pool(parent_network):
+    """Lock (creating on first use) the pool's SubnetPool row until the transaction ends."""
+    SubnetPool.objects.select_for_update().get_or_create(network=parent_network)
+
+
+def allocate_subnet(location, usage, number, description='', staff_number=None):
+    """
+    Reserve the first free subnet for ``number`` hosts and save the IP_Application row.
+
+    Returns:
+        IP_Application: the created row, or None when the pool is full / unknown.
+
+    Raises:
+        ValueError: If ``number`` does not fit in the pool (see generate_subnet).
+    """
+    parent_network = get_parent_pool(location, usage)
+    if parent_network is None:
+        return None
+
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                _lock_pool(parent_network)
+                existing = IP_Application.objects.filter(location=location, usage=usage)
+                existing_subnets = [network for network in (app.network() for app in existing) if network]
+
+                subnet = generate_subnet(parent_network, int(number), existing_subnets)
+                if subnet is None:
+                    return None
+                return IP_Application.objects.create(
+                    location=location,
+                    usage=usage,
+                    number=int(number),
+                    subnet=str(subnet),
+                    description=description,
+                    staff_number=staff_number,
+                )
+        except IntegrityError:
+            logger.warning('Subnet allocation collided for %s/%s (attempt %s), retrying', location, usage, attempt)
+        except OperationalError as e:
+            if not _is_lock_conflict(e) or attempt == _MAX_ATTEMPTS:
+                raise
+            logger.warning('Subnet allocation lock conflict for %s/%s (attempt %s), retrying: %s', location, usage, attempt, e)
+    return None
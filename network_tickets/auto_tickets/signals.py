@@ -1,10 +1,11 @@
 import logging
 
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from auto_tickets.itsr_file_utils import delete_attachments_for_ticket_number, get_itsr_files_dir
-from auto_tickets.models import ITSR_Network
+from auto_tickets.models import IPDB, ITSR_Network
+from auto_tickets.services import ipdb_index
 
 logger = logging.getLogger(__name__)
 
@@ -18,3 +19,9 @@ def delete_itsr_files_when_ticket_deleted(sender, instance, **kwargs):
             n,
             instance.itsr_ticket_number,
         )
+
+
+@receiver(post_save, sender=IPDB)
+@receiver(post_delete, sender=IPDB)
+def invalidate_ipdb_index(sender, instance, **kwargs):
+    ipdb_index.invalidate()
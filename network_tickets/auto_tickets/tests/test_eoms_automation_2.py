@@ -0,0 +1,268 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+
+from auto_tickets.models import EOMS_Tickets
+from auto_tickets.views.ITSR_Tools import eoms_automation_2
+
+_CAS_LOGIN_PAGE = (
+    '<!DOCTYPE html><html><head><link rel="stylesheet" href="/cas/themes/cmhk/cas.css"></head>'
+    '<body><form action="/cas/login">' + " " * 200 + "</form></body></html>"
+)
+_REQUESTED_TO = {dept["requested_to"]: name for name, dept in eoms_automation_2.DEPARTMENTS.items()}
+
+
+class FakeApi:
+    """
+    Stands in for EOmsClient / EomsHttpClient: records calls and answers startWorkflow
+    from ``workflow`` (one response, or a dict of responses per department).
+    """
+
+    format_attachment = staticmethod(eoms_automation_2.EOmsClient.format_attachment)
+
+    def __init__(self, workflow=None, calls=None, def_id="1000", login_id="login-1"):
+        self.workflow = workflow if workflow is not None else {"result": 1, "data": {"instId": "9001"}}
+        self.calls = calls if calls is not None else []
+        self.def_id = def_id
+        self.login_id = login_id
+
+    async def async_upload_file(self, file_path):
+        self.calls.append(("upload", file_path))
+        return {"success": True, "fileId": "f-1", "fileName": os.path.basename(file_path)}
+
+    async def async_start_workflow(self, config, def_id=None):
+        department = _REQUESTED_TO.get(config.get("RequestedTo"))
+        self.calls.append(("start", def_id))
+        if "result" in self.workflow or "session_expired" in self.workflow:
+            return self.workflow
+        return self.workflow[department]
+
+    def refresh_if_due(self, username):
+        pass
+
+
+class FakeLoginClient(FakeApi):
+    """EOmsClient replacement: ``login`` is what login_and_capture_headers returns."""
+
+    def __init__(self, login, workflow=None):
+        super().__init__(workflow)
+        self.login = login
+        self.closed = False
+
+    async def login_and_capture_headers(self, **kwargs):
+        self.calls.append(("login", kwargs.get("resume_state")))
+        return self.login
+
+    async def close(self, discard=False):
+        self.closed = True
+
+
+class SubmitTicketTests(unittest.TestCase):
+    def setUp(self):
+        saving = patch.object(EOMS_Tickets.objects, "create")
+        saving.start()
+        self.addCleanup(saving.stop)
+
+    def test_hook_runs_before_start_workflow(self):
+        calls = []
+
+        async def on_workflow_start(department):
+            calls.append(("sent", department))
+
+        api = FakeApi(calls=calls)
+        result = asyncio.run(eoms_automation_2._submit_ticket(
+            api, "1000", {"target_department": "SN", "file_path": "/tmp/sn.xlsx"}, on_workflow_start,
+        ))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["inst_id"], "9001")
+        self.assertEqual(calls, [("upload", "/tmp/sn.xlsx"), ("sent", "SN"), ("start", "1000")])
+
+    def test_failing_hook_keeps_the_request_unsent(self):
+        async def on_workflow_start(department):
+            raise RuntimeError("database unavailable")
+
+        api = FakeApi()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(eoms_automation_2._submit_ticket(api, "1000", {"target_department": "SN"}, on_workflow_start))
+        self.assertNotIn(("start", "1000"), api.calls)
+
+
+class CreateTicketsTests(unittest.TestCase):
+    TICKETS = [
+        {"target_department": "Cloud", "file_path": "/tmp/cloud.xlsx"},
+        {"target_department": "SN", "file_path": "/tmp/sn.xlsx"},
+    ]
+
+    def setUp(self):
+        session_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(session_dir.cleanup)
+        overrides = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            EOMS_SESSION_DIR=session_dir.name,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        saving = patch.object(EOMS_Tickets.objects, "create")
+        saving.start()
+        self.addCleanup(saving.stop)
+
+    def _create(self, http_client, login_client=None, **kwargs):
+        with patch.object(eoms_automation_2.EomsHttpClient, "from_cached_session", return_value=http_client), \
+                patch.object(eoms_automation_2, "EOmsClient", return_value=login_client) as login_factory:
+            results = asyncio.run(eoms_automation_2.create_tickets(
+                self.TICKETS, username="user1", password="secret", **kwargs,
+            ))
+        return results, login_factory
+
+    def test_one_department_fails_while_the_other_is_created(self):
+        sent = []
+
+        async def on_workflow_start(department):
+            sent.append(department)
+
+        http_client = FakeApi({
+            "Cloud": {"result": 1, "data": {"instId": "C-1"}},
+            "SN": {"result": 0, "message": "Requested-to group is closed"},
+        })
+        results, login_factory = self._create(http_client, on_workflow_start=on_workflow_start)
+
+        self.assertTrue(results["Cloud"]["success"])
+        self.assertEqual(results["Cloud"]["inst_id"], "C-1")
+        self.assertFalse(results["SN"]["success"])
+        self.assertEqual(results["SN"]["error"], "Requested-to group is closed")
+        self.assertEqual(sorted(sent), ["Cloud", "SN"])
+        # both went out on the one cached session: no browser login
+        login_factory.assert_not_called()
+        self.assertEqual([call for call in http_client.calls if call[0] == "start"], [("start", "1000")] * 2)
+
+    def test_expired_cached_session_falls_back_to_one_browser_login(self):
+        http_client = FakeApi({"result": 0, "session_expired": True, "message": "CAS login page"})
+        login_client = FakeLoginClient({"def_id": "2000"})
+        with patch.object(eoms_automation_2, "_invalidate_session_cache") as invalidate:
+            results, login_factory = self._create(http_client, login_client)
+
+        self.assertTrue(all(result["success"] for result in results.values()))
+        invalidate.assert_called_with("user1")
+        login_factory.assert_called_once()
+        self.assertEqual([call for call in login_client.calls if call[0] == "login"], [("login", None)])
+        self.assertEqual([call for call in login_client.calls if call[0] == "start"], [("start", "2000")] * 2)
+        self.assertTrue(login_client.closed)
+
+    def test_captcha_answer_is_given_to_every_department(self):
+        login_client = FakeLoginClient({"need_captcha": True, "message": "SMS code sent", "resume_token": "tok-1"})
+        results, _ = self._create(None, login_client)
+
+        for department in ("Cloud", "SN"):
+            self.assertTrue(results[department]["need_captcha"])
+            self.assertEqual(results[department]["resume_token"], "tok-1")
+        self.assertFalse(any(call[0] == "start" for call in login_client.calls))
+
+
+def _respond(text, status=200):
+    """HTTPAdapter.send replacement answering every request with ``text``; sent requests are in .sent."""
+    def send(adapter, request, **kwargs):
+        send.sent.append(request)
+        response = requests.Response()
+        response.status_code = status
+        response._content = text.encode()
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    send.sent = []
+    return send
+
+
+class EomsHttpClientTests(unittest.TestCase):
+    STATE = {"cookies": [{"name": "JSESSIONID", "value": "abc", "domain": "eoms2.cmhktry.com", "path": "/"}]}
+
+    def setUp(self):
+        session_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(session_dir.cleanup)
+        overrides = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            EOMS_SESSION_DIR=session_dir.name,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(eoms_automation_2._drop_http_session, "user1")
+        saving = patch.object(EOMS_Tickets.objects, "create")
+        saving.start()
+        self.addCleanup(saving.stop)
+
+    def _cache_session(self, login_id="login-1"):
+        eoms_automation_2._save_session_cache(
+            "user1", self.STATE, "1000",
+            {"Authorization": "Bearer t-1", "Cookie": "stale=1"},
+            login_id=login_id,
+        )
+
+    def test_cached_cookies_and_replay_headers_are_sent(self):
+        self._cache_session()
+        send = _respond('{"result": 1, "data": {"instId": "9001"}}')
+        with patch.object(HTTPAdapter, "send", autospec=True, side_effect=send):
+            result = eoms_automation_2.EomsHttpClient.from_cached_session("user1").start_workflow({"Title": "t"})
+
+        self.assertEqual(result["data"]["instId"], "9001")
+        [request] = send.sent
+        self.assertEqual(request.headers["Cookie"], "JSESSIONID=abc")
+        self.assertEqual(request.headers["Authorization"], "Bearer t-1")
+        self.assertIn("defId=1000", request.body)
+
+    def test_cas_login_page_falls_back_to_browser_login(self):
+        self._cache_session()
+        login_client = FakeLoginClient({"def_id": "2000"})
+        send = _respond(_CAS_LOGIN_PAGE)
+        with patch.object(HTTPAdapter, "send", autospec=True, side_effect=send), \
+                patch.object(eoms_automation_2, "EOmsClient", return_value=login_client):
+            results = asyncio.run(eoms_automation_2.create_tickets(
+                [{"target_department": "Cloud"}, {"target_department": "SN"}], username="user1", password="secret",
+            ))
+
+        self.assertEqual(len(send.sent), 2)
+        self.assertTrue(all(result["success"] for result in results.values()))
+        self.assertIsNone(eoms_automation_2.eoms_session_store.load_session("user1"))
+        self.assertEqual([call for call in login_client.calls if call[0] == "start"], [("start", "2000")] * 2)
+
+    def test_new_login_closes_the_old_sessions(self):
+        self._cache_session("login-1")
+        with eoms_automation_2._http_session_for("user1", eoms_automation_2._load_cached_meta("user1")) as old:
+            pass
+
+        self._cache_session("login-2")
+        with patch.object(requests.Session, "close", autospec=True) as close:
+            with eoms_automation_2._http_session_for("user1", eoms_automation_2._load_cached_meta("user1")) as new:
+                pass
+
+        self.assertIsNot(new, old)
+        close.assert_called_once_with(old)
+
+    def test_concurrent_calls_get_their_own_session(self):
+        self._cache_session()
+        meta = eoms_automation_2._load_cached_meta("user1")
+        with eoms_automation_2._http_session_for("user1", meta) as first:
+            with eoms_automation_2._http_session_for("user1", meta) as second:
+                self.assertIsNot(first, second)
+        # both went back to the pool for the next tickets
+        with eoms_automation_2._http_session_for("user1", meta) as reused:
+            self.assertIn(reused, (first, second))
+
+
+if __name__ == "__main__":
+    unittest.main()
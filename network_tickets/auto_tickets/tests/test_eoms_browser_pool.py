@@ -0,0 +1,138 @@
+import unittest
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.services import eoms_browser_pool
+from auto_tickets.services.eoms_browser_pool import BrowserPool, BrowserPoolTimeout
+
+
+class FakeContext:
+    def __init__(self, storage_state=None):
+        self.storage_state = storage_state
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(options.get("storage_state"))
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class BrowserPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.browsers = []
+
+    def _pool(self, **kwargs):
+        async def launch():
+            browser = FakeBrowser()
+            self.browsers.append(browser)
+            return browser
+
+        return BrowserPool(launch, **kwargs)
+
+    def test_browser_and_spare_context_are_reused(self):
+        async def scenario():
+            pool = self._pool(size=1, max_uses=10)
+            first = await pool.acquire()
+            await first.release()
+            second = await pool.acquire()
+            self.assertIs(second.browser, first.browser)
+            self.assertTrue(first.context.closed)
+            # the context handed out second was pre-created on release
+            self.assertIs(second.context, first.browser.contexts[1])
+            await second.release()
+            return pool
+
+        pool = asyncio.run(scenario())
+        self.assertEqual(pool.launches, 1)
+
+    def test_storage_state_gets_its_own_context(self):
+        async def scenario():
+            pool = self._pool(size=1)
+            await (await pool.acquire()).release()
+            lease = await pool.acquire(storage_state="/tmp/state.json")
+            self.assertEqual(lease.context.storage_state, "/tmp/state.json")
+            await lease.release()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(self.browsers), 1)
+
+    def test_recycled_after_max_uses(self):
+        async def scenario():
+            pool = self._pool(size=1, max_uses=2)
+            for _ in range(3):
+                await (await pool.acquire()).release()
+            return pool
+
+        pool = asyncio.run(scenario())
+        self.assertEqual(pool.launches, 2)
+        self.assertTrue(self.browsers[0].closed)
+        self.assertFalse(self.browsers[1].closed)
+
+    def test_crashed_or_discarded_browser_is_replaced(self):
+        async def scenario():
+            pool = self._pool(size=1)
+            lease = await pool.acquire()
+            await lease.release()
+            lease.browser.connected = False
+            replacement = await pool.acquire()
+            self.assertIsNot(replacement.browser, lease.browser)
+            await replacement.release(discard=True)
+            self.assertTrue(replacement.browser.closed)
+            await (await pool.acquire()).release()
+            return pool
+
+        pool = asyncio.run(scenario())
+        self.assertEqual(pool.launches, 3)
+
+    def test_size_bounds_concurrent_leases(self):
+        async def scenario():
+            pool = self._pool(size=1, acquire_timeout=0.05)
+            lease = await pool.acquire()
+            with self.assertRaises(BrowserPoolTimeout):
+                await pool.acquire()
+            waiter = asyncio.ensure_future(pool.acquire())
+            await asyncio.sleep(0)
+            await lease.release()
+            await lease.release()
+            second = await waiter
+            self.assertIs(second.browser, lease.browser)
+            await second.release()
+
+        asyncio.run(scenario())
+
+    def test_pool_only_available_on_its_loop(self):
+        async def current_pool():
+            return eoms_browser_pool.get_pool()
+
+        self.assertIsNone(asyncio.run(current_pool()))
+        self.assertIsNone(eoms_browser_pool.get_pool())
+        self.assertIsInstance(eoms_browser_pool.run_sync(current_pool(), timeout=5), BrowserPool)
+
+
+if __name__ == "__main__":
+    unittest.main()
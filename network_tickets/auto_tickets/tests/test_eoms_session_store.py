@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from auto_tickets.services import eoms_session_store
+
+STATE = {"cookies": [{"name": "SESSION", "value": "abc", "domain": "eoms2.cmhktry.com", "path": "/"}], "origins": []}
+
+
+class EomsSessionStoreTests(unittest.TestCase):
+    def setUp(self):
+        session_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(session_dir.cleanup)
+        self.session_dir = session_dir.name
+        overrides = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            EOMS_SESSION_DIR=self.session_dir,
+            EOMS_SESSION_TTL=60,
+            EOMS_SESSION_REFRESH_AFTER=30,
+            EOMS_LOGIN_LOCK_TIMEOUT=60,
+            EOMS_LOGIN_LOCK_WAIT=1,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+
+    def test_session_round_trip_and_invalidate(self):
+        saved = eoms_session_store.save_session("User.One", STATE, "1000", {"user-agent": "UA"})
+        entry = eoms_session_store.load_session("user.one")
+        self.assertEqual(entry["storage_state"], STATE)
+        self.assertEqual(entry["def_id"], "1000")
+        self.assertEqual(entry["headers"], {"user-agent": "UA"})
+        self.assertEqual(entry["login_id"], saved["login_id"])
+        eoms_session_store.invalidate_session("User.One")
+        self.assertIsNone(eoms_session_store.load_session("User.One"))
+
+    def test_refresh_keeps_login_id_and_is_claimed_once(self):
+        first = eoms_session_store.save_session("u1", STATE, "1000")
+        self.assertFalse(eoms_session_store.needs_refresh(first))
+        self.assertTrue(eoms_session_store.needs_refresh(dict(first, saved_at=time.time() - 31)))
+
+        self.assertTrue(eoms_session_store.claim_refresh("u1"))
+        self.assertFalse(eoms_session_store.claim_refresh("u1"))
+        eoms_session_store.release_refresh("u1")
+        self.assertTrue(eoms_session_store.claim_refresh("u1"))
+
+        refreshed = eoms_session_store.save_session("u1", STATE, "1000", login_id=first["login_id"])
+        self.assertEqual(refreshed["login_id"], first["login_id"])
+
+    def test_resume_state(self):
+        self.assertTrue(eoms_session_store.save_resume_state("token-1", STATE))
+        self.assertEqual(eoms_session_store.load_resume_state("token-1"), STATE)
+        eoms_session_store.delete_resume_state("token-1")
+        self.assertIsNone(eoms_session_store.load_resume_state("token-1"))
+
+    def test_login_lock_is_single_flight(self):
+        order = []
+
+        async def login(name, hold):
+            async with eoms_session_store.login_lock("u1", poll_interval=0.01) as acquired:
+                order.append((name, "in", acquired))
+                await asyncio.sleep(hold)
+                order.append((name, "out", acquired))
+
+        async def scenario():
+            await asyncio.gather(login("a", 0.05), login("b", 0))
+
+        asyncio.run(scenario())
+        self.assertEqual(order, [("a", "in", True), ("a", "out", True), ("b", "in", True), ("b", "out", True)])
+
+    def test_login_lock_wait_times_out(self):
+        async def scenario():
+            async with eoms_session_store.login_lock("u1"):
+                started = time.monotonic()
+                async with eoms_session_store.login_lock("u1", wait=0.05, poll_interval=0.01) as acquired:
+                    self.assertFalse(acquired)
+                self.assertLess(time.monotonic() - started, 1)
+                # the timed-out waiter must not release the holder's lock
+                self.assertIsNotNone(eoms_session_store._store().get(eoms_session_store._user_key("login", "u1")))
+            self.assertIsNone(eoms_session_store._store().get(eoms_session_store._user_key("login", "u1")))
+
+        asyncio.run(scenario())
+
+    def test_per_process_cache_falls_back_to_host_files(self):
+        # LocMem is private to each worker: sessions go to EOMS_SESSION_DIR instead
+        self.assertIsInstance(eoms_session_store._store(), eoms_session_store.FileStore)
+        eoms_session_store.save_session("u1", STATE, "1000")
+        self.assertIsNone(cache.get(eoms_session_store._user_key("session", "u1")))
+
+        other_worker = eoms_session_store.FileStore(self.session_dir)
+        self.assertEqual(other_worker.get(eoms_session_store._user_key("session", "u1"))["storage_state"], STATE)
+        for name in os.listdir(self.session_dir):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.session_dir, name)).st_mode), 0o600)
+
+    def test_file_store_add_is_exclusive_until_expiry(self):
+        store = eoms_session_store.FileStore(self.session_dir)
+        self.assertTrue(store.add("k", "a", 60))
+        self.assertFalse(store.add("k", "b", 60))
+        self.assertEqual(store.get("k"), "a")
+        store.set("k", "c", -1)
+        self.assertIsNone(store.get("k"))
+        self.assertTrue(store.add("k", "d", 60))
+
+    def test_shared_cache_is_used_directly(self):
+        with override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": self.session_dir}},
+        ):
+            self.assertIs(eoms_session_store._store(), cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
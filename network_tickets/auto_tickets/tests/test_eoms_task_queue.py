@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from auto_tickets.services import eoms_task_queue
+
+
+class EomsTaskQueueTests(unittest.TestCase):
+    def setUp(self):
+        overrides = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            EOMS_TASK_RETRY_DELAY=15,
+            EOMS_TASK_CREDENTIALS_TTL=60,
+            EOMS_STATUS_POLL_INTERVAL=0.01,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+
+    def test_queue_needs_shared_cache_and_live_worker(self):
+        with override_settings(EOMS_TASK_QUEUE=True):
+            eoms_task_queue.worker_heartbeat()
+            # LocMem: the worker process could never read the stored credentials
+            self.assertFalse(eoms_task_queue.enabled())
+
+            with tempfile.TemporaryDirectory() as location, override_settings(
+                CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}},
+            ):
+                self.assertFalse(eoms_task_queue.enabled())
+                eoms_task_queue.worker_heartbeat()
+                self.assertTrue(eoms_task_queue.enabled())
+
+        with override_settings(EOMS_TASK_QUEUE=False):
+            self.assertFalse(eoms_task_queue.enabled())
+
+    def test_retry_delay_doubles_per_failed_run(self):
+        self.assertEqual([eoms_task_queue.retry_delay(n) for n in (1, 2, 3)], [15, 30, 60])
+
+    def test_credentials_round_trip(self):
+        self.assertTrue(eoms_task_queue.store_credentials("t1", username="u", password="p", resume_token=None))
+        self.assertEqual(
+            eoms_task_queue.load_credentials("t1"),
+            {"username": "u", "password": "p", "captcha_code": "", "resume_token": ""},
+        )
+        eoms_task_queue.clear_credentials("t1")
+        self.assertIsNone(eoms_task_queue.load_credentials("t1"))
+
+    def test_enqueue_creates_nothing_without_cache(self):
+        with patch.object(eoms_task_queue.cache, "set", side_effect=ConnectionError("redis down")):
+            self.assertIsNone(eoms_task_queue.enqueue("t1", "SN", "", "/tmp/x.xlsx", "", username="u", password="p"))
+
+    def _use_shared_cache(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        overrides = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location.name}},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_wait_for_change_returns_once_version_moves(self):
+        self._use_shared_cache()
+        eoms_task_queue.bump_version("t1")
+        seen = eoms_task_queue.status_version("t1")
+        self.assertIsNotNone(seen)
+        self.assertEqual(asyncio.run(eoms_task_queue.wait_for_change("t1", "stale", 5)), seen)
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(eoms_task_queue.wait_for_change("t1", seen, 0.05)), seen)
+        self.assertLess(time.monotonic() - started, 1)
+
+        timer = threading.Timer(0.05, eoms_task_queue.bump_version, args=("t1",))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertNotEqual(asyncio.run(eoms_task_queue.wait_for_change("t1", seen, 5)), seen)
+
+    def test_wait_for_change_does_not_block_without_cache(self):
+        self._use_shared_cache()
+        with patch.object(eoms_task_queue.cache, "aget", side_effect=ConnectionError("redis down")):
+            self.assertIsNone(asyncio.run(eoms_task_queue.wait_for_change("t1", "v1", 5)))
+
+    def test_no_versions_with_a_per_process_cache(self):
+        # LocMem: the task may be updated in another worker process than the one holding the poll
+        eoms_task_queue.bump_version("t1")
+        self.assertIsNone(eoms_task_queue.status_version("t1"))
+        started = time.monotonic()
+        self.assertIsNone(asyncio.run(eoms_task_queue.wait_for_change("t1", "v1", 5)))
+        self.assertLess(time.monotonic() - started, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
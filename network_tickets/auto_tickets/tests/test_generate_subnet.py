@@ -0,0 +1,67 @@
+import ipaddress
+import random
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.tools import generate_subnet
+from django.db import OperationalError
+
+from auto_tickets.services.subnet_allocator import _is_lock_conflict, get_parent_pool
+
+
+def _scan(network, prefix_length, existing):
+    # Reference: the original candidate-by-candidate walk
+    for subnet in network.subnets(new_prefix=prefix_length):
+        if not any(subnet.overlaps(other) for other in existing):
+            return subnet
+    return None
+
+
+class GenerateSubnetTests(unittest.TestCase):
+    def test_first_fit_skips_allocated_blocks(self):
+        existing = ["10.0.192.0/29", "10.0.192.8/29", "10.0.192.32/27"]
+        self.assertEqual(str(generate_subnet("10.0.192.0/21", 6, existing)), "10.0.192.16/29")
+        self.assertEqual(str(generate_subnet("10.0.192.0/21", 20, existing)), "10.0.192.64/27")
+
+    def test_full_pool_returns_none(self):
+        self.assertIsNone(generate_subnet("10.0.192.0/24", 6, ["10.0.192.0/24"]))
+
+    def test_invalid_number_raises(self):
+        with self.assertRaises(ValueError):
+            generate_subnet("10.0.192.0/24", 0)
+        with self.assertRaises(ValueError):
+            generate_subnet("10.0.192.0/24", 300)
+
+    def test_matches_candidate_scan(self):
+        rng = random.Random(7)
+        parent = ipaddress.ip_network("10.1.96.0/22")
+        for _ in range(500):
+            existing = [
+                ipaddress.ip_network((int(parent.network_address) + rng.randint(-1024, 2048), rng.randint(20, 30)), strict=False)
+                for _ in range(rng.randint(0, 25))
+            ]
+            number = rng.choice([1, 6, 14, 30, 60, 120, 250])
+            prefix_length = 32 - (number + 2 - 1).bit_length()
+            self.assertEqual(generate_subnet(parent, number, existing), _scan(parent, prefix_length, existing))
+
+    def test_parent_pools(self):
+        self.assertEqual(get_parent_pool("Taiping", "Traffic"), "10.1.192.0/18")
+        self.assertEqual(get_parent_pool("GNC", "OAM"), "10.0.208.0/21")
+        self.assertIsNone(get_parent_pool("Elsewhere", "Traffic"))
+
+    def test_only_lock_conflicts_are_retried(self):
+        self.assertTrue(_is_lock_conflict(OperationalError(1213, "Deadlock found when trying to get lock")))
+        self.assertTrue(_is_lock_conflict(OperationalError(1205, "Lock wait timeout exceeded")))
+        self.assertFalse(_is_lock_conflict(OperationalError(2006, "MySQL server has gone away")))
+
+
+if __name__ == "__main__":
+    unittest.main()
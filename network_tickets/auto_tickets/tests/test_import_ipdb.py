@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import nullcontext
+from unittest.mock import patch
+
+import openpyxl
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.management.commands import import_ipdb
+from auto_tickets.management.commands.import_ipdb import Command
+from auto_tickets.models import IPDB
+
+
+class ImportIpdbSheetTests(unittest.TestCase):
+    def _read(self, rows, chunk_size=2):
+        wb = openpyxl.Workbook()
+        for row in rows:
+            wb.active.append(row)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ipdb.xlsx")
+            wb.save(path)
+            ro = openpyxl.load_workbook(path, read_only=True)
+            errors = io.StringIO()
+            command = Command(stdout=io.StringIO(), stderr=errors)
+            try:
+                return command._read_sheet(ro.active, 1, chunk_size), errors.getvalue()
+            finally:
+                ro.close()
+
+    def test_normalizes_and_skips_bad_rows(self):
+        incoming, errors = self._read([
+            ("IP", "Mask", "Traffic/OAM", "Location", "Device"),
+            (" 10.1.192.0", " 255.255.192.0", "Traffic", "PrivateCloud-TP ", "M09-EXT-CORE-SW1"),
+            ("10.1.192.1", "255.255.192.0", "Traffic", "Bad", "PA"),
+            ("10.1.192.0", "255.255.255.0", "OAM", "Duplicate", "PA"),
+            (None, None, None, None, None),
+            ("10.51.203.0", "24", None, "SZ-VPN", "DMZ SW01"),
+        ])
+        self.assertEqual(list(incoming), ["10.1.192.0", "10.51.203.0"])
+        self.assertEqual(incoming["10.1.192.0"], {
+            "mask": "255.255.192.0", "traffic_oam": "Traffic", "location": "PrivateCloud-TP", "device": "M09-EXT-CORE-SW1",
+        })
+        self.assertEqual(incoming["10.51.203.0"]["traffic_oam"], "")
+        self.assertIn("Row 1: skipped invalid prefix IP / Mask", errors)
+        self.assertIn("Row 3: skipped invalid prefix", errors)
+        self.assertIn("Row 4: skipped duplicate prefix 10.1.192.0", errors)
+
+
+class ImportIpdbSyncTests(unittest.TestCase):
+    def test_missing_prefixes_are_deleted_without_per_row_signals(self):
+        wb = openpyxl.Workbook()
+        wb.active.append(("10.51.203.0", "24", "Traffic", "SZ-VPN", "DMZ SW01"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ipdb.xlsx")
+            wb.save(path)
+            with patch.object(IPDB.objects, "values_list") as current, \
+                    patch.object(IPDB.objects, "filter") as stale, \
+                    patch.object(IPDB.objects, "bulk_update"), \
+                    patch.object(IPDB.objects, "bulk_create") as bulk_create, \
+                    patch.object(import_ipdb.transaction, "atomic", return_value=nullcontext()), \
+                    patch.object(import_ipdb.transaction, "on_commit") as on_commit:
+                current.return_value.iterator.return_value = [(7, "10.1.192.0", "18", "Traffic", "TP", "SW1")]
+                Command(stdout=io.StringIO(), stderr=io.StringIO()).handle(
+                    file_path=path, sheet=None, min_row=1, chunk_size=1000, keep_missing=False, dry_run=False,
+                )
+
+        stale.assert_called_once_with(id__in=[7])
+        stale.return_value._raw_delete.assert_called_once_with(stale.return_value.db)
+        stale.return_value.delete.assert_not_called()
+        self.assertEqual([obj.ip for obj in bulk_create.call_args.args[0]], ["10.51.203.0"])
+        on_commit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.models import IPDB, IP_Application, network_range
+
+
+class NetworkRangeTests(unittest.TestCase):
+    def test_ipdb_range_uses_mask(self):
+        row = IPDB(ip="10.1.192.0", mask=" 255.255.192.0")
+        self.assertEqual(network_range(row.network()), (4, 0x0A01C000, 0x0A01FFFF))
+
+    def test_ipdb_invalid_network_has_no_range(self):
+        row = IPDB(ip="10.1.192.1", mask="255.255.192.0")
+        self.assertEqual(network_range(row.network()), (None, None, None))
+
+    def test_ip_application_ignores_host_bits(self):
+        row = IP_Application(subnet="10.244.0.5/29")
+        self.assertEqual(network_range(row.network()), (4, 0x0AF40000, 0x0AF40007))
+
+    def test_ip_application_ipv6_and_empty(self):
+        version, start, end = network_range(IP_Application(subnet="2001:db8::/64").network())
+        self.assertEqual(version, 6)
+        self.assertEqual(end - start, 2 ** 64 - 1)
+        self.assertEqual(network_range(IP_Application(subnet="").network()), (None, None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import datetime
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+
+from auto_tickets.models import IPDB
+from auto_tickets.services import ipdb_index
+from auto_tickets.services.ipdb_index import IPDBIndex, IPDBRecord, parse_ipdb_network
+
+
+def _record(pk, ip, mask, location, device="DMZ SW01", traffic_oam="Traffic"):
+    return IPDBRecord(pk, ip, mask, traffic_oam, location, device, parse_ipdb_network(ip, mask))
+
+
+class IPDBIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = IPDBIndex([
+            _record(1, "10.0.0.0", "255.0.0.0", "Supernet"),
+            _record(2, "10.1.0.0", "255.255.0.0", "PrivateCloud", "M09-CORE-SW01"),
+            _record(3, "10.1.192.0", " 255.255.192.0", "PrivateCloud-TP", "M09-EXT-CORE-SW1"),
+            _record(4, "10.51.203.0", "24", "SZ-VPN"),
+            _record(5, "10.51.203.0", "24", "Duplicate"),
+        ])
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(self.index.lookup("10.1.192.22").location, "PrivateCloud-TP")
+        self.assertEqual(self.index.lookup("10.1.5.5").location, "PrivateCloud")
+        self.assertEqual(self.index.lookup("10.200.0.1").location, "Supernet")
+
+    def test_returns_whole_record(self):
+        record = self.index.lookup("10.1.192.22")
+        self.assertEqual(record.device, "M09-EXT-CORE-SW1")
+        self.assertEqual(record.traffic_oam, "Traffic")
+        self.assertEqual(record.ip, "10.1.192.0")
+
+    def test_duplicate_prefix_keeps_oldest_row(self):
+        self.assertEqual(self.index.lookup("10.51.203.9").location, "SZ-VPN")
+
+    def test_subnet_input_prefers_containing_network(self):
+        self.assertEqual(self.index.lookup("10.1.200.0/24").location, "PrivateCloud-TP")
+        self.assertEqual(self.index.lookup("10.51.203.0/24").location, "SZ-VPN")
+
+    def test_subnet_input_falls_back_to_contained_network(self):
+        index = IPDBIndex([_record(1, "172.16.8.0", "255.255.255.0", "South Base", "PA")])
+        self.assertEqual(index.lookup("172.16.0.0/16").location, "South Base")
+
+    def test_unknown_and_invalid_inputs(self):
+        self.assertIsNone(self.index.lookup("192.168.1.1"))
+        self.assertIsNone(self.index.lookup("not-an-ip"))
+        self.assertIsNone(self.index.lookup(""))
+        self.assertIsNone(self.index.lookup(None))
+        self.assertEqual(self.index.lookup("\u200b10.1.5.5 ").location, "PrivateCloud")
+
+    def test_lookup_many_matches_single_lookups(self):
+        inputs = [
+            "10.1.192.22", "10.1.5.5", "10.200.0.1", "10.51.203.9", "192.168.1.1",
+            "10.1.200.0/24", "bad", "", "10.255.255.255", "11.0.0.0", "9.255.255.255",
+        ]
+        expected = [self.index.lookup(ip) for ip in inputs]
+        self.assertEqual(self.index.lookup_many(inputs), expected)
+
+    def test_lookup_many_on_empty_index(self):
+        self.assertEqual(IPDBIndex().lookup_many(["10.1.1.1", "10.0.0.0/8"]), [None, None])
+
+
+class IPDBVersionTests(unittest.TestCase):
+    def setUp(self):
+        overrides = override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _table(self, rows, last_id, changed):
+        return patch.object(IPDB.objects, "aggregate", return_value={"rows": rows, "last_id": last_id, "changed": changed})
+
+    def test_per_process_cache_reads_the_version_from_the_table(self):
+        changed = datetime.datetime(2026, 10, 17, 8, 0)
+        with self._table(3, 9, changed):
+            before = ipdb_index.get_ipdb_version()
+            # a signal in this process cannot reach the others: the stamp is not used
+            ipdb_index.invalidate()
+            self.assertEqual(ipdb_index.get_ipdb_version(), before)
+        with self._table(2, 9, changed):  # a row deleted elsewhere (import_ipdb)
+            self.assertNotEqual(ipdb_index.get_ipdb_version(), before)
+        with self._table(3, 9, changed + datetime.timedelta(seconds=1)):  # a row edited elsewhere
+            self.assertNotEqual(ipdb_index.get_ipdb_version(), before)
+
+    def test_shared_cache_uses_the_stamp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        with override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location.name},
+        }), patch.object(IPDB.objects, "aggregate") as aggregate:
+            before = ipdb_index.get_ipdb_version()
+            self.assertEqual(ipdb_index.get_ipdb_version(), before)
+            ipdb_index.invalidate()
+            self.assertNotEqual(ipdb_index.get_ipdb_version(), before)
+        aggregate.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
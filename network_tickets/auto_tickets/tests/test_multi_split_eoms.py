@@ -0,0 +1,149 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from auto_tickets.models import EomsTicketCreationTask
+from auto_tickets.views import multi_split
+
+
+class FakeSession(dict):
+    session_key = "session-1"
+    modified = False
+
+    def save(self):
+        pass
+
+
+def _run_combined(results, targets):
+    """Run _run_combined_ticket_creation with create_tickets answering ``results``; returns the row updates."""
+    with patch.object(multi_split, "create_tickets", new=Mock()), \
+            patch.object(multi_split.eoms_browser_pool, "run_sync", return_value=results), \
+            patch.object(multi_split.eoms_task_queue, "update_task") as update_task, \
+            patch.object(multi_split, "_eoms_clear_session_cooldown") as clear_cooldown, \
+            patch.object(multi_split, "_session_get_ticket_title", return_value=""), \
+            patch.object(multi_split, "_cleanup_session_file"):
+        multi_split._run_combined_ticket_creation("task-1", targets, "session-1", "user1", "secret", "", "")
+    cleared = sorted(call.args[1] for call in clear_cooldown.call_args_list)
+    return [call.kwargs for call in update_task.call_args_list], cleared
+
+
+class CombinedTicketCreationTests(unittest.TestCase):
+    TARGETS = {
+        "Cloud": {"file_path": "/tmp/cloud.xlsx", "requestor": "alice"},
+        "SN": {"file_path": "/tmp/sn.xlsx", "requestor": "bob"},
+    }
+
+    def setUp(self):
+        overrides = override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_partial_success_is_recorded_per_department(self):
+        updates, cleared = _run_combined({
+            "Cloud": {"success": True, "inst_id": "C-1", "message": "ok"},
+            "SN": {"success": False, "error": "Requested-to group is closed"},
+        }, self.TARGETS)
+
+        [final] = updates
+        self.assertEqual(final["status"], "error")
+        self.assertEqual(final["inst_id"], "C-1")
+        self.assertEqual(final["error"], "SN: Requested-to group is closed")
+        self.assertTrue(final["department_results"]["Cloud"]["success"])
+        self.assertEqual(final["department_results"]["SN"]["status"], "error")
+        self.assertEqual(cleared, ["Cloud", "SN"])
+
+    def test_captcha_pauses_the_whole_task(self):
+        captcha = {"success": False, "need_captcha": True, "error": "SMS code sent", "resume_token": "tok-1"}
+        updates, _ = _run_combined({"Cloud": dict(captcha), "SN": dict(captcha)}, self.TARGETS)
+
+        [final] = updates
+        self.assertEqual(final["status"], "need_captcha")
+        self.assertTrue(final["need_captcha"])
+        self.assertEqual(final["cas_resume_token"], "tok-1")
+        self.assertEqual({entry["status"] for entry in final["department_results"].values()}, {"need_captcha"})
+
+
+class CombinedTicketViewTests(unittest.TestCase):
+    def setUp(self):
+        overrides = override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        upload = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+        upload.close()
+        self.addCleanup(os.remove, upload.name)
+        self.sn_file = upload.name
+
+    def test_already_created_department_is_skipped(self):
+        request = RequestFactory().post(
+            "/api/create_eoms_ticket_combined/",
+            data=json.dumps({"username": "user1", "password": "secret"}),
+            content_type="application/json",
+        )
+        request.session = FakeSession(ticket_cloud_created=True, eoms_sn_file_path=self.sn_file, last_sn_requestor="bob")
+
+        with patch.object(multi_split.eoms_task_queue, "enabled", return_value=False), \
+                patch.object(multi_split.eoms_task_queue, "bump_version"), \
+                patch.object(EomsTicketCreationTask.objects, "create") as create_row, \
+                patch.object(multi_split.threading, "Thread") as thread:
+            response = multi_split._api_create_eoms_ticket_impl(request, combined=True)
+
+        self.assertTrue(json.loads(response.content)["success"])
+        self.assertEqual(create_row.call_args.kwargs["department"], "SN")
+        target, args = thread.call_args.kwargs["target"], thread.call_args.kwargs["args"]
+        self.assertIs(target, multi_split._run_combined_ticket_creation)
+        self.assertEqual(args[1], {"SN": {"file_path": self.sn_file, "requestor": "bob"}})
+        self.assertIn("ticket_creation_sn_timestamp", request.session)
+        self.assertNotIn("ticket_creation_cloud_timestamp", request.session)
+
+    def test_both_created_is_rejected(self):
+        request = RequestFactory().post(
+            "/api/create_eoms_ticket_combined/",
+            data=json.dumps({"username": "user1", "password": "secret"}),
+            content_type="application/json",
+        )
+        request.session = FakeSession(ticket_cloud_created=True, ticket_sn_created=True)
+        response = multi_split._api_create_eoms_ticket_impl(request, combined=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_status_poll_sets_created_flag_per_successful_department(self):
+        row = EomsTicketCreationTask(
+            task_id="task-1",
+            status="error",
+            success=False,
+            department="Cloud+SN",
+            department_results={
+                "Cloud": {"status": "completed", "success": True, "inst_id": "C-1", "file_path": "/tmp/cloud.xlsx"},
+                "SN": {"status": "error", "success": False, "error": "Requested-to group is closed"},
+            },
+        )
+        request = RequestFactory().get("/api/check_ticket_status/task-1/")
+        request.session = FakeSession(eoms_cloud_file_path="/tmp/cloud.xlsx", eoms_sn_file_path=self.sn_file)
+
+        with patch.object(EomsTicketCreationTask.objects, "get", return_value=row):
+            response = asyncio.run(multi_split.api_check_ticket_status(request, "task-1"))
+
+        task = json.loads(response.content)["task"]
+        self.assertEqual(task["departments"]["Cloud"]["inst_id"], "C-1")
+        self.assertNotIn("file_path", task["departments"]["Cloud"])
+        self.assertTrue(request.session["ticket_cloud_created"])
+        self.assertNotIn("eoms_cloud_file_path", request.session)
+        self.assertNotIn("ticket_sn_created", request.session)
+        self.assertEqual(request.session["eoms_sn_file_path"], self.sn_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
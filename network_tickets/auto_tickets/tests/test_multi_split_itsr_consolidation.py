@@ -15,6 +15,7 @@ django.setup()
 
 fake_eoms = types.ModuleType("auto_tickets.views.ITSR_Tools.eoms_automation_2")
 fake_eoms.create_ticket = lambda *args, **kwargs: None
+fake_eoms.create_tickets = lambda *args, **kwargs: None
 sys.modules["auto_tickets.views.ITSR_Tools.eoms_automation_2"] = fake_eoms
 
 fake_itsr_create = types.ModuleType("auto_tickets.views.ITSR_Tools.itsr_create")
@@ -26,7 +27,11 @@ fake_itsr_create.cancel_session = lambda *args, **kwargs: None
 fake_itsr_create.get_session_status = lambda *args, **kwargs: None
 sys.modules["auto_tickets.views.ITSR_Tools.itsr_create"] = fake_itsr_create
 
-from auto_tickets.views.multi_split import _process_itsr_file
+from auto_tickets.tools import RouteResult
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from auto_tickets.views.multi_split import _process_itsr_file, _process_sheet_cached
 
 
 def _build_sheet():
@@ -47,14 +52,13 @@ def _set_itsr_row(sheet, row_num, source_name, source_ip, dest_name, dest_ip, po
     sheet.cell(row=row_num, column=9).value = "ITSR Consolidation Test"
 
 
-def _fake_tickets_split(source_ip, destination_ip, return_list=True):
-    if return_list:
-        return ["ITSR"]
-    return f"{source_ip}->{destination_ip}"
+def _fake_route_pairs(pairs):
+    return {(source_ip, destination_ip): RouteResult(("ITSR",), f"{source_ip}->{destination_ip}")
+            for source_ip, destination_ip in pairs}
 
 
 class MultiSplitItsrConsolidationTests(unittest.TestCase):
-    @patch("auto_tickets.views.multi_split.tickets_split", side_effect=_fake_tickets_split)
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
     def test_consolidates_cfg_and_propagates_requestor(self, _mock_split):
         sheet = _build_sheet()
         _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-a", "10.20.20.1", "443", "TCP", "")
@@ -67,7 +71,7 @@ class MultiSplitItsrConsolidationTests(unittest.TestCase):
         self.assertEqual(data["itsr_dip_dic"][4], "10.20.20.1\n10.20.20.2")
         self.assertEqual(set(data["itsr_requestor_dic"].values()), {"S123456"})
 
-    @patch("auto_tickets.views.multi_split.tickets_split", side_effect=_fake_tickets_split)
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
     def test_cfg_efg_or_linking_merges_into_single_group(self, _mock_split):
         sheet = _build_sheet()
         _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-x", "10.20.20.1", "443", "TCP", "S123456")
@@ -80,7 +84,7 @@ class MultiSplitItsrConsolidationTests(unittest.TestCase):
         self.assertEqual(data["itsr_sip_dic"][4], "10.10.10.1\n10.10.10.2")
         self.assertEqual(data["itsr_dip_dic"][4], "10.20.20.1\n10.20.20.2")
 
-    @patch("auto_tickets.views.multi_split.tickets_split", side_effect=_fake_tickets_split)
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
     def test_non_matching_rows_remain_separate(self, _mock_split):
         sheet = _build_sheet()
         _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-a", "10.20.20.1", "443", "TCP", "S1")
@@ -90,6 +94,64 @@ class MultiSplitItsrConsolidationTests(unittest.TestCase):
 
         self.assertEqual(len(data["itsr_sip_dic"]), 2)
 
+    @patch("auto_tickets.views.multi_split.route_pair")
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
+    def test_pairs_are_routed_in_one_batch(self, mock_route_pairs, mock_route_pair):
+        sheet = _build_sheet()
+        _set_itsr_row(sheet, 4, "src-a", "10.10.10.1\n10.10.10.2", "dst-a", "10.20.20.1\n10.20.20.2", "443", "TCP", "S1")
+        _set_itsr_row(sheet, 5, "src-b", "10.10.10.3", "dst-b", "10.20.20.2", "8443", "TCP", "S1")
+
+        data = _process_itsr_file(sheet)
+
+        mock_route_pairs.assert_called_once()
+        mock_route_pair.assert_not_called()
+        self.assertIn("10.10.10.2->10.20.20.1", data["result_list"])
+        self.assertIn("10.10.10.3->10.20.20.2", data["result_list"])
+
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
+    def test_progress_reports_rows_per_group(self, _mock_split):
+        sheet = _build_sheet()
+        _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-a", "10.20.20.1", "443", "TCP", "S1")
+        _set_itsr_row(sheet, 5, "src-a", "10.10.10.1", "dst-b", "10.20.20.2", "443", "TCP", "S1")
+        _set_itsr_row(sheet, 6, "src-b", "10.10.10.2", "dst-c", "10.20.20.3", "8443", "TCP", "S1")
+        calls = []
+
+        data = _process_itsr_file(sheet, progress=lambda rows, results: calls.append((rows, len(results))))
+
+        self.assertEqual(calls, [(2, 2), (3, 3)])
+        self.assertEqual(len(data["result_list"]), 3)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    @patch("auto_tickets.services.ipdb_index.get_ipdb_version", return_value="db:1:1:")
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
+    def test_identical_upload_served_from_result_cache(self, mock_route_pairs, _mock_version):
+        cache.clear()
+        sheet = _build_sheet()
+        _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-a", "10.20.20.1", "443", "TCP", "S1")
+
+        first = _process_sheet_cached(sheet, "itsr")
+        second = _process_sheet_cached(sheet, "itsr")
+        self.assertEqual(first, second)
+        self.assertEqual(mock_route_pairs.call_count, 1)
+
+        sheet.cell(row=4, column=6).value = "8443"
+        _process_sheet_cached(sheet, "itsr")
+        self.assertEqual(mock_route_pairs.call_count, 2)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    @patch("auto_tickets.views.multi_split.route_pairs", side_effect=_fake_route_pairs)
+    def test_ipdb_change_in_another_process_misses_result_cache(self, mock_route_pairs):
+        cache.clear()
+        sheet = _build_sheet()
+        _set_itsr_row(sheet, 4, "src-a", "10.10.10.1", "dst-a", "10.20.20.1", "443", "TCP", "S1")
+
+        # per-process cache: the version comes from the IPDB table, not a stamp only this process bumps
+        with patch("auto_tickets.services.ipdb_index._table_version", return_value="db:1:1:"):
+            _process_sheet_cached(sheet, "itsr")
+        with patch("auto_tickets.services.ipdb_index._table_version", return_value="db:2:2:"):
+            _process_sheet_cached(sheet, "itsr")
+        self.assertEqual(mock_route_pairs.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test import RequestFactory
+
+from auto_tickets.models import MultiSplitJob
+from auto_tickets.views import multi_split
+
+
+class FakeSession(dict):
+    session_key = "session-1"
+    modified = False
+
+    def save(self):
+        pass
+
+
+class MultiSplitJobPageTests(unittest.TestCase):
+    def test_running_job_page_gets_the_job_to_poll(self):
+        request = RequestFactory().get("/multi_split/", {"job": "job-1"})
+        request.session = FakeSession()
+        job = MultiSplitJob(job_id="job-1", status="processing", rows_total=10, rows_processed=4)
+
+        with patch.object(MultiSplitJob.objects, "filter") as query, \
+                patch.object(multi_split, "render") as render:
+            query.return_value.first.return_value = job
+            multi_split.multi_split(request)
+
+        _request, template, context = render.call_args.args
+        self.assertEqual(template, "multi_split.html")
+        self.assertEqual(context["job"]["job_id"], "job-1")
+        self.assertEqual((context["job"]["rows_processed"], context["job"]["rows_total"]), (4, 10))
+        self.assertNotIn("result_url", context["job"])
+
+    def test_status_poll_sweeps_the_job_first(self):
+        request = RequestFactory().get("/api/multi_split_job/job-1/")
+        request.session = FakeSession()
+        job = MultiSplitJob(job_id="job-1", status="error", error="The multi_split worker stopped")
+
+        with patch.object(multi_split, "sweep_multi_split_jobs") as sweep, \
+                patch.object(MultiSplitJob.objects, "filter") as query:
+            query.return_value.first.return_value = job
+            response = multi_split.api_multi_split_job_status(request, "job-1")
+
+        sweep.assert_called_once_with("job-1")
+        self.assertIn(b"The multi_split worker stopped", response.content)
+
+
+class SweepMultiSplitJobsTests(unittest.TestCase):
+    def test_stale_jobs_are_requeued_only_while_they_can_run_again(self):
+        upload = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+        upload.close()
+        self.addCleanup(os.remove, upload.name)
+        stale_jobs = [
+            MultiSplitJob(job_id="retry", attempts=1, upload_path=upload.name),
+            MultiSplitJob(job_id="spent", attempts=2, upload_path=upload.name),
+            MultiSplitJob(job_id="gone", attempts=1, upload_path="/nonexistent/upload.xlsx"),
+        ]
+        updates = {}
+
+        def narrowed(job_id__in):
+            rows = MagicMock()
+            rows.update.return_value = len(job_id__in)
+            updates[tuple(job_id__in)] = rows.update
+            return rows
+
+        stale = MagicMock()
+        stale.only.return_value = stale_jobs
+        stale.filter.side_effect = narrowed
+        unclaimed = MagicMock()
+        unclaimed.update.return_value = 1
+        jobs = MagicMock()
+        jobs.filter.side_effect = [stale, unclaimed]
+
+        with patch.object(MultiSplitJob.objects, "all", return_value=jobs):
+            self.assertEqual(multi_split.sweep_multi_split_jobs(), 4)
+
+        updates[("retry",)].assert_called_once_with(status="queued", heartbeat_at=None)
+        self.assertEqual(updates[("spent", "gone")].call_args.kwargs["status"], "error")
+        self.assertEqual(unclaimed.update.call_args.kwargs["status"], "error")
+        self.assertEqual(jobs.filter.call_args_list[1].kwargs["status"], "queued")
+
+
+if __name__ == "__main__":
+    unittest.main()
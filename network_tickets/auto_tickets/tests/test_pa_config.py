@@ -0,0 +1,198 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.services.pa_config import ConfigPlan, ExistingConfig, _command_errors, apply_plan
+
+
+class FakeConnection:
+    def __init__(self, reject=()):
+        self.reject = reject
+        self.batches = []
+        self.in_config = False
+
+    def config_mode(self):
+        self.in_config = True
+
+    def exit_config_mode(self):
+        self.in_config = False
+
+    def send_config_set(self, commands, exit_config_mode=True):
+        self.batches.append(list(commands))
+        lines = []
+        for command in commands:
+            lines.append(f"admin@fw# {command}")
+            if any(word in command for word in self.reject):
+                lines.append("Invalid syntax.")
+            lines.append("")
+        return "\n".join(lines)
+
+
+class ConfigPlanTests(unittest.TestCase):
+    def _plan(self):
+        plan = ConfigPlan()
+        plan.add_row(4, "T100", {"Internal": ["10.1.1.1"]}, {"DMZ": ["10.2.2.2"]}, "TCP", ["443", "8443"])
+        plan.add_row(5, "T101", {"Internal": ["10.1.1.1"]}, {"DMZ": ["10.2.2.3"]}, "tcp", ["443"])
+        return plan
+
+    def test_shared_objects_are_planned_once(self):
+        commands = [command for command, _rows in self._plan().commands()]
+        self.assertEqual(len(commands), len(set(commands)))
+        self.assertEqual(commands.count("set address 10.1.1.1 description generated-by-netcare ip-netmask 10.1.1.1"), 1)
+        self.assertEqual(
+            commands.count("set service tcp-443-netcare description generated-by-netcare protocol tcp port 443"), 1
+        )
+        # addresses first, rule moves last
+        self.assertTrue(commands[0].startswith("set address "))
+        self.assertTrue(commands[-1].startswith("move rulebase security rules "))
+        self.assertIn("set address-group T100-src-row4-Internal static [ 10.1.1.1 ]", commands)
+        self.assertIn(
+            "set rulebase security rules T100-tcp8443-row4-Internal-DMZ-netcare source T100-src-row4-Internal "
+            "destination T100-dst-row4-DMZ from Internal to DMZ service tcp-8443-netcare application any "
+            "action allow description generated-by-netcare",
+            commands,
+        )
+
+    def test_icmp_and_unknown_protocol(self):
+        plan = ConfigPlan()
+        self.assertEqual(plan.add_row(4, "T1", {"A": ["10.0.0.1"]}, {"B": ["10.0.0.2"]}, "udp", ["ICMP"]), [])
+        self.assertTrue(any("rules icmp-netcare source T1-src-row4-A" in c for c, _ in plan.commands()))
+        self.assertEqual(
+            plan.add_row(5, "T2", {"A": ["10.0.0.1"]}, {"B": ["10.0.0.2"]}, "sctp", ["99"]),
+            ["Pls check the protocol and port in the excel file."],
+        )
+
+    def test_apply_batches_and_attributes_errors_to_rows(self):
+        plan = self._plan()
+        conn = FakeConnection(reject=("tcp-8443-netcare",))
+        errors = apply_plan(conn, plan, batch_size=5)
+        self.assertEqual(sum(len(batch) for batch in conn.batches), len(plan))
+        self.assertEqual(len(conn.batches), (len(plan) + 4) // 5)
+        self.assertFalse(conn.in_config)
+        self.assertEqual(set(errors), {4})
+        self.assertTrue(all("Invalid syntax." in message for message in errors[4]))
+
+    def test_shared_command_error_reported_for_every_row(self):
+        errors = apply_plan(FakeConnection(reject=("tcp port 443",)), self._plan())
+        self.assertEqual(set(errors), {4, 5})
+
+    def test_errors_follow_the_exact_prompt_echo(self):
+        address = "set address web description generated-by-netcare ip-netmask 10.0.0.1"
+        group = "set address-group g static [ web ]"
+        output = "\n".join([
+            f"admin@fw# {address}",
+            f"Validation Error: {group}",
+            "[edit]",
+            f"admin@fw# {group}",
+            "admin@fw# exit",
+            "Server error: not in config mode",
+        ])
+        self.assertEqual(_command_errors(output, [address, group]), {address: [f"Validation Error: {group}"]})
+
+    def test_empty_plan_sends_nothing(self):
+        conn = FakeConnection()
+        self.assertEqual(apply_plan(conn, ConfigPlan()), {})
+        self.assertEqual(conn.batches, [])
+
+
+EXISTING = """
+admin@fw# show address
+set address 10.1.1.1 ip-netmask 10.1.1.1
+set address 10.1.1.1 description generated-by-netcare
+set address web-vip ip-netmask 10.2.2.2/32
+set address-group T100-src-row4-Internal static [ 10.1.1.1 ]
+set address-group T100-src-row4-Internal description generated-by-netcare
+set address-group T100-dst-row4-DMZ static web-vip
+set service tcp-443-netcare protocol tcp port 443
+set service "https alt" protocol tcp port 8443
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare from Internal
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare to DMZ
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare source T100-src-row4-Internal
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare destination T100-dst-row4-DMZ
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare service tcp-443-netcare
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare application any
+set rulebase security rules T100-tcp443-row4-Internal-DMZ-netcare action allow
+set vsys vsys2 address 10.9.9.9 ip-netmask 10.9.9.9
+"""
+
+
+class ExistingConfigTests(unittest.TestCase):
+    def setUp(self):
+        self.existing = ExistingConfig.from_output(EXISTING)
+
+    def test_index_lookups(self):
+        self.assertEqual(self.existing.address_for("10.1.1.1"), "10.1.1.1")
+        self.assertEqual(self.existing.address_for("10.2.2.2"), "web-vip")
+        self.assertIsNone(self.existing.address_for("10.9.9.9"))
+        self.assertEqual(self.existing.service_for("tcp", "8443"), "https alt")
+        self.assertTrue(self.existing.allows(
+            "Internal", "DMZ", "tcp-443-netcare", "T100-src-row4-Internal", "T100-dst-row4-DMZ"
+        ))
+        self.assertFalse(self.existing.allows(
+            "DMZ", "Internal", "tcp-443-netcare", "T100-src-row4-Internal", "T100-dst-row4-DMZ"
+        ))
+
+    def _with_rule(self, *attrs):
+        """EXISTING plus an any -> any allow rule Internal -> DMZ on tcp-443-netcare with ``attrs`` lines."""
+        rule = "set rulebase security rules wide"
+        lines = [
+            f"{rule} from Internal", f"{rule} to DMZ", f"{rule} source any", f"{rule} destination any",
+            f"{rule} service tcp-443-netcare", f"{rule} action allow",
+        ] + [f"{rule} {attr}" for attr in attrs]
+        return ExistingConfig.from_output(EXISTING + "\n".join(lines))
+
+    def test_any_any_rule_covers_only_when_unrestricted(self):
+        args = ("Internal", "DMZ", "tcp-443-netcare", "T200-src-row9-Internal", "T200-dst-row9-DMZ")
+        self.assertTrue(self._with_rule("application any").allows(*args))
+        self.assertFalse(self._with_rule("application any", "disabled yes").allows(*args))
+        self.assertFalse(self._with_rule("application [ ssl web-browsing ]").allows(*args))
+        self.assertFalse(self._with_rule("application any", "negate-destination yes").allows(*args))
+        self.assertFalse(self._with_rule("application any", "source-user corp\\alice").allows(*args))
+
+    def test_disabled_or_app_restricted_rule_still_gets_a_rule(self):
+        for attrs in (("application any", "disabled yes"), ("application [ ssl web-browsing ]",)):
+            plan = ConfigPlan(self._with_rule(*attrs))
+            plan.add_row(9, "T200", {"Internal": ["10.1.1.1"]}, {"DMZ": ["10.2.2.2"]}, "tcp", ["443"])
+            self.assertIn(
+                "move rulebase security rules T200-tcp443-row9-Internal-DMZ-netcare top",
+                [command for command, _rows in plan.commands()],
+            )
+
+    def test_services_with_source_port_or_override_are_not_reused(self):
+        existing = ExistingConfig.from_output(
+            'set service "https src" protocol tcp port 9443 source-port 1024\n'
+            "set service https-long protocol tcp port 9443 override yes timeout 3600\n"
+        )
+        self.assertEqual(existing.restricted_services, {"https src", "https-long"})
+        self.assertIsNone(existing.service_for("tcp", "9443"))
+        self.assertEqual(self.existing.service_for("tcp", "443"), "tcp-443-netcare")
+
+    def test_rerun_of_applied_row_plans_nothing(self):
+        plan = ConfigPlan(self.existing)
+        plan.add_row(4, "T100", {"Internal": ["10.1.1.1"]}, {"DMZ": ["10.2.2.2"]}, "tcp", ["443"])
+        self.assertEqual(len(plan), 0)
+        conn = FakeConnection()
+        apply_plan(conn, plan)
+        self.assertEqual(conn.batches, [])
+
+    def test_partially_applied_row_plans_only_the_rest(self):
+        plan = ConfigPlan(self.existing)
+        plan.add_row(4, "T100", {"Internal": ["10.1.1.1"]}, {"DMZ": ["10.2.2.2"]}, "tcp", ["443", "8443"])
+        commands = [command for command, _rows in plan.commands()]
+        self.assertEqual(commands, [
+            "set rulebase security rules T100-tcp8443-row4-Internal-DMZ-netcare source T100-src-row4-Internal "
+            "destination T100-dst-row4-DMZ from Internal to DMZ service \"https alt\" application any "
+            "action allow description generated-by-netcare",
+            "move rulebase security rules T100-tcp8443-row4-Internal-DMZ-netcare top",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
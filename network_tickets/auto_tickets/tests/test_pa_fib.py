@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.services.pa_fib import FibSnapshot, parse_fib_routes, parse_interface_zones, save_run_snapshot
+from auto_tickets.services.pa_zones import ZoneLookupError, ZoneResolver
+
+FIB_OUTPUT = """
+virtual-router name: vr_vsys1
+route table:
+flags: u - up, h - host, g - gateway, e - ecmp, * - preferred path
+
+id      destination           nexthop                        flags  interface          mtu
+--------------------------------------------------------------------------------------------
+6       0.0.0.0/0             10.254.0.1                     ug     ethernet1/1        1500
+3       10.0.0.0/8            10.254.1.1                     ug     ethernet1/2        1500
+9       10.1.96.0/19          10.254.2.1                     ug     ethernet1/3        1500
+10      10.1.96.0/19          10.254.3.1                     ug*e   ethernet1/4        1500
+11      172.16.0.0/16         10.254.5.1                     g      ethernet1/5        1500
+"""
+
+INTERFACE_OUTPUT = """
+total configured logical interfaces: 5
+
+name                id    vsys zone             forwarding               tag    address
+------------------- ----- ---- ---------------- ------------------------ ------ ------------------
+ethernet1/1         16    1    Untrust          vr:vr_vsys1              0      203.0.113.2/30
+ethernet1/2         17    1    Internal         vr:vr_vsys1              0      10.254.1.2/30
+ethernet1/3         18    1    MITA             vr:vr_vsys1              0      10.254.2.2/30
+ethernet1/4         19    1    MITA-B           vr:vr_vsys1              0      10.254.3.2/30
+ethernet1/9         23    1                     vr:vr_vsys1              0      N/A
+"""
+
+
+class FibSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = FibSnapshot.from_outputs(FIB_OUTPUT, INTERFACE_OUTPUT, "vr_vsys1")
+
+    def test_parsers(self):
+        self.assertEqual(len(parse_fib_routes(FIB_OUTPUT)), 4)  # the down route is skipped
+        self.assertEqual(parse_interface_zones(INTERFACE_OUTPUT)["ethernet1/2"], "Internal")
+        self.assertNotIn("ethernet1/9", parse_interface_zones(INTERFACE_OUTPUT))
+
+    def test_longest_prefix_and_preferred_path(self):
+        self.assertEqual(self.snapshot.interface_for("10.1.100.5"), "ethernet1/4")
+        self.assertEqual(self.snapshot.interface_for("10.200.0.1"), "ethernet1/2")
+        self.assertEqual(self.snapshot.interface_for("8.8.8.8"), "ethernet1/1")
+        self.assertIsNone(FibSnapshot().interface_for("8.8.8.8"))
+
+    def test_dump_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.snapshot.dump(os.path.join(tmp, "fib.json"))
+            loaded = FibSnapshot.load(path)
+        self.assertEqual(loaded.to_dict(), self.snapshot.to_dict())
+        self.assertEqual(loaded.interface_for("10.1.100.5"), "ethernet1/4")
+
+    def test_run_snapshots_are_pruned_to_the_newest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for stamp in ("20260101_000000", "20260102_000000", "20260103_000000"):
+                self.snapshot.dump(os.path.join(tmp, f"fib_snapshot_{stamp}.json"))
+            path = save_run_snapshot(self.snapshot, tmp, keep=2)
+            kept = sorted(os.listdir(tmp))
+        self.assertEqual(kept, ["fib_snapshot_20260103_000000.json", os.path.basename(path)])
+
+    def test_resolver_uses_snapshot_offline(self):
+        resolver = ZoneResolver(None, host="fw", ttl=0, snapshot=self.snapshot)
+        self.assertEqual(resolver.zone_for("10.3.3.3"), "Internal")
+        self.assertEqual(resolver.commands_sent, 0)
+        with self.assertRaises(ZoneLookupError):
+            resolver.zone_for_interface("ethernet1/9")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+
+from auto_tickets.models import PaCommitJob
+from auto_tickets.services.pa_jobs import PaJobError, backoff_delays, run_commit_job, validate_and_commit
+
+
+class FakeConnection:
+    """Validate job 11 and commit job 12 each finish after ``polls`` checks."""
+
+    def __init__(self, polls=2, validate_result="OK"):
+        self.polls = polls
+        self.validate_result = validate_result
+        self.checks = {}
+        self.commands = []
+
+    def config_mode(self):
+        pass
+
+    def exit_config_mode(self):
+        pass
+
+    def write_channel(self, data):
+        self.commands.append(repr(data))
+
+    def send_command_timing(self, command, read_timeout=None):
+        self.commands.append(command)
+        return "Commit job 12 is in progress. Use Ctrl+C to return to command prompt"
+
+    def send_command(self, command):
+        self.commands.append(command)
+        if command == "show jobs all":
+            return "Enqueued  Dequeued  ID  Type  Status Result\n10  Commit  FIN  OK"
+        if command.startswith("validate partial"):
+            return "Validate job enqueued with jobid 11\n11"
+        job_id = command.rsplit(" ", 1)[1]
+        self.checks[job_id] = self.checks.get(job_id, 0) + 1
+        if self.checks[job_id] < self.polls:
+            return f"{job_id}  Validate  ACT  PEND  40%"
+        result = self.validate_result if job_id == "11" else "OK"
+        return f"{job_id}  Validate  {'FIN' if result == 'OK' else 'FAIL'}  {result}"
+
+
+class PaJobTests(unittest.TestCase):
+    def test_backoff_doubles_up_to_cap(self):
+        delays = backoff_delays(initial=3, maximum=20)
+        self.assertEqual([next(delays) for _ in range(5)], [3, 6, 12, 20, 20])
+
+    def test_validate_and_commit_polls_with_backoff(self):
+        conn = FakeConnection(polls=3)
+        slept = []
+        phases = []
+        validate_and_commit(
+            conn, "admin1", log=lambda message: None, sleep=slept.append,
+            on_phase=lambda phase, job_id: phases.append((phase, job_id)),
+        )
+        self.assertEqual(phases, [("validating", "11"), ("committing", "12")])
+        # two waits per job, starting from the initial delay instead of 60s
+        self.assertEqual(slept, [3, 6, 3, 6])
+        self.assertIn("validate partial admin admin1", conn.commands)
+        self.assertIn("commit partial admin admin1 description commit-by-netcare", conn.commands)
+
+    def test_failed_validation_stops_before_commit(self):
+        conn = FakeConnection(polls=1, validate_result="FAIL")
+        with self.assertRaises(PaJobError):
+            validate_and_commit(conn, "admin1", log=lambda message: None, sleep=lambda delay: None)
+        self.assertFalse(any(command.startswith("commit") for command in conn.commands))
+
+    def test_commit_thread_stamps_heartbeat_on_every_update(self):
+        conn = FakeConnection(polls=2)
+        with patch.object(PaCommitJob.objects, "filter") as rows, override_settings(PA_JOB_POLL_INITIAL=0):
+            run_commit_job("job-1", conn, "admin1", release=lambda discard: None)
+        updates = [call.kwargs for call in rows.return_value.update.call_args_list]
+        progress = [fields for fields in updates if fields.get("status") != "completed"]
+        self.assertTrue(progress)
+        self.assertTrue(all("heartbeat_at" in fields for fields in progress))
+        self.assertEqual(updates[-1]["status"], "completed")
+
+
+if __name__ == "__main__":
+    unittest.main()
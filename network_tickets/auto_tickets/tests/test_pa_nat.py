@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.services.pa_nat import NatSummary, iter_command_lines, parse_session_line, parse_session_lines
+
+OUTPUT = """
+1380783      ssl            ACTIVE  FLOW  NS   172.19.1.193[64363]/Internal/6  (43.252.52.2[53865])
+237626       wechat-base    ACTIVE  FLOW  NS   172.19.1.136[54176]/Internal/6  (43.252.52.2[51325])
+2388246      bittorrent     ACTIVE  FLOW  NS   172.19.1.224[51413]/Internal/17  (43.252.52.2[34251])
+1169254      bittorrent     ACTIVE  FLOW  NS   172.19.1.224[51413]/Internal/17  (43.252.52.2[8335])
+vsys1                                          43.252.52.231[2123]/External  (43.252.52.231[2123])
+"""
+
+
+class FakeChannel:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.written = []
+
+    def find_prompt(self):
+        return "netcare@fw> "
+
+    def normalize_cmd(self, command):
+        return command + "\n"
+
+    def write_channel(self, data):
+        self.written.append(data)
+
+    def read_channel(self):
+        return self.chunks.pop(0) if self.chunks else ""
+
+
+class SessionParserTests(unittest.TestCase):
+    def test_source_line(self):
+        record = parse_session_line(OUTPUT.splitlines()[1])
+        self.assertEqual(record.side, "source")
+        self.assertEqual((record.ip, record.port, record.nat_ip, record.nat_port), ("172.19.1.193", 64363, "43.252.52.2", 53865))
+        self.assertEqual((record.session_id, record.application, record.state, record.zone, record.protocol),
+                         ("1380783", "ssl", "ACTIVE", "Internal", "6"))
+        self.assertTrue(record.translated)
+
+    def test_destination_line(self):
+        record = parse_session_line(OUTPUT.splitlines()[5])
+        self.assertEqual((record.side, record.vsys, record.zone), ("destination", "vsys1", "External"))
+        self.assertFalse(record.translated)
+
+    def test_headers_are_skipped(self):
+        self.assertIsNone(parse_session_line("ID   Application   State   Type Flag  Src[Sport]/Zone/Proto (translated IP[Port])"))
+        self.assertIsNone(parse_session_line("-" * 80))
+
+    def test_summary_counts_everything_but_keeps_limit(self):
+        summary = NatSummary.from_records(parse_session_lines(OUTPUT.splitlines()), limit=2)
+        self.assertEqual(summary.total, 5)
+        self.assertEqual(len(summary.records), 2)
+        self.assertTrue(summary.truncated)
+        self.assertEqual(summary.top_mappings(1), [
+            {"side": "source", "ip": "172.19.1.224", "nat_ip": "43.252.52.2", "count": 2},
+        ])
+        self.assertEqual(summary.top_applications(1), [{"application": "bittorrent", "count": 2}])
+
+    def test_command_lines_stream_until_prompt(self):
+        command = "show session all filter | match 43.252.52.2"
+        text = "netcare@fw> " + command + "\r\n" + OUTPUT.replace("\n", "\r\n") + "\r\nnetcare@fw> "
+        channel = FakeChannel([text[i:i + 37] for i in range(0, len(text), 37)])
+        lines = list(iter_command_lines(channel, command, poll_interval=0))
+        self.assertEqual(channel.written, [command + "\n"])
+        self.assertEqual([line for line in lines if line.strip()], [line for line in OUTPUT.splitlines() if line])
+        self.assertEqual(len(list(parse_session_lines(lines))), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
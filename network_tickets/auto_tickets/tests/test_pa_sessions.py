@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets.services.pa_sessions import SessionPool
+
+DEVICE = {"device_type": "paloalto_panos", "host": "fw", "username": "netcare", "password": "secret"}
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.config = False
+        self.disconnected = False
+
+    def find_prompt(self):
+        if not self.alive:
+            raise OSError("Socket is closed")
+        return "netcare@fw>"
+
+    def check_config_mode(self):
+        return self.config
+
+    def exit_config_mode(self):
+        self.config = False
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class SessionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect(device):
+            connection = FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        self.pool = SessionPool(connect=connect, max_size=2, idle_timeout=300, acquire_timeout=1)
+
+    def test_session_is_reused(self):
+        with self.pool.session(DEVICE) as first:
+            first.config = True
+        with self.pool.session(DEVICE) as second:
+            self.assertIs(second, first)
+            self.assertFalse(second.config)
+        self.assertEqual(self.pool.connects, 1)
+
+    def test_credentials_get_separate_sessions(self):
+        with self.pool.session(DEVICE) as first:
+            pass
+        with self.pool.session(dict(DEVICE, username="other")) as second:
+            self.assertIsNot(second, first)
+
+    def test_stale_session_is_replaced(self):
+        with self.pool.session(DEVICE) as first:
+            pass
+        first.alive = False
+        with self.pool.session(DEVICE) as second:
+            self.assertIsNot(second, first)
+        self.assertTrue(first.disconnected)
+
+    def test_error_discards_session(self):
+        with self.assertRaises(ValueError):
+            with self.pool.session(DEVICE) as first:
+                raise ValueError("boom")
+        self.assertTrue(first.disconnected)
+        with self.pool.session(DEVICE) as second:
+            self.assertIsNot(second, first)
+
+    def test_idle_sessions_are_closed(self):
+        self.pool.idle_timeout = 0
+        with self.pool.session(DEVICE) as first:
+            pass
+        with self.pool.session(DEVICE) as second:
+            self.assertIsNot(second, first)
+        self.assertTrue(first.disconnected)
+
+    def test_concurrent_callers_never_share_a_session(self):
+        first = self.pool.acquire(DEVICE)
+        second = self.pool.acquire(DEVICE)
+        self.assertIsNot(first.connection, second.connection)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.acquire(DEVICE)))
+        waiter.start()
+        first.release()
+        waiter.join(2)
+        self.assertIs(got[0].connection, first.connection)
+        self.assertEqual(len(self.opened), 2)
+
+    def test_acquire_times_out_when_pool_is_busy(self):
+        self.pool.acquire_timeout = 0.05
+        self.pool.acquire(DEVICE)
+        self.pool.acquire(DEVICE)
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire(DEVICE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from netmiko import ConnectHandler
+
+from auto_tickets.services.pa_config import ExistingConfig
+from auto_tickets.services.pa_fib import FibSnapshot
+from auto_tickets.services.pa_simulator import PanosSimulator, SimulatorServer, synthetic_workbook
+from auto_tickets.services.pa_zones import ZoneResolver
+
+
+class PanosSimulatorTests(unittest.TestCase):
+    def setUp(self):
+        self.sim = PanosSimulator(zones=4, job_seconds=0)
+
+    def run_op(self, command):
+        output, config_mode = self.sim.run(command, False)
+        self.assertFalse(config_mode)
+        return output
+
+    def test_fib_and_interface_outputs_parse(self):
+        snapshot = FibSnapshot.from_outputs(
+            self.run_op("show routing fib virtual-router vr_vsys1"), self.run_op("show interface all"),
+        )
+        self.assertEqual(snapshot.interface_for("10.3.9.9"), "ethernet1/3")
+        self.assertEqual(snapshot.zone_for_interface("ethernet1/3"), "Zone3")
+
+    def test_config_round_trips_through_existing_config(self):
+        for command in [
+            "set address 10.1.1.1 description generated-by-netcare ip-netmask 10.1.1.1",
+            "set address-group g1 static [ 10.1.1.1 ]",
+            "set service tcp-443-netcare description generated-by-netcare protocol tcp port 443",
+            "set rulebase security rules r1 source g1 destination g2 from Zone1 to Zone2 "
+            "service tcp-443-netcare application any action allow",
+        ]:
+            self.assertEqual(self.sim.run(command, True), ("", True))
+        output = "\n".join(self.sim.run(f"show {section}", True)[0]
+                           for section in ("address", "address-group", "service", "rulebase security"))
+        existing = ExistingConfig.from_output(output)
+        self.assertEqual(existing.address_for("10.1.1.1"), "10.1.1.1")
+        self.assertEqual(existing.service_for("tcp", "443"), "tcp-443-netcare")
+        self.assertTrue(existing.allows("Zone1", "Zone2", "tcp-443-netcare", "g1", "g2"))
+        self.assertEqual(self.run_op("check pending-changes"), "yes")
+
+    def test_jobs(self):
+        output, _ = self.sim.run("validate partial admin bench", True)
+        self.assertIn("jobid 1", output)
+        self.assertIn("FIN", self.run_op("show jobs id 1"))
+        self.assertEqual(self.sim.run("bogus command", True)[0], "Invalid syntax.")
+        self.assertEqual(self.sim.commands["validate"], 1)
+
+    def test_synthetic_workbook_shape(self):
+        sheet = synthetic_workbook(25).active
+        self.assertEqual(sheet.max_row, 3 + 25)
+        self.assertTrue(str(sheet.cell(row=4, column=3).value).startswith("10."))
+
+
+class SimulatorServerTests(unittest.TestCase):
+    def test_netmiko_session_against_simulator(self):
+        with SimulatorServer(PanosSimulator(zones=4)) as server:
+            connection = ConnectHandler(**server.device())
+            try:
+                resolver = ZoneResolver(connection, host="sim", ttl=0)
+                self.assertEqual(resolver.zone_for("10.2.0.5"), "Zone2")
+                self.assertEqual(resolver.zone_for("10.2.7.7"), "Zone2")
+            finally:
+                connection.disconnect()
+        self.assertEqual(server.simulator.commands["test routing fib-lookup"], 2)
+        self.assertEqual(server.simulator.commands["show interface ethernet1/2"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from auto_tickets.services.pa_zones import ZoneLookupError, ZoneResolver
+
+FIB = {
+    "10.1.1.1": "interface ethernet1/3, source 10.1.1.254, metric 10",
+    "10.1.1.2": "interface ethernet1/3, source 10.1.1.254, metric 10",
+    "10.2.2.2": "interface ethernet1/4, source 10.2.2.254, metric 10",
+}
+INTERFACES = {
+    "ethernet1/3": "Name: ethernet1/3, ID: 18\nZone: Internal, virtual system: vsys1",
+    "ethernet1/4": "Name: ethernet1/4, ID: 19\nZone: DMZ, virtual system: vsys1",
+}
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commands = []
+
+    def send_command(self, command):
+        self.commands.append(command)
+        if command.startswith("test routing fib-lookup"):
+            return FIB.get(command.rsplit(" ", 1)[1], "no route")
+        return INTERFACES.get(command.rsplit(" ", 1)[1], "")
+
+
+class ZoneResolverTests(unittest.TestCase):
+    def setUp(self):
+        locmem = override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+        locmem.enable()
+        self.addCleanup(locmem.disable)
+        cache.clear()
+
+    def test_interface_lookups_shared_within_run(self):
+        conn = FakeConnection()
+        resolver = ZoneResolver(conn, host="fw", virtual_router="vr_vsys1")
+        zones = [resolver.zone_for(ip) for ip in ["10.1.1.1", "10.1.1.2", "10.2.2.2", "10.1.1.1"]]
+        self.assertEqual(zones, ["Internal", "Internal", "DMZ", "Internal"])
+        # 3 distinct IPs -> 3 fib-lookups, 2 distinct interfaces -> 2 show interface
+        self.assertEqual(len(conn.commands), 5)
+        self.assertEqual(conn.commands[0], "test routing fib-lookup virtual-router vr_vsys1 ip 10.1.1.1")
+
+    def test_results_persist_across_runs(self):
+        ZoneResolver(FakeConnection(), host="fw").zone_for("10.2.2.2")
+        conn = FakeConnection()
+        self.assertEqual(ZoneResolver(conn, host="fw").zone_for("10.2.2.2"), "DMZ")
+        self.assertEqual(conn.commands, [])
+
+    def test_ttl_zero_disables_shared_cache(self):
+        ZoneResolver(FakeConnection(), host="fw", ttl=0).zone_for("10.2.2.2")
+        conn = FakeConnection()
+        ZoneResolver(conn, host="fw", ttl=0).zone_for("10.2.2.2")
+        self.assertEqual(len(conn.commands), 2)
+
+    def test_unparseable_output_raises_and_is_not_cached(self):
+        conn = FakeConnection()
+        resolver = ZoneResolver(conn, host="fw")
+        with self.assertRaises(ZoneLookupError):
+            resolver.zone_for("192.0.2.1")
+        with self.assertRaises(ZoneLookupError):
+            resolver.zone_for("192.0.2.1")
+        self.assertEqual(len(conn.commands), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from django.test.utils import override_settings
+
+from auto_tickets.services import run_log
+from auto_tickets.services.run_log import RunLog
+
+
+class RunLogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        overrides = override_settings(PA_LOG_DIR=self.tmp.name, PA_NETMIKO_DEBUG=False)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        run_log.shutdown()
+        self.addCleanup(run_log.shutdown)
+
+    def test_records_are_written_with_run_id(self):
+        log = RunLog(run_id="run42")
+        log.logger.info("pushed 3 commands")
+        RunLog(run_id="run43").logger.error("boom")
+        run_log.shutdown()
+        with open(os.path.join(self.tmp.name, "auto_tickets_pa.log"), encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(" - run42 - INFO - pushed 3 commands", lines[0])
+        self.assertIn(" - run43 - ERROR - boom", lines[1])
+
+    def test_file_renamed_by_logrotate_is_reopened(self):
+        path = os.path.join(self.tmp.name, "auto_tickets_pa.log")
+        log = RunLog(run_id="run42")
+        log.logger.info("before rotation")
+        run_log._listener.stop()
+        os.rename(path, path + "-20250101")
+        run_log._listener.start()
+        log.logger.info("after rotation")
+        run_log.shutdown()
+        with open(path + "-20250101", encoding="utf-8") as fh:
+            self.assertIn("before rotation", fh.read())
+        with open(path, encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn(" - run42 - INFO - after rotation", lines[0])
+
+    def test_capture_keeps_tail_and_earlier_errors(self):
+        log = RunLog(capture=3)
+        log.append("ERROR: ROW 4: bad port")
+        for n in range(10):
+            log.append(f"line {n}")
+        result = log.result()
+        self.assertTrue(result[0].startswith("... 8 earlier lines omitted"))
+        self.assertEqual(result[1:], ["ERROR: ROW 4: bad port", "line 7", "line 8", "line 9"])
+        self.assertEqual(len(log), 11)
+
+    def test_short_runs_are_returned_whole(self):
+        log = RunLog(capture=5)
+        log.append("a")
+        log.append("b")
+        self.assertEqual(log.result(), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import re
+import unittest
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, "/it_network/network_tickets")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "network_tickets.settings")
+
+import django
+
+django.setup()
+
+from auto_tickets import tools
+from auto_tickets.services.ipdb_index import IPDBIndex, IPDBRecord, parse_ipdb_network
+
+
+def _record(pk, ip, mask, location, device):
+    return IPDBRecord(pk, ip, mask, "Traffic", location, device, parse_ipdb_network(ip, mask))
+
+
+class TicketRoutingTests(unittest.TestCase):
+    def setUp(self):
+        self.index = IPDBIndex([
+            _record(1, "10.51.203.0", "24", "SZ-VPN", "DMZ SW01"),
+            _record(2, "10.1.0.0", "16", "PrivateCloud", "DMZ SW02"),
+            _record(3, "172.16.8.0", "24", "South Base", "PA"),
+        ])
+        patcher = mock.patch.object(tools.ipdb_index, "get_index", return_value=self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tools._route_cache.clear()
+
+    def test_list_and_message_from_one_rule(self):
+        self.assertEqual(tools.tickets_split("10.51.203.5", "10.1.2.3", return_list=True), ["EOMS-Cloud", "ITSR"])
+        self.assertEqual(
+            tools.tickets_split("10.51.203.5", "10.1.2.3"),
+            "10.51.203.5 belongs to SZ-VPN, 10.1.2.3 belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR",
+        )
+
+    def test_unknown_ip(self):
+        result = tools.route_pair("192.168.1.1", "10.1.2.3")
+        self.assertEqual(result.tickets, ())
+        self.assertEqual(result.message, tools.UNKNOWN_IP_MESSAGE)
+
+    def test_unmatched_pair_falls_back_to_device_message(self):
+        result = tools.route_locations("a", "b", "South Base", "PA", "Nowhere", "PA")
+        self.assertEqual(result.tickets, ())
+        self.assertIn("the source device is PA", result.message)
+
+    def test_results_are_memoized_per_index(self):
+        with mock.patch.object(self.index, "lookup", wraps=self.index.lookup) as lookup:
+            tools.route_pair("10.51.203.5", "10.1.2.3")
+            tools.route_pair("10.51.203.5", "10.1.2.3")
+        self.assertEqual(lookup.call_count, 2)
+
+    def test_route_pairs_matches_route_pair(self):
+        pairs = [("10.51.203.5", "10.1.2.3"), ("10.1.2.3", "172.16.8.1"), ("10.51.203.5", "10.1.2.3"), ("bad", "10.1.2.3")]
+        with mock.patch.object(self.index, "lookup_many", wraps=self.index.lookup_many) as lookup_many:
+            routes = tools.route_pairs(pairs)
+        lookup_many.assert_called_once_with(["10.51.203.5", "10.1.2.3", "172.16.8.1", "bad"])
+        self.assertEqual(len(routes), 3)
+        for pair, result in routes.items():
+            self.assertEqual(result, tools.route_pair(*pair))
+
+    def test_every_rule_has_tickets(self):
+        for key, tickets in tools.ROUTE_TABLE.items():
+            self.assertTrue(tickets, key)
+            self.assertFalse(any(re.search(r"\d\)", ticket) for ticket in tickets), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 import ipaddress
+import logging
 import math
 import django
 import os
 import sys
+from typing import NamedTuple
 
 # Add the parent directory to Python path so we can import network_tickets.settings
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,6 +12,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'network_tickets.settings')
 django.setup()
 from auto_tickets.models import IPDB, IP_Application
+from auto_tickets.services import ipdb_index
+
+logger = logging.getLogger(__name__)
 
 
 # print(network)
@@ -18,116 +23,56 @@ from auto_tickets.models import IPDB, IP_Application
 # ip_mask = [{'ip_prefix': '10.244.0.0', 'mask': ' 255.255.248.0'}, 
 #         {'ip_prefix': '2.1.1.2', 'mask': '255.255.255.255'}]
 
-def get_location(ip_input):
-    if not ip_input:
-        return None
-    
-    # Clean the input IP by removing any invisible characters and whitespace
-    ip_input = str(ip_input).replace('\u200b', '').strip()
-    
-    if not ip_input:
-        return None
-        
-    try:
-        ip_mask = [{'ip_prefix': i.ip, 'mask': i.mask} for i in IPDB.objects.all()]        
-
-        network_list = []
+def get_ipdb_record(ip_input):
+    """
+    Longest-prefix-match IPDB record for an IP address or subnet.
 
-        for i in ip_mask:
-            try:
-                network = ipaddress.ip_network(f"{i['ip_prefix']}/{i['mask'].replace(' ', '')}")
-                network_list.append(network)
-            except (ValueError, ipaddress.AddressValueError):
-                # Skip invalid network configurations
-                continue
+    Served from the process-wide index in ``auto_tickets.services.ipdb_index``
+    (rebuilt when IPDB rows change), so no table read per lookup.
+    Returns an ``IPDBRecord`` (ip, mask, traffic_oam, location, device) or None.
+    """
+    try:
+        return ipdb_index.lookup(ip_input)
+    except Exception:
+        return None
 
-        # Check if input is a subnet (contains '/') or just an IP address
-        if '/' in ip_input:
-            # Input is a subnet (e.g., "10.1.1.0/24")
-            try:
-                input_network = ipaddress.ip_network(ip_input, strict=False)
-                
-                # Check if the input subnet overlaps or matches any database network
-                for subnet in network_list:
-                    # Check if networks overlap (one contains the other or they intersect)
-                    if input_network.overlaps(subnet) or subnet.overlaps(input_network):
-                        # If input network is contained in or matches database network
-                        if input_network.subnet_of(subnet) or input_network == subnet:
-                            location = IPDB.objects.get(ip=subnet.network_address).location
-                            return location
-                        # If database network is contained in input network, still return the location
-                        elif subnet.subnet_of(input_network):
-                            location = IPDB.objects.get(ip=subnet.network_address).location
-                            return location
-            except (ValueError, ipaddress.AddressValueError):
-                return None
-        else:
-            # Input is just an IP address (e.g., "10.1.1.50")
-            ip = ipaddress.ip_address(ip_input)
 
-            for subnet in network_list:
-                if ip in subnet:
-                    location = IPDB.objects.get(ip=subnet.network_address).location
-                    return location
-        
-    except Exception:
-        return None 
+def get_location(ip_input):
+    record = get_ipdb_record(ip_input)
+    return record.location if record else None
 
 
 def get_device(ip_input):
-    if not ip_input:
-        return None
-    
-    # Clean the input IP by removing any invisible characters and whitespace
-    ip_input = str(ip_input).replace('\u200b', '').strip()
-    
-    if not ip_input:
-        return None
-        
-    try:
-        ip_mask = [{'ip_prefix': i.ip, 'mask': i.mask} for i in IPDB.objects.all()]        
+    record = get_ipdb_record(ip_input)
+    return record.device if record else None
 
-        network_list = []
 
-        for i in ip_mask:
-            try:
-                network = ipaddress.ip_network(f"{i['ip_prefix']}/{i['mask'].replace(' ', '')}")
-                network_list.append(network)
-            except (ValueError, ipaddress.AddressValueError):
-                # Skip invalid network configurations
-                continue
+def classify_many(ips):
+    """
+    Classify a batch of IPs / subnets against IPDB in one pass.
 
-        # Check if input is a subnet (contains '/') or just an IP address
-        if '/' in ip_input:
-            # Input is a subnet (e.g., "10.1.1.0/24")
-            try:
-                input_network = ipaddress.ip_network(ip_input, strict=False)
-                
-                # Check if the input subnet overlaps or matches any database network
-                for subnet in network_list:
-                    # Check if networks overlap (one contains the other or they intersect)
-                    if input_network.overlaps(subnet) or subnet.overlaps(input_network):
-                        # If input network is contained in or matches database network
-                        if input_network.subnet_of(subnet) or input_network == subnet:
-                            device = IPDB.objects.get(ip=subnet.network_address).device
-                            return device
-                        # If database network is contained in input network, still return the device
-                        elif subnet.subnet_of(input_network):
-                            device = IPDB.objects.get(ip=subnet.network_address).device
-                            return device
-            except (ValueError, ipaddress.AddressValueError):
-                return None
-        else:
-            # Input is just an IP address (e.g., "10.1.1.50")
-            ip = ipaddress.ip_address(ip_input)
+    Plain IPv4 addresses are resolved with a single vectorized interval
+    search (see ``ipdb_index.IPDBIndex.lookup_many``) instead of one lookup
+    per address.
 
-            for subnet in network_list:
-                if ip in subnet:
-                    device = IPDB.objects.get(ip=subnet.network_address).device
-                    return device
-        
+    Returns:
+        list: one dict per input, in input order, with keys
+        'ip', 'location', 'device', 'traffic_oam' (None values when not in IPDB).
+    """
+    ips = list(ips)
+    try:
+        records = ipdb_index.lookup_many(ips)
     except Exception:
-        return None 
+        records = [None] * len(ips)
+    return [
+        {
+            'ip': ip,
+            'location': record.location if record else None,
+            'device': record.device if record else None,
+            'traffic_oam': record.traffic_oam if record else None,
+        }
+        for ip, record in zip(ips, records)
+    ]
 
 
 if __name__ == '__main__':
@@ -138,628 +83,461 @@ if __name__ == '__main__':
 
 
 
-def _extract_tickets_from_string(result_str):
+# Ticket routing rules, grouped by (source_device, destination_device).
+# Each entry is (source_location, destination_location, tickets); the first
+# entry for a given 4-tuple wins.
+#
+# DMZ SW01: SN OAM, AliCloud, AliCloud-Mylink, PrivateCloud-TP, SZ-VPN
+# DMZ SW02: NewPrivateCloud, PrivateCloud, SN PCloud
+# M09-CORE-SW01: PrivateCloud
+# M09-EXT-CORE-SW1: PrivateCloud-TP
+# M09-INT-SW01: PrivateCloud
+# M09-SB-SW01: South Base
+# PA: South Base, SN PCloud, Taiping PCloud-VM
+# T01-DR-CORE-SW01: PrivateCloud-GNC
+_ROUTE_RULES = {
+    ('DMZ SW01', 'DMZ SW02'): [
+        ('SN OAM', 'NewPrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN OAM', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN OAM', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('AliCloud', 'NewPrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('AliCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('AliCloud', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('AliCloud-Mylink', 'NewPrivateCloud', ('EOMS-Cloud', 'AliCloud')),
+        ('AliCloud-Mylink', 'PrivateCloud', ('EOMS-Cloud', 'AliCloud')),
+        ('AliCloud-Mylink', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('PrivateCloud-TP', 'NewPrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('PrivateCloud-TP', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SZ-VPN', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('SZ-VPN', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('SZ-VPN', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('DMZ SW01', 'M09-CORE-SW01'): [
+        ('SN OAM', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('AliCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('AliCloud-Mylink', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('AliCloud-Mylink', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('SZ-VPN', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW01', 'M09-EXT-CORE-SW1'): [
+        ('SN OAM', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('AliCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('AliCloud-Mylink', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'PrivateCloud-TP', ('EOMS-Cloud',)),
+        ('SZ-VPN', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+        ('SZ-VPN', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW01', 'M09-INT-SW01'): [
+        ('SN OAM', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('AliCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('AliCloud-Mylink', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('SZ-VPN', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW01', 'M09-SB-SW01'): [
+        ('SN OAM', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('AliCloud', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'AliCloud')),
+        ('PrivateCloud-TP', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'EOMS-Cloud')),
+        ('SZ-VPN', 'South Base', ('ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('DMZ SW01', 'PA'): [
+        ('SN OAM', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('AliCloud', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'AliCloud')),
+        ('AliCloud', 'SN PCloud', ('EOMS-SN', 'ITSR', 'AliCloud', 'EOMS-Cloud')),
+        ('PrivateCloud-TP', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'EOMS-Cloud')),
+        ('PrivateCloud-TP', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+        ('SZ-VPN', 'South Base', ('ITSR', 'South Base (IT will provide support)')),
+        ('SZ-VPN', 'SN PCloud', ('ITSR', 'EOMS-Cloud', 'EOMS-SN')),
+    ],
+    ('DMZ SW01', 'T01-DR-CORE-SW01'): [
+        ('SN OAM', 'PrivateCloud-GNC', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('AliCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('AliCloud-Mylink', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'PrivateCloud-GNC', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('SZ-VPN', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW02', 'M09-CORE-SW01'): [
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('NewPrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW02', 'M09-EXT-CORE-SW1'): [
+        ('SN PCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+        ('NewPrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW02', 'M09-INT-SW01'): [
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('NewPrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('DMZ SW02', 'M09-SB-SW01'): [
+        ('SN PCloud', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('NewPrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('DMZ SW02', 'PA'): [
+        ('SN PCloud', 'South Base', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('NewPrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+        ('NewPrivateCloud', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+    ],
+    ('DMZ SW02', 'T01-DR-CORE-SW01'): [
+        ('SN PCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+        ('NewPrivateCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-CORE-SW01', 'M09-EXT-CORE-SW1'): [
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-CORE-SW01', 'M09-INT-SW01'): [
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-CORE-SW01', 'M09-SB-SW01'): [
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('M09-CORE-SW01', 'PA'): [
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+    ],
+    ('M09-CORE-SW01', 'T01-DR-CORE-SW01'): [
+        ('PrivateCloud', 'PrivateCloud-GNC', ('EOMS-Cloud',)),
+    ],
+    ('M09-EXT-CORE-SW1', 'M09-INT-SW01'): [
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-EXT-CORE-SW1', 'M09-SB-SW01'): [
+        ('PrivateCloud-TP', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('M09-EXT-CORE-SW1', 'PA'): [
+        ('PrivateCloud-TP', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud-TP', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+    ],
+    ('M09-EXT-CORE-SW1', 'T01-DR-CORE-SW01'): [
+        ('PrivateCloud-TP', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-INT-SW01', 'M09-SB-SW01'): [
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('M09-INT-SW01', 'PA'): [
+        ('PrivateCloud', 'South Base', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('PrivateCloud', 'SN PCloud', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+    ],
+    ('M09-INT-SW01', 'T01-DR-CORE-SW01'): [
+        ('PrivateCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'T01-DR-CORE-SW01'): [
+        ('South Base', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('PA', 'T01-DR-CORE-SW01'): [
+        ('South Base', 'PrivateCloud-GNC', ('EOMS-Cloud', 'ITSR')),
+        ('SN PCloud', 'PrivateCloud-GNC', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('DMZ SW02', 'DMZ SW01'): [
+        ('NewPrivateCloud', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN')),
+        ('PrivateCloud', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN PCloud', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN')),
+        ('NewPrivateCloud', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('PrivateCloud', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('SN PCloud', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'AliCloud')),
+        ('NewPrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN')),
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN PCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN')),
+    ],
+    ('M09-CORE-SW01', 'DMZ SW01'): [
+        ('PrivateCloud', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('PrivateCloud', 'AliCloud-Mylink', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('M09-EXT-CORE-SW1', 'DMZ SW01'): [
+        ('PrivateCloud-TP', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud-TP', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'AliCloud-Mylink', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-TP', 'PrivateCloud-TP', ('EOMS-Cloud',)),
+    ],
+    ('M09-INT-SW01', 'DMZ SW01'): [
+        ('PrivateCloud', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('PrivateCloud', 'AliCloud-Mylink', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'DMZ SW01'): [
+        ('South Base', 'SN OAM', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'AliCloud', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'AliCloud')),
+        ('South Base', 'PrivateCloud-TP', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'EOMS-Cloud')),
+    ],
+    ('PA', 'DMZ SW01'): [
+        ('South Base', 'SN OAM', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'AliCloud', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'AliCloud')),
+        ('SN PCloud', 'AliCloud', ('EOMS-SN', 'ITSR', 'AliCloud', 'EOMS-Cloud')),
+        ('South Base', 'PrivateCloud-TP', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)', 'EOMS-Cloud')),
+        ('SN PCloud', 'PrivateCloud-TP', ('EOMS-SN', 'ITSR', 'EOMS-Cloud')),
+    ],
+    ('T01-DR-CORE-SW01', 'DMZ SW01'): [
+        ('PrivateCloud-GNC', 'SN OAM', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud-GNC', 'AliCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-GNC', 'AliCloud-Mylink', ('EOMS-Cloud', 'ITSR', 'AliCloud')),
+        ('PrivateCloud-GNC', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('M09-CORE-SW01', 'DMZ SW02'): [
+        ('PrivateCloud', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('PrivateCloud', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-EXT-CORE-SW1', 'DMZ SW02'): [
+        ('PrivateCloud-TP', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('PrivateCloud-TP', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-INT-SW01', 'DMZ SW02'): [
+        ('PrivateCloud', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('PrivateCloud', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'DMZ SW02'): [
+        ('South Base', 'SN PCloud', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('PA', 'DMZ SW02'): [
+        ('South Base', 'SN PCloud', ('EOMS-SN', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('South Base', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('SN PCloud', 'NewPrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'DMZ SW02'): [
+        ('PrivateCloud-GNC', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+        ('PrivateCloud-GNC', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+        ('PrivateCloud-GNC', 'NewPrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-EXT-CORE-SW1', 'M09-CORE-SW01'): [
+        ('PrivateCloud-TP', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-INT-SW01', 'M09-CORE-SW01'): [
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'M09-CORE-SW01'): [
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('PA', 'M09-CORE-SW01'): [
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'M09-CORE-SW01'): [
+        ('PrivateCloud-GNC', 'PrivateCloud', ('EOMS-Cloud',)),
+    ],
+    ('M09-INT-SW01', 'M09-EXT-CORE-SW1'): [
+        ('PrivateCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'M09-EXT-CORE-SW1'): [
+        ('South Base', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('PA', 'M09-EXT-CORE-SW1'): [
+        ('South Base', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('SN PCloud', 'PrivateCloud-TP', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'M09-EXT-CORE-SW1'): [
+        ('PrivateCloud-GNC', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('M09-SB-SW01', 'M09-INT-SW01'): [
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+    ],
+    ('PA', 'M09-INT-SW01'): [
+        ('South Base', 'PrivateCloud', ('EOMS-Cloud', 'ITSR', 'South Base (IT will provide support)')),
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'M09-INT-SW01'): [
+        ('PrivateCloud-GNC', 'PrivateCloud', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'M09-SB-SW01'): [
+        ('PrivateCloud-GNC', 'South Base', ('EOMS-Cloud', 'ITSR')),
+    ],
+    ('T01-DR-CORE-SW01', 'PA'): [
+        ('PrivateCloud-GNC', 'South Base', ('EOMS-Cloud', 'ITSR')),
+        ('PrivateCloud-GNC', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN', 'ITSR')),
+    ],
+    ('DMZ SW01', 'DMZ SW01'): [
+        ('SN OAM', 'SN OAM', ('EOMS-SN',)),
+        ('AliCloud', 'AliCloud', ('AliCloud',)),
+        ('AliCloud-Mylink', 'AliCloud-Mylink', ('AliCloud',)),
+        ('SN OAM', 'AliCloud', ('EOMS-SN', 'AliCloud')),
+        ('AliCloud', 'SN OAM', ('EOMS-SN', 'AliCloud')),
+        ('SN OAM', 'AliCloud-Mylink', ('EOMS-SN', 'AliCloud')),
+        ('AliCloud-Mylink', 'SN OAM', ('EOMS-SN', 'AliCloud')),
+        ('AliCloud', 'AliCloud-Mylink', ('AliCloud',)),
+        ('AliCloud-Mylink', 'AliCloud', ('AliCloud',)),
+        ('AliCloud', 'PrivateCloud-TP', ('EOMS-SN', 'AliCloud', 'EOMS-Cloud')),
+        ('SN OAM', 'PrivateCloud-TP', ('EOMS-SN', 'EOMS-Cloud')),
+        ('AliCloud-Mylink', 'PrivateCloud-TP', ('EOMS-SN', 'AliCloud', 'EOMS-Cloud')),
+        ('PrivateCloud-TP', 'AliCloud', ('EOMS-SN', 'AliCloud', 'EOMS-Cloud')),
+        ('PrivateCloud-TP', 'SN OAM', ('EOMS-SN', 'EOMS-Cloud')),
+        ('PrivateCloud-TP', 'AliCloud-Mylink', ('EOMS-SN', 'AliCloud', 'EOMS-Cloud')),
+        ('SZ-VPN', 'PrivateCloud-TP', ('EOMS-Cloud', 'ITSR', 'EOMS-SN')),
+        ('SZ-VPN', 'SN OAM', ('EOMS-SN', 'ITSR')),
+        ('SZ-VPN', 'AliCloud', ('EOMS-SN', 'ITSR', 'AliCloud')),
+        ('SZ-VPN', 'AliCloud-Mylink', ('EOMS-SN', 'ITSR', 'AliCloud')),
+    ],
+    ('DMZ SW02', 'DMZ SW02'): [
+        ('NewPrivateCloud', 'NewPrivateCloud', ('EOMS-Cloud',)),
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud',)),
+        ('SN PCloud', 'SN PCloud', ('EOMS-SN',)),
+        ('NewPrivateCloud', 'PrivateCloud', ('EOMS-Cloud',)),
+        ('PrivateCloud', 'NewPrivateCloud', ('EOMS-Cloud',)),
+        ('NewPrivateCloud', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN PCloud', 'NewPrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('PrivateCloud', 'SN PCloud', ('EOMS-Cloud', 'EOMS-SN')),
+        ('SN PCloud', 'PrivateCloud', ('EOMS-Cloud', 'EOMS-SN')),
+    ],
+    ('M09-CORE-SW01', 'M09-CORE-SW01'): [
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud',)),
+    ],
+    ('M09-EXT-CORE-SW1', 'M09-EXT-CORE-SW1'): [
+        ('PrivateCloud-TP', 'PrivateCloud-TP', ('EOMS-Cloud',)),
+    ],
+    ('M09-INT-SW01', 'M09-INT-SW01'): [
+        ('PrivateCloud', 'PrivateCloud', ('EOMS-Cloud',)),
+        ('PrivateCloud-GNC', 'PrivateCloud-GNC', ('EOMS-Cloud',)),
+    ],
+    ('M09-SB-SW01', 'M09-SB-SW01'): [
+        ('South Base', 'South Base', ('South Base (IT will provide support)',)),
+    ],
+    ('PA', 'PA'): [
+        ('South Base', 'South Base', ('South Base (IT will provide support)',)),
+    ],
+    ('T01-DR-CORE-SW01', 'T01-DR-CORE-SW01'): [
+        ('PrivateCloud-GNC', 'PrivateCloud-GNC', ('EOMS-Cloud',)),
+    ],
+}
+
+# Display names used in the result message (defaults to the IPDB location).
+_LOCATION_LABELS = {
+    'PrivateCloud': 'Private Cloud',
+    'NewPrivateCloud': 'Private Cloud',
+}
+
+UNKNOWN_IP_MESSAGE = 'Unknown IP. Please report to IT, thank you.'
+
+
+class RouteResult(NamedTuple):
+    """Outcome of routing one source/destination pair: ticket names plus the display message."""
+
+    tickets: tuple
+    message: str
+
+
+def _compile_route_table(rules):
+    """Flatten _ROUTE_RULES into {(src_device, dst_device, src_location, dst_location): tickets}."""
+    table = {}
+    for (source_device, destination_device), entries in rules.items():
+        for source_location, destination_location, tickets in entries:
+            table.setdefault((source_device, destination_device, source_location, destination_location), tuple(tickets))
+    return table
+
+
+ROUTE_TABLE = _compile_route_table(_ROUTE_RULES)
+
+
+def route_locations(source_ip, destination_ip, source_location, source_device, destination_location, destination_device):
     """
-    Helper function to extract ticket names from the result string.
-    Extracts items after "Tickets contain:" that match pattern like "1)EOMS-Cloud", "2)EOMS-SN", etc.
+    Resolve the tickets for an already-classified source/destination pair.
+
+    Returns:
+        RouteResult: tickets (tuple of ticket names, empty when no rule matches) and message.
     """
-    import re
-    if not result_str or 'Tickets contain:' not in result_str:
-        return []
-    
-    # Find the part after "Tickets contain:"
-    tickets_part = result_str.split('Tickets contain:')[1] if 'Tickets contain:' in result_str else ''
-    
-    # Extract ticket names using regex pattern: number)TicketName
-    # Pattern matches: 1)EOMS-Cloud, 2)EOMS-SN, etc.
-    pattern = r'\d+\)([^\n]+)'
-    matches = re.findall(pattern, tickets_part)
-    
-    # Clean up ticket names (strip whitespace)
-    tickets = [ticket.strip() for ticket in matches if ticket.strip()]
-    
-    return tickets
+    if source_location is None or destination_location is None:
+        return RouteResult((), UNKNOWN_IP_MESSAGE)
 
+    tickets = ROUTE_TABLE.get((source_device, destination_device, source_location, destination_location))
+    if tickets is None:
+        return RouteResult((), (
+            f'{source_ip} belongs to {source_location}, the source device is {source_device}. '
+            f'{destination_ip} belongs to {destination_location}. the destination device is {destination_device}.'
+        ))
 
-def _tickets_split_internal(source_ip, destination_ip):
-    """
-    Internal function that always returns a string.
-    This contains the original logic of tickets_split.
+    source_label = _LOCATION_LABELS.get(source_location, source_location)
+    destination_label = _LOCATION_LABELS.get(destination_location, destination_location)
+    ticket_lines = ''.join(f' \n {i}){ticket}' for i, ticket in enumerate(tickets, 1))
+    return RouteResult(
+        tickets,
+        f'{source_ip} belongs to {source_label}, {destination_ip} belongs to {destination_label}. Tickets contain:{ticket_lines}',
+    )
+
+
+# Memoized route results per (source_ip, destination_ip), valid for one IPDB index build.
+_route_cache = {}
+_route_cache_index = None
+_ROUTE_CACHE_MAX_SIZE = 50000
+
+
+def route_pair(source_ip, destination_ip):
     """
-    source_location = get_location(source_ip)
-    destination_location = get_location(destination_ip)
-    
-    source_device = get_device(source_ip)
-    destination_device = get_device(destination_ip)
+    Classify both IPs and route the pair in one evaluation.
 
-    print(f'source_location: {source_location}, destination_location: {destination_location}, source_device: {source_device}, destination_device: {destination_device}')
+    Results are memoized per (source_ip, destination_ip) and dropped whenever
+    the IPDB index is rebuilt (i.e. when IPDB changes).
 
-    # Check if we got valid locations
-    if source_location is None or destination_location is None:
-        return 'Unknown IP. Please report to IT, thank you.'
-    
-     #DMZ SW01
-    if source_device == 'DMZ SW01' and destination_device == 'DMZ SW02':
-        if source_location == 'SN OAM' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'SN OAM' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'SN OAM' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'AliCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        elif source_location == 'AliCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN' 
-        ###################VPN#############################################
-        elif source_location == 'SZ-VPN' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'SZ-VPN' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    #######################################################################
-    elif source_device == 'DMZ SW01' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'SN OAM' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    #######################################################################
-    ##########################VPN##########################################
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    #######################################################################
-    elif source_device == 'DMZ SW01' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'SN OAM' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    ###############################################################
-    ##########################VPN##########################################
-        # elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud-TP':
-        #     return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    ##############################################################
-    elif source_device == 'DMZ SW01' and destination_device == 'M09-INT-SW01':
-        if source_location == 'SN OAM' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        ###############################################################
-        ##########################VPN##########################################
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    ##############################################################
-    elif source_device == 'DMZ SW01' and destination_device == 'M09-SB-SW01':
-        if source_location == 'SN OAM' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'AliCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)AliCloud'
-        ####################Taiping big data############################### 
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'South Base':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)EOMS-Cloud'
-    ###############################################################
-    ##########################VPN########################################## 
-        elif source_location == 'SZ-VPN' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to South Base. Tickets contain: \n 1)ITSR\n 2)South Base (IT will provide support)'
-    ###############################################################
-    elif source_device == 'DMZ SW01' and destination_device == 'PA':
-        if source_location == 'SN OAM' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'AliCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)AliCloud'
-        elif source_location == 'AliCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)AliCloud 4)EOMS-Cloud'
-        
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'South Base':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)EOMS-Cloud'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-        ###############################################################
-        ##########################VPN##########################################
-        elif source_location == 'SZ-VPN' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to South Base. Tickets contain: \n 1)ITSR\n 2)South Base (IT will provide support)'
-        elif source_location == 'SZ-VPN' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)ITSR\n 2)EOMS-Cloud\n 3)EOMS-SN'
-        ###############################################################
-        # elif source_location == 'AliCloud-Mylink' and destination_location == 'South Base':
-        #     return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)AliCloud'
-
-    elif source_device == 'DMZ SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'SN OAM' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-        ####################Taiping big data###############################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        ###################################################################
-        ##########################VPN######################################
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        ###################################################################
-    elif source_device == 'DMZ SW02' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'DMZ SW02' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'SN PCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        
-    elif source_device == 'DMZ SW02' and destination_device == 'M09-INT-SW01':
-        if source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'DMZ SW02' and destination_device == 'M09-SB-SW01':
-        if source_location == 'SN PCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-
-    elif source_device == 'DMZ SW02' and destination_device == 'PA':
-        if source_location == 'SN PCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-
-
-    elif source_device == 'DMZ SW02' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'SN PCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'    
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to NewPrivateCloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'M09-INT-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'M09-SB-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'PA':
-        if source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
+    Returns:
+        RouteResult
+    """
+    global _route_cache, _route_cache_index
+
+    index = ipdb_index.get_index()
+    if index is not _route_cache_index or len(_route_cache) >= _ROUTE_CACHE_MAX_SIZE:
+        _route_cache = {}
+        _route_cache_index = index
+
+    key = (source_ip, destination_ip)
+    result = _route_cache.get(key)
+    if result is None:
+        source = index.lookup(source_ip)
+        destination = index.lookup(destination_ip)
+        result = route_locations(
+            source_ip, destination_ip,
+            source.location if source else None, source.device if source else None,
+            destination.location if destination else None, destination.device if destination else None,
+        )
+        logger.debug(
+            'route %s -> %s: %s / %s -> %s / %s',
+            source_ip, destination_ip,
+            source.location if source else None, source.device if source else None,
+            destination.location if destination else None, destination.device if destination else None,
+        )
+        _route_cache[key] = result
+    return result
+
+
+def route_pairs(pairs):
+    """
+    Route a batch of (source_ip, destination_ip) pairs.
 
-    
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud'
-    
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'M09-INT-SW01':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'M09-SB-SW01':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'PA':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'South Base':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-            
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-INT-SW01' and destination_device == 'M09-SB-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'M09-INT-SW01' and destination_device == 'PA':
-        if source_location == 'PrivateCloud' and destination_location == 'South Base':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-        
-    elif source_device == 'M09-INT-SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'PA' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-
-    # Reversed device combinations
-    elif source_device == 'DMZ SW02' and destination_device == 'DMZ SW01':
-        if source_location == 'NewPrivateCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'PrivateCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'SN PCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        elif source_location == 'PrivateCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        elif source_location == 'SN PCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)AliCloud'
-        ############################################################################################
-        #############################Taiping big data###############################################
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        ############################################################################################
-
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'DMZ SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'PrivateCloud' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN\n 3)ITSR'
-    ############################################################################################
-    
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'DMZ SW01':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud'
-    ############################################################################################
-
-    elif source_device == 'M09-INT-SW01' and destination_device == 'DMZ SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'PrivateCloud' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    ############################################################################################
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'DMZ SW01':
-        if source_location == 'South Base' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)AliCloud'
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'South Base' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)EOMS-Cloud'
-    ############################################################################################
-    
-    elif source_device == 'PA' and destination_device == 'DMZ SW01':
-        if source_location == 'South Base' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)AliCloud'
-        elif source_location == 'SN PCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)AliCloud\n 4)EOMS-Cloud'
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'South Base' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)\n 4)EOMS-Cloud'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)EOMS-Cloud'
-    ############################################################################################
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'DMZ SW01':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR\n 4)AliCloud'
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)AliCloud'
-
-    ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    ############################################################################################
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'DMZ SW02':
-        if source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'DMZ SW02':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        
-    elif source_device == 'M09-INT-SW01' and destination_device == 'DMZ SW02':
-        if source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'PrivateCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'M09-SB-SW01' and destination_device == 'DMZ SW02':
-        if source_location == 'South Base' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-
-    elif source_device == 'PA' and destination_device == 'DMZ SW02':
-        if source_location == 'South Base' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'South Base' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'SN PCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-
-
-
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'DMZ SW02':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'    
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to NewPrivateCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-INT-SW01' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'PA' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-    
-    elif source_device == 'M09-INT-SW01' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'PA' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'M09-INT-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-    
-    elif source_device == 'PA' and destination_device == 'M09-INT-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)South Base (IT will provide support)'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'M09-INT-SW01':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'M09-SB-SW01':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'South Base':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'PA':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'South Base':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to South Base. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    
-    # Additional missing reversed combinations
-    elif source_device == 'M09-SB-SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-    
-    elif source_device == 'PA' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'South Base' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN \n 3)ITSR'
-    
-    # Self-to-self combinations (same device to same device)
-    elif source_device == 'DMZ SW01' and destination_device == 'DMZ SW01':
-        if source_location == 'SN OAM' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN'
-        elif source_location == 'AliCloud' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)AliCloud'
-        elif source_location == 'SN OAM' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud'
-        elif source_location == 'AliCloud' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud'
-        elif source_location == 'SN OAM' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud'
-        elif source_location == 'AliCloud' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)AliCloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)AliCloud'
-        ############################################################################################
-    #####################################Taiping big data#######################################
-        elif source_location == 'AliCloud' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to AliCloud, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud\n 3)EOMS-Cloud'
-        elif source_location == 'SN OAM' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SN OAM, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)EOMS-Cloud'
-        elif source_location == 'AliCloud-Mylink' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to AliCloud-Mylink, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud\n 3)EOMS-Cloud'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud\n 3)EOMS-Cloud'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)EOMS-Cloud'
-        elif source_location == 'PrivateCloud-TP' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-SN \n 2)AliCloud\n 3)EOMS-Cloud'    
-    ############################################################################################
-     #####################################VPN#######################################
-        elif source_location == 'SZ-VPN' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud \n 2)ITSR\n 3)EOMS-SN'
-        elif source_location == 'SZ-VPN' and destination_location == 'SN OAM':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to SN OAM. Tickets contain: \n 1)EOMS-SN \n 2)ITSR'
-        elif source_location == 'SZ-VPN' and destination_location == 'AliCloud':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to AliCloud. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)AliCloud'
-        elif source_location == 'SZ-VPN' and destination_location == 'AliCloud-Mylink':
-            return f'{source_ip} belongs to SZ-VPN, {destination_ip} belongs to AliCloud-Mylink. Tickets contain: \n 1)EOMS-SN \n 2)ITSR\n 3)AliCloud'    
-    ############################################################################################   
-    
-    elif source_device == 'DMZ SW02' and destination_device == 'DMZ SW02':
-        if source_location == 'NewPrivateCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'SN PCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-SN'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'PrivateCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'NewPrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'SN PCloud' and destination_location == 'NewPrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'PrivateCloud' and destination_location == 'SN PCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to SN PCloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-        elif source_location == 'SN PCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to SN PCloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud \n 2)EOMS-SN'
-    
-    elif source_device == 'M09-CORE-SW01' and destination_device == 'M09-CORE-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-    
-    elif source_device == 'M09-EXT-CORE-SW1' and destination_device == 'M09-EXT-CORE-SW1':
-        if source_location == 'PrivateCloud-TP' and destination_location == 'PrivateCloud-TP':
-            return f'{source_ip} belongs to PrivateCloud-TP, {destination_ip} belongs to PrivateCloud-TP. Tickets contain: \n 1)EOMS-Cloud'
-    
-    elif source_device == 'M09-INT-SW01' and destination_device == 'M09-INT-SW01':
-        if source_location == 'PrivateCloud' and destination_location == 'PrivateCloud':
-            return f'{source_ip} belongs to Private Cloud, {destination_ip} belongs to Private Cloud. Tickets contain: \n 1)EOMS-Cloud'
-        elif source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud'
-    
-    elif source_device == 'M09-SB-SW01' and destination_device == 'M09-SB-SW01':
-        if source_location == 'South Base' and destination_location == 'South Base':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to South Base. Tickets contain: \n 1)South Base (IT will provide support)'
-    
-    elif source_device == 'PA' and destination_device == 'PA':
-        if source_location == 'South Base' and destination_location == 'South Base':
-            return f'{source_ip} belongs to South Base, {destination_ip} belongs to South Base. Tickets contain: \n 1)South Base (IT will provide support)'
-    
-    elif source_device == 'T01-DR-CORE-SW01' and destination_device == 'T01-DR-CORE-SW01':
-        if source_location == 'PrivateCloud-GNC' and destination_location == 'PrivateCloud-GNC':
-            return f'{source_ip} belongs to PrivateCloud-GNC, {destination_ip} belongs to PrivateCloud-GNC. Tickets contain: \n 1)EOMS-Cloud'
-    
-    else:
-        return f'{source_ip} belongs to {source_location}, the source device is {source_device}. {destination_ip} belongs to {destination_location}. the destination device is {destination_device}.'
+    Each distinct IP is classified once (``lookup_many`` over the distinct
+    set) and each distinct pair is routed once, so the cost grows with the
+    number of distinct IPs rather than with pairs.
+
+    Returns:
+        dict: {(source_ip, destination_ip): RouteResult}
+    """
+    pairs = list(dict.fromkeys(pairs))
+    ips = list(dict.fromkeys(ip for pair in pairs for ip in pair))
+    index = ipdb_index.get_index()
+    records = dict(zip(ips, index.lookup_many(ips)))
+    logger.debug('route_pairs: %s pairs over %s distinct IPs', len(pairs), len(ips))
+
+    results = {}
+    for source_ip, destination_ip in pairs:
+        source = records[source_ip]
+        destination = records[destination_ip]
+        results[(source_ip, destination_ip)] = route_locations(
+            source_ip, destination_ip,
+            source.location if source else None, source.device if source else None,
+            destination.location if destination else None, destination.device if destination else None,
+        )
+    return results
 
 
 def tickets_split(source_ip, destination_ip, return_list=False):
@@ -774,29 +552,14 @@ def tickets_split(source_ip, destination_ip, return_list=False):
     Returns:
         str: Formatted string with ticket information (default)
         list: List of ticket names (when return_list=True)
-        
-    Note: The function always prints the result string to console, regardless of return_list parameter.
-        
-    DMZ SW01: SN OAM, AliCloud,AliCloud-Mylink, PrivateCloud-TP, SZ-VPN
-    DMZ SW02: NewPrivateCloud, PrivateCloud, SN PCloud
-    M09-CORE-SW01: PrivateCloud
-    M09-EXT-CORE-SW1: PrivateCloud-TP
-    M09-INT-SW01: PrivateCloud
-    M09-SB-SW01: South Base
-    PA: South Base, SN PCloud, Taiping PCloud-VM
-    T01-DR-CORE-SW01: PrivateCloud-GNC
+
+    Both forms come from the same memoized ``route_pair`` evaluation; use
+    ``route_pair`` directly to get them together.
     '''
-    # Get the string result from the internal function (this also prints debug info)
-    result_str = _tickets_split_internal(source_ip, destination_ip)
-    
-    # Always print the result string (original behavior)
-    print(result_str)
-    
-    # Process based on return_list parameter
+    result = route_pair(source_ip, destination_ip)
     if return_list:
-        return _extract_tickets_from_string(result_str)
-    return result_str
-
+        return list(result.tickets)
+    return result.message
 
 
 
@@ -863,14 +626,43 @@ def generate_subnet(network, num_ip_addresses, existing_subnets=None):
         else:
             raise ValueError("Existing subnets must be strings or ipaddress Network objects")
     
-    # Generate possible subnets and find the first available one
-    for subnet in network.subnets(new_prefix=prefix_length):
-        # Check if this subnet overlaps with any existing subnet
-        overlap = any(subnet.overlaps(existing) for existing in normalized_existing)
-        
-        if not overlap:
-            return subnet
-            
+    return _first_free_block(network, prefix_length, normalized_existing)
+
+
+def _first_free_block(network, prefix_length, existing_subnets):
+    """
+    First (lowest) aligned /prefix_length block of ``network`` not overlapping ``existing_subnets``.
+
+    Walks the allocated ranges in address order and jumps the candidate past
+    each one to the next aligned boundary, so the cost is one sort of the
+    existing subnets instead of testing every candidate against every subnet.
+
+    This is not the logarithmic free-space structure the allocator was first
+    asked for: every call sorts and sweeps all n allocated blocks of the pool,
+    O(n log n) per allocation.  A free list kept in memory would go stale
+    across Gunicorn workers, and the caller already reads all n rows of the
+    pool under its lock, so the sweep does not change the order of the cost
+    (pools hold at most a few thousand blocks).
+    """
+    size = 1 << (network.max_prefixlen - prefix_length)
+    parent_start = int(network.network_address)
+    parent_end = int(network.broadcast_address)
+
+    occupied = sorted(
+        (int(subnet.network_address), int(subnet.broadcast_address))
+        for subnet in existing_subnets
+        if subnet.version == network.version and subnet.overlaps(network)
+    )
+
+    candidate = parent_start
+    for start, end in occupied:
+        if candidate + size - 1 < start:
+            break
+        if end >= candidate:
+            candidate = (end // size + 1) * size
+
+    if candidate + size - 1 <= parent_end:
+        return network.__class__((candidate, prefix_length))
     # If no available subnet found
     return None
 
@@ -878,39 +670,31 @@ def generate_subnet(network, num_ip_addresses, existing_subnets=None):
 
 import re
 from netmiko import ConnectHandler
+from django.conf import settings
+from auto_tickets.services.pa_nat import NatSummary, iter_command_lines, parse_session_lines
+from auto_tickets.services.pa_sessions import session_pool
 
 
-def get_nat_config(target_ip):
+def get_nat_config(target_ip, limit=None):
+    """
+    NAT sessions for ``target_ip`` as a :class:`~auto_tickets.services.pa_nat.NatSummary`.
+
+    The session table is parsed line by line as it streams off the firewall;
+    only counts and the first ``limit`` (``PA_NAT_RESULT_LIMIT``) records are kept.
+    """
     firewall_PA = {'device_type': 'paloalto_panos',
-                'host': '10.254.0.14',
+                'host': settings.PA_FIREWALL_HOST,
+                'port': settings.PA_FIREWALL_PORT,
                 'username': 'netcare',
                 'password': '@mhk094!'
                 }
-    net_connect = ConnectHandler(**firewall_PA)
-    output = net_connect.send_command('show session all filter | match ' + target_ip)
-
-
-    output_str = '''
-                1380783      ssl            ACTIVE  FLOW  NS   172.19.1.193[64363]/Internal/6  (43.252.52.2[53865])
-                1788626      ssl            ACTIVE  FLOW  NS   172.19.1.180[63100]/Internal/6  (43.252.52.2[40906])
-                237626       wechat-base    ACTIVE  FLOW  NS   172.19.1.136[54176]/Internal/6  (43.252.52.2[51325])
-                812034       ssl            ACTIVE  FLOW  NS   172.19.1.252[55376]/Internal/6  (43.252.52.2[9834])
-                2388246      bittorrent     ACTIVE  FLOW  NS   172.19.1.224[51413]/Internal/17  (43.252.52.2[34251])
-                1169254      bittorrent     ACTIVE  FLOW  NS   172.19.1.224[51413]/Internal/17  (43.252.52.2[8335])
-                2249456      google-base    ACTIVE  FLOW  NS   172.19.1.237[52493]/Internal/6  (43.252.52.2[30334])
-                vsys1                                          43.252.52.231[2123]/External  (43.252.52.231[2123])
-                '''
-    net_connect.disconnect()
-
-    pa_res = re.findall(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\[(\d+)\][^(]*\((\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\[(\d+)\]\)', output)
-    
-    return pa_res
-    # for i in res:
-    #     print(f'source_ip: {i[0]}')
-    #     print(f'source_port: {i[1]}')
-    #     print(f'destination_ip: {i[2]}')
-    #     print(f'destination_port: {i[3]}')
-    #     print('-' * 50)
+    summary = NatSummary(settings.PA_NAT_RESULT_LIMIT if limit is None else limit)
+    # Pooled session: repeated lookups skip the SSH handshake and login banner
+    with session_pool.session(firewall_PA) as net_connect:
+        lines = iter_command_lines(net_connect, 'show session all filter | match ' + target_ip)
+        for record in parse_session_lines(lines):
+            summary.add(record)
+    return summary
 
 
 #Auto Tickets PA
@@ -931,65 +715,19 @@ except ImportError:
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'network_tickets.settings')
 django.setup()
-
-# Setup logging
-def setup_logging():
-    """Setup comprehensive logging for Netmiko sessions"""
-    # Create logs directory if it doesn't exist
-    log_dir = '/it_network/network_tickets/logs'
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Create timestamp for log files
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # Setup main logger
-    logger = logging.getLogger('netmiko_session')
-    logger.setLevel(logging.DEBUG)
-    
-    # Clear any existing handlers
-    logger.handlers.clear()
-    
-    # File handler for session log
-    session_log_file = f'{log_dir}/netmiko_session_{timestamp}.log'
-    file_handler = logging.FileHandler(session_log_file)
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Console handler for real-time output
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    # Setup Netmiko debug logging
-    netmiko_logger = logging.getLogger('netmiko')
-    netmiko_logger.setLevel(logging.DEBUG)
-    
-    # Netmiko debug file handler
-    debug_log_file = f'{log_dir}/netmiko_debug_{timestamp}.log'
-    debug_handler = logging.FileHandler(debug_log_file)
-    debug_handler.setLevel(logging.DEBUG)
-    debug_handler.setFormatter(formatter)
-    netmiko_logger.addHandler(debug_handler)
-    
-    logger.info(f"Logging initialized - Session log: {session_log_file}")
-    logger.info(f"Debug log: {debug_log_file}")
-    
-    return logger
-
-
-
-def auto_tickets_pa_tools(wb, username, password):
-    # Initialize logging
-    logger = setup_logging()
+from django.conf import settings
+from auto_tickets.services.pa_config import ConfigPlan, ExistingConfig, apply_plan
+from auto_tickets.services.pa_fib import FibSnapshot, save_run_snapshot
+from auto_tickets.services.pa_jobs import PaJobError, start_commit_job, validate_and_commit
+from auto_tickets.services.pa_sessions import session_pool
+from auto_tickets.services.pa_zones import ZoneResolver
+from auto_tickets.services.run_log import RunLog
+
+def auto_tickets_pa_tools(wb, username, password, commit_job_id=None):
+    # Queue-based logging (one daily file, tagged with the run id); res_log keeps the last lines for the UI
+    res_log = RunLog()
+    logger = res_log.logger
     logger.info("Starting auto_tickets_pa function")
-    res_log = []
     res_log.append('Starting auto_tickets_pa function')
     
     try:
@@ -1008,16 +746,19 @@ def auto_tickets_pa_tools(wb, username, password):
             error_msg = f"No data found in Excel file. Expected data starting from row {start_row}."
             logger.error(error_msg)
             res_log.append(f"ERROR: {error_msg}")
-            return res_log
+            return res_log.result()
 
         firewall_PA = {'device_type': 'paloalto_panos',
-                   'host': '10.254.0.14',
+                   'host': settings.PA_FIREWALL_HOST,
+                   'port': settings.PA_FIREWALL_PORT,
                    'username': username,
                    'password': password,
-                   'session_log': '/it_network/network_tickets/logs/netmiko_session.log',
-                   'session_log_file_mode': 'append',
                    'global_delay_factor': 2,
                    }
+        if settings.PA_NETMIKO_SESSION_LOG:
+            # Raw channel transcript; written synchronously, so only when asked for
+            firewall_PA['session_log'] = settings.PA_NETMIKO_SESSION_LOG
+            firewall_PA['session_log_file_mode'] = 'append'
         
         logger.info(f"Connecting to firewall: {firewall_PA['host']}")
         logger.info(f"Using username: {username}")
@@ -1028,7 +769,9 @@ def auto_tickets_pa_tools(wb, username, password):
         res_log.append(f"Password length: {len(password) if password else 0}")
         
         try:
-            net_connect = ConnectHandler(**firewall_PA)
+            # Reuses a pooled session for these credentials when one is idle
+            firewall_session = session_pool.acquire(firewall_PA)
+            net_connect = firewall_session.connection
             logger.info("Successfully connected to firewall")
             logger.info(f"Device prompt: {net_connect.find_prompt()}")
             res_log.append(f"Successfully connected to firewall")
@@ -1037,8 +780,46 @@ def auto_tickets_pa_tools(wb, username, password):
             error_msg = f"Failed to connect to firewall: {e}"
             logger.error(error_msg)
             res_log.append(f"ERROR: {error_msg}")
-            return res_log
+            return res_log.result()
 
+        def _log_command(command):
+            logger.info(f"Executing command: {command}")
+            res_log.append(f"Executing command: {command}")
+
+        # Pull the FIB and interface zones once; per-IP CLI lookups only for what the snapshot misses
+        fib_snapshot = None
+        try:
+            fib_snapshot = FibSnapshot.capture(net_connect, settings.PA_VIRTUAL_ROUTER)
+            logger.info(f"FIB snapshot: {len(fib_snapshot.routes)} routes, {len(fib_snapshot.interface_zones)} interfaces")
+            res_log.append(f"FIB snapshot: {len(fib_snapshot.routes)} routes, {len(fib_snapshot.interface_zones)} interfaces")
+        except Exception as e:
+            logger.warning(f"FIB snapshot unavailable, using per-IP lookups: {e}")
+            res_log.append(f"FIB snapshot unavailable, using per-IP lookups: {e}")
+        if fib_snapshot is not None and settings.PA_FIB_SNAPSHOT_DIR:
+            try:
+                snapshot_file = save_run_snapshot(
+                    fib_snapshot, settings.PA_FIB_SNAPSHOT_DIR, settings.PA_FIB_SNAPSHOT_KEEP
+                )
+                logger.info(f"FIB snapshot saved: {snapshot_file}")
+            except OSError as e:
+                logger.warning(f"Could not save FIB snapshot: {e}")
+
+        # IP -> interface -> zone, shared across rows (and across runs via the Django cache)
+        zone_resolver = ZoneResolver(net_connect, host=firewall_PA['host'], on_command=_log_command, snapshot=fib_snapshot)
+        # What is already on the firewall, so re-runs only push what is missing
+        try:
+            existing_config = ExistingConfig.fetch(net_connect)
+            res_log.append(
+                f"Existing config: {len(existing_config.addresses)} addresses, {len(existing_config.address_groups)} address-groups, "
+                f"{len(existing_config.services)} services, {len(existing_config.rules)} security rules"
+            )
+        except Exception as e:
+            existing_config = None
+            logger.warning(f"Could not read existing config, planning every object: {e}")
+            res_log.append(f"Could not read existing config, planning every object: {e}")
+
+        # Objects and rules for the whole workbook, deduplicated across rows
+        config_plan = ConfigPlan(existing_config)
 
         for row in range(start_row, end_row+1):
             try:
@@ -1053,7 +834,6 @@ def auto_tickets_pa_tools(wb, username, password):
                 dip_list = []
                 dport_list = []
                 protocol_list = []
-                print(f'row: {row}')
                 res_log.append(f'Processing row: {row}')
                 
                 ticket_number = sheet.cell(row=row, column=1).value
@@ -1131,27 +911,7 @@ def auto_tickets_pa_tools(wb, username, password):
 
                 for sip in sip_dic[row]:
                     try:
-                        print(f'sip: {sip}')
-                        command = f'test routing fib-lookup virtual-router vr_vsys1 ip {sip}'
-                        logger.info(f"Executing command: {command}")
-                        check_sip_raw = net_connect.send_command(command)
-                        logger.debug(f'check_sip_raw response: {check_sip_raw}')
-                        res_log.append(f"Executing command: {command}")
-                        print(f'check_sip_raw: {check_sip_raw}')
-                        # print(f'check_sip_raw:{check_sip_raw}')
-
-                        # print('-' * 100)
-                        interface = re.search(r'interface\s(ethernet\d/\d+),',check_sip_raw).group(1) 
-                        command = f'show interface {interface}'
-                        logger.info(f"Executing command: {command}")
-                        check_int_raw = net_connect.send_command(command)
-                        logger.debug(f'check_int_raw response: {check_int_raw}')
-                        res_log.append(f"Executing command: {command}")
-                        print(f'check_int_raw: {check_int_raw}')
-                        zone = re.search(r'Zone:\s(\w+),',check_int_raw).group(1)
-
-                        # print(f'interface:{interface}')
-                        # print('-' * 100)
+                        zone = zone_resolver.zone_for(sip)
                         logger.info(f"Source IP {sip} mapped to zone {zone}")
                         res_log.append(f"Source IP {sip} mapped to zone {zone}")
                         sip_zone_dic[sip] = zone
@@ -1164,21 +924,7 @@ def auto_tickets_pa_tools(wb, username, password):
 
                 for dip in dip_dic[row]:
                     try:
-                        command = f'test routing fib-lookup virtual-router vr_vsys1 ip {dip}'
-                        logger.info(f"Executing command: {command}")
-                        check_dip_raw = net_connect.send_command(command)
-                        logger.debug(f'check_dip_raw response: {check_dip_raw}')
-                        res_log.append(f"Executing command: {command}")
-                        # print(check_dip_raw)
-                        interface = re.search(r'interface\s(ethernet\d/\d+),',check_dip_raw).group(1)    
-                        
-                        command = f'show interface {interface}'
-                        logger.info(f"Executing command: {command}")
-                        check_int_raw = net_connect.send_command(command)
-                        logger.debug(f'check_int_raw response: {check_int_raw}')
-                        res_log.append(f"Executing command: {command}")
-                        print(f'check_int_raw: {check_int_raw}')
-                        zone = re.search(r'Zone:\s(\w+),',check_int_raw).group(1)
+                        zone = zone_resolver.zone_for(dip)
                         logger.info(f"Destination IP {dip} mapped to zone {zone}")
                         res_log.append(f"Destination IP {dip} mapped to zone {zone}")
                         dip_zone_dic[dip] = zone
@@ -1196,13 +942,6 @@ def auto_tickets_pa_tools(wb, username, password):
                 for sip, s_zone in sip_zone_dic.items():
                     for dip, d_zone in dip_zone_dic.items():
                         if s_zone != d_zone:
-                            print(f'ticket number: {ticket_number_dic[row]}')
-                            print(f'source zone: {s_zone}')
-                            print(f'destination zone: {d_zone}')
-                            print(f'source ip: {sip}')
-                            print(f'destination ip: {dip}')
-                            print(f'destination port: {dport_dic[row]}')
-                            print('-' * 100)
                             res_log.append(f"ticket number: {ticket_number_dic[row]}")
                             res_log.append(f"source zone: {s_zone}")
                             res_log.append(f"destination zone: {d_zone}")
@@ -1212,8 +951,6 @@ def auto_tickets_pa_tools(wb, username, password):
                             sip_ip_set.add(sip)
                             dip_ip_set.add(dip)
                         else:
-                            print(f'{sip} and {dip} belong to the same zone. No action needed')
-                            print('-' * 100)
                             res_log.append(f"{sip} and {dip} belong to the same zone. No action needed")
 
                 #skip the current row if there is no action needed   
@@ -1221,334 +958,101 @@ def auto_tickets_pa_tools(wb, username, password):
                     res_log.append(f"Row {row}: No cross-zone traffic detected, skipping")
                     continue
 
-                print('-' * 100)
-                print('Create source ip and destination ip in the firewall')
-                res_log.append(f"Create source ip and destination ip in the firewall")
-                print('-' * 100)
-                
-                print(f'source set: {sip_ip_set}')
-                print(f'destination set: {dip_ip_set}')
-                print('-' * 100)
-
-                src_zone_list = []
-                dst_zone_list = []
-                for sip in sip_ip_set:
-                    src_zone_list.append(sip_zone_dic[sip])
-                for dip in dip_ip_set:
-                    dst_zone_list.append(dip_zone_dic[dip])
-                src_zone_set = set(src_zone_list)
-                dst_zone_set = set(dst_zone_list)
-
-
                 src_zone_ip_dic = {}
                 dst_zone_ip_dic = {}
-                
-                # Initialize dictionaries with empty lists for each zone
-                for zone in src_zone_set:
-                    src_zone_ip_dic[zone] = []
-                for zone in dst_zone_set:
-                    dst_zone_ip_dic[zone] = []
-                    
-                for zone in src_zone_set:
-                    for sip in sip_ip_set:
-                        if sip_zone_dic[sip] == zone:
-                            src_zone_ip_dic[zone].append(sip)
-                for zone in dst_zone_set:
-                    for dip in dip_ip_set:
-                        if dip_zone_dic[dip] == zone:
-                            dst_zone_ip_dic[zone].append(dip)
-            
-                print(f'src_zone_ip_dic: {src_zone_ip_dic}')
-                print(f'dst_zone_ip_dic: {dst_zone_ip_dic}')
-                print('-' * 100)
+                for sip in sorted(sip_ip_set):
+                    src_zone_ip_dic.setdefault(sip_zone_dic[sip], []).append(sip)
+                for dip in sorted(dip_ip_set):
+                    dst_zone_ip_dic.setdefault(dip_zone_dic[dip], []).append(dip)
+
                 res_log.append(f"src_zone_ip_dic: {src_zone_ip_dic}")
                 res_log.append(f"dst_zone_ip_dic: {dst_zone_ip_dic}")
-                print('-' * 100)
-
-                print('enter config mode')
-                logger.info("Entering configuration mode")
-                res_log.append(f"Entering configuration mode")
-                out = net_connect.config_mode()
-                logger.debug(f"Config mode response: {out}")
-                # print(out)
-                # print('-' * 100)
-                logger.info("Starting address creation in firewall")
-                res_log.append(f"Starting address creation in firewall")
-        
-                
-                #create source ip and destination ip in the firewall
-                for sip in sip_ip_set:
-                    command = f'set address {sip} description generated-by-netcare ip-netmask {sip}'
-                    logger.info(f"Creating source address: {command}")
-                    res_log.append(f"Creating source address: {command}")
-                    try:
-                        res = net_connect.send_command(command)
-                        logger.info(f"Successfully created address {sip}")
-                        print(f"Created address {sip}: {res}")
-                        res_log.append(f"Successfully created address {sip}")
-                        
-                    except Exception as e:
-                        error_msg = f"Failed to create address {sip}: {e}"
-                        logger.error(error_msg)
-                        print(f"Failed to create address {sip}: {e}")
-                        res_log.append(f"ERROR: {error_msg}")
-                        
-                # Create destination addresses  
-                for dip in dip_ip_set:
-                    command = f'set address {dip} description generated-by-netcare ip-netmask {dip}'
-                    logger.info(f"Creating destination address: {command}")
-                    res_log.append(f"Creating destination address: {command}")
-                    try:
-                        res = net_connect.send_command(command)
-                        logger.info(f"Successfully created address {dip}")
-                        print(f"Created address {dip}: {res}")
-                        res_log.append(f"Successfully created address {dip}")
-                    
-                    except Exception as e:
-                        error_msg = f"Failed to create address {dip}: {e}"
-                        logger.error(error_msg)
-                        print(f"Failed to create address {dip}: {e}")
-                        res_log.append(f"ERROR: {error_msg}")
-                
-                res_log.append(f"Create source address-group and destination address-group in the firewall")
-                #create source address-group and destination address-group in the firewall
-                print('Create source address-group and destination address-group in the firewall')
-                sleep(1)
-                # print("Back to operational mode. Prompt:", net_connect.find_prompt())
-
-                # print(type(ticket_number_dic[row]))
-                print("Back to operational mode. Prompt:", net_connect.find_prompt())
-                
-                for zone in src_zone_ip_dic:
-                    command = f'edit address-group {ticket_number_dic[row]}-src-row{row}-{zone}'
-                    logger.info(f"Creating source address-group: {command}")
-                    res_log.append(f"Creating source address-group: {command}")
-                    res = net_connect.send_command(command)
-                    logger.info(f"Successfully created source address-group: {res}")
-                    res_log.append(f"Successfully created source address-group: {res}")
-                    print('-' * 100)
-                    for sip in src_zone_ip_dic[zone]:
-                        command = f'set static {sip}'
-                        res = net_connect.send_command(command)
-                        logger.info(f"Successfully added static address: {res}")
-                        res_log.append(f"Successfully added static address: {res}")
-                        print(f'Added static address: {sip}')
-                #         print('-' * 100)
-                    command = f'set description generated-by-netcare'
-                    res = net_connect.send_command(command)
-                    logger.info(f"Successfully set description: {res}")
-                    res_log.append(f"Successfully set description: {res}")
-                    net_connect.send_command('exit')
-                    print('-' * 100)    
-                
-                for zone in dst_zone_ip_dic:
-                    command = f'edit address-group {ticket_number_dic[row]}-dst-row{row}-{zone}'
-                    logger.info(f"Creating destination address-group: {command}")
-                    res_log.append(f"Creating destination address-group: {command}")
-                    res = net_connect.send_command(command)
-                    logger.info(f"Successfully created destination address-group: {res}")
-                    res_log.append(f"Successfully created destination address-group: {res}")
-                    print('-' * 100)
-                    for dip in dst_zone_ip_dic[zone]:
-                        command = f'set static {dip}'
-                        res = net_connect.send_command(command)
-                        logger.info(f"Successfully added static address: {res}")
-                        res_log.append(f"Successfully added static address: {res}")
-                        print(f'Added static address: {dip}')
-                    command = f'set description generated-by-netcare'
-                    res = net_connect.send_command(command)
-                    logger.info(f"Successfully set description: {res}")
-                    res_log.append(f"Successfully set description: {res}")
-                    net_connect.send_command('exit')
-                    print('-' * 100)
-                
-                # # #create service and security rule in the firewall
-                print('create service and security rule in the firewall')
-                res_log.append(f"create service and security rule in the firewall")
-                print("Back to operational mode. Prompt:", net_connect.find_prompt())
-                sleep(1)
-                # net_connect.send_command('exit')
-                # print('create service in the firewall')
-                for src_zone in src_zone_set:
-                    for dst_zone in dst_zone_set:
-                        if src_zone != dst_zone:
-                            if protocol_dic[row] == 'tcp' or protocol_dic[row] == 'TCP':
-                                for dport in dport_dic[row]:
-                                    print(f'dport: {dport}')
-                                    print(f'dport_dic[row]: {dport_dic[row]}')
-                                    if dport != 'icmp' and dport != 'ICMP':
-                                        command = f'set service tcp-{dport}-netcare description generated-by-netcare protocol tcp port {dport}'
-                                        logger.info(f"Creating service: {command}")
-                                        res_log.append(f"Creating service: {command}")
-                                        res = net_connect.send_command(command)
-                                        logger.info(f"Successfully created service: {res}")
-                                        res_log.append(f"Successfully created service: {res}")
-
-                                        command_list = ['edit rulebase security rules ' + ticket_number_dic[row] + '-tcp' + dport + '-row' + str(row) + '-' + src_zone + '-' + dst_zone + '-netcare', 
-                                        'set source ' + ticket_number_dic[row] + '-src-row' + str(row) +'-' + src_zone + ' destination ' + ticket_number_dic[row] + '-dst-row' + str(row) + '-' + dst_zone + ' from ' + src_zone + ' to ' + dst_zone + ' service ' + 'tcp-' + dport + '-netcare',
-                                        'set description generated-by-netcare','set application any','set action allow','exit', 'exit', 'exit', 'move rulebase security rules ' + ticket_number_dic[row] + '-tcp' + dport + '-row' + str(row) + '-' + src_zone + '-' + dst_zone + '-netcare top']
-                                        
-                                        res_log.append(f"Creating security rule: {command_list}")
-
-                                        res = net_connect.send_config_set(command_list, exit_config_mode=False)
-                                        sleep(1)
-                                        logger.info(f"Successfully created security rule: {res}")
-
-                                        # print("Back to operational mode. Prompt:", net_connect.find_prompt())
-
-                                        
-                                    else:
-                                        command_list = ['edit rulebase security rules ' + 'icmp' + '-netcare', 
-                                        'set source ' + ticket_number_dic[row] + '-src-row' + str(row) + '-' + src_zone + ' destination ' + ticket_number_dic[row] + '-dst-row' + str(row) + '-' + dst_zone + ' from any to any service application-default application icmp ',
-                                        'set description generated-by-netcare','set action allow','exit', 'exit', 'exit']
-                                        res_log.append(f"Creating security rule: {command_list}")
-                                    
-                                        res = net_connect.send_config_set(command_list, exit_config_mode=False)
-                                        sleep(1)
-                                        logger.info(f"Successfully created security rule: {res}")
-
-                            elif protocol_dic[row] == 'udp' or protocol_dic[row] == 'UDP':
-                                for dport in dport_dic[row]:
-                                    if dport != 'icmp' and dport != 'ICMP':
-                                        command = f'set service udp-{dport}-netcare description generated-by-netcare protocol udp port {dport}'
-                                        logger.info(f"Creating service: {command}")
-                                        res_log.append(f"Creating service: {command}")
-                                        res = net_connect.send_command(command)
-                                        logger.info(f"Successfully created service: {res}")
-                                        res_log.append(f"Successfully created service: {res}")
-                                        
-                                        command_list = ['edit rulebase security rules ' + ticket_number_dic[row] + '-udp' + dport + '-row' + str(row) + '-' + src_zone + '-' + dst_zone + '-netcare', 
-                                        'set source ' + ticket_number_dic[row] + '-src-row' + str(row) + '-' + src_zone + ' destination ' + ticket_number_dic[row] + '-dst-row' + str(row) + '-' + dst_zone + ' from ' + src_zone + ' to ' + dst_zone + ' service ' + 'udp-' + dport + '-netcare',
-                                        'set description generated-by-netcare','set application any','set action allow','exit', 'exit', 'exit', 'move rulebase security rules ' + ticket_number_dic[row] + '-udp' + dport + '-row' + str(row) + '-' + src_zone + '-' + dst_zone + '-netcare top']
-                                        res_log.append(f"Creating security rule: {command_list}")
-                                        
-                                        res = net_connect.send_config_set(command_list, exit_config_mode=False)
-                                        sleep(1)
-                                        logger.info(f"Successfully created security rule: {res}")
-                                        res_log.append(f"Successfully created security rule: {res}")
-                                    else:
-                                        command_list = ['edit rulebase security rules ' + 'icmp' + '-' + 'netcare', 
-                                        'set source ' + ticket_number_dic[row] + '-src-row' + str(row) + '-' + src_zone + ' destination ' + ticket_number_dic[row] + '-dst-row' + str(row) + '-' + dst_zone + ' from any to any service application-default application icmp ',
-                                        'set description generated-by-netcare','set action allow','exit', 'exit', 'exit']
-                                        res_log.append(f"Creating security rule: {command_list}")
-                                        res = net_connect.send_config_set(command_list, exit_config_mode=False)
-                                        sleep(1)
-                                        logger.info(f"Successfully created security rule: {res}")
-                                        res_log.append(f"Successfully created security rule: {res}")
-                            elif protocol_dic[row] == 'icmp' or protocol_dic[row] == 'ICMP':
-                                command_list = ['edit rulebase security rules ' + 'icmp' + '-' + 'netcare', 
-                                'set source ' + ticket_number_dic[row] + '-src-row' + str(row) + '-' + src_zone + ' destination ' + ticket_number_dic[row] + '-dst-row' + str(row) + '-' + dst_zone + ' from any to any service application-default application icmp ',
-                                'set description generated-by-netcare','set action allow','exit', 'exit', 'exit']
-                                res_log.append(f"Creating security rule: {command_list}")
-
-                                res = net_connect.send_config_set(command_list, exit_config_mode=False)
-                                sleep(1)
-                                logger.info(f"Successfully created security rule: {res}")
-                                res_log.append(f"Successfully created security rule: {res}")
-                            else:
-                                error_msg = 'Pls check the protocol and port in the excel file.'
-                                logger.error(error_msg)
-                                res_log.append(f"ERROR: {error_msg}")
 
-                
-                print('I am here')
-                res_log.append(f"Exiting configuration mode")
-                logger.info("Exiting configuration mode")
-                # print("Back to operational mode. Prompt:", net_connect.find_prompt())
-                net_connect.exit_config_mode()   
-            
+                # Only plan here; everything is pushed in batches once all rows are read
+                planned = len(config_plan)
+                row_errors = config_plan.add_row(
+                    row, ticket_number_dic[row], src_zone_ip_dic, dst_zone_ip_dic, protocol_dic[row], dport_dic[row]
+                )
+                for error in row_errors:
+                    error_msg = f'ROW {row}: {error}'
+                    logger.error(error_msg)
+                    res_log.append(f"ERROR: {error_msg}")
+                res_log.append(f"Row {row}: planned {len(config_plan) - planned} new config commands")
+
             except Exception as e:
                 error_msg = f"Error processing row {row}: {e}"
                 logger.error(error_msg)
                 res_log.append(f"ERROR: {error_msg}")
                 continue
- 
-         #check if there is any job running before validate
-        while True:
-            command = 'show jobs all'
-            output = net_connect.send_command(command)
-            print(f'Show jobs status: {output}')
-            logger.info(f"Show jobs status: {output}")
-            res_log.append(f"Show jobs status: {output}")
-            if 'ACT' in output:
-                sleep(60)
-            else:
-                break
-        
-        #validate job
-        net_connect.config_mode()
-        logger.info(f"Back to operational mode. Prompt: {net_connect.find_prompt()}")
-        command ='validate partial admin ' + username
-        output = net_connect.send_command(command)
-        net_connect.send_command('exit', expect_string=r'>')
-        logger.info(f"Back to check mode. Prompt: {net_connect.find_prompt()}")
-        print(f'Validate status: {output}')
-        logger.info(f"Validate status: {output}")
-        res_log.append(f"Validate status: {output}")
-        validate_job_id = re.search(r'jobid\s+(\d+)', output).group(1)
-        print(f'Validate job id: {validate_job_id}')
-        logger.info(f"Validate job id: {validate_job_id}")
-        res_log.append(f"Validate job id: {validate_job_id}")
-        
-        
-        while True:
-            command = f'show jobs id {validate_job_id}'
-            output = net_connect.send_command(command)
-            print(f'Validate status: {output}')
-            logger.info(f"Validate status: {output}")
-            res_log.append(f"Validate status: {output}")
-            if 'FIN' in output and 'OK' in output:
-                res_log.append("Validation completed successfully")
-                break   # next step is commit
-            elif 'FAIL' in output:
-                error_msg = "Validation failed"
+
+        logger.info(f"Zone resolution: {zone_resolver.commands_sent} CLI commands sent")
+
+        def _log_batch(index, count, output):
+            logger.info(f"Config batch {index}: {count} commands")
+            logger.debug(f"Config batch {index} output: {output}")
+            res_log.append(f"Config batch {index}: {count} commands sent")
+
+        logger.info(f"Applying config plan: {len(config_plan)} commands")
+        res_log.append(f"Applying config plan: {len(config_plan)} commands")
+        failed_rows = apply_plan(net_connect, config_plan, batch_size=settings.PA_CONFIG_BATCH_SIZE, on_batch=_log_batch)
+        for row in sorted(failed_rows):
+            for error in failed_rows[row]:
+                error_msg = f'ROW {row}: {error}'
                 logger.error(error_msg)
                 res_log.append(f"ERROR: {error_msg}")
-                net_connect.disconnect()
+        res_log.append(f"Config plan applied, exiting configuration mode")
+        if config_plan.skipped:
+            res_log.append(f"Skipped {config_plan.skipped} objects / rules that already exist")
+
+        if not len(config_plan):
+            # Nothing new to push; only commit if an earlier run left changes uncommitted
+            output = net_connect.send_command('check pending-changes')
+            logger.info(f"Pending changes: {output}")
+            if output.strip().lower().endswith('no'):
+                res_log.append("Nothing to commit, all objects and rules already exist")
+                firewall_session.release()
                 res_log.append(f"Disconnecting from firewall")
-                return res_log  
-            else:
-                res_log.append("Validation still in progress, waiting...")
-                sleep(60)
-        print('Validate status: FIN OK')
-        logger.info("Validate status: FIN OK")
-        res_log.append(f"Validate status: FIN OK")
-
-        #check if there is any job running before commit
-        while True:
-            command = 'show jobs all'
-            output = net_connect.send_command(command)
-            print(f'Show jobs status: {output}')
-            logger.info(f"Show jobs status: {output}")
-            res_log.append(f"Show jobs status: {output}")
-            if 'ACT' in output:
-                sleep(60)
-            else:
-                break
-        net_connect.config_mode()
-        logger.info(f"Back to operational mode. Prompt: {net_connect.find_prompt()}")
-        commit_command = 'commit partial admin ' + username + ' description commit-by-netcare'
-        commit_output = net_connect.send_command_timing(commit_command,read_timeout=0)
-        print(f"Successfully committed: {commit_output}")
+                return res_log.result()
+
+        if commit_job_id:
+            # Validate / commit continue in the background on this session (services/pa_jobs.py)
+            start_commit_job(commit_job_id, net_connect, username, release=firewall_session.release)
+            res_log.append(f"Validate and commit running in background job {commit_job_id}")
+            logger.info(f"Validate and commit handed to background job {commit_job_id}")
+            return res_log.result()
+
+        def _log_job(message):
+            logger.info(message)
+            res_log.append(message)
+
+        try:
+            commit_output = validate_and_commit(net_connect, username, log=_log_job)
+        except PaJobError as e:
+            error_msg = f"Validate/commit failed: {e}"
+            logger.error(error_msg)
+            res_log.append(f"ERROR: {error_msg}")
+            firewall_session.release()
+            res_log.append(f"Disconnecting from firewall")
+            return res_log.result()
         logger.info(f"Successfully committed: {commit_output}")
-        res_log.append(f"{commit_output}") 
+        res_log.append(f"{commit_output}")
         logger.info("Disconnecting from firewall")
-        net_connect.disconnect()
+        firewall_session.release()
         res_log.append(f"Disconnecting from firewall")
         logger.info("Successfully disconnected from firewall")
         logger.info("auto_tickets_pa function completed")
-        return res_log
+        return res_log.result()
     
     except Exception as e:
         error_msg = f"Critical error in auto_tickets_pa_tools: {e}"
         logger.error(error_msg)
         res_log.append(f"ERROR: {error_msg}")
         try:
-            net_connect.disconnect()
+            firewall_session.release(discard=True)
             res_log.append("Disconnected from firewall after error")
         except:
             pass
-        return res_log
+        return res_log.result()
 
 
 
@@ -7,73 +7,57 @@ EOMS 自动化脚本
 """
 
 import json
-import os
 import re
 import asyncio
-import tempfile
-import time
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+import urllib3
 from playwright.async_api import async_playwright, Page
 
-# ---- Session cache (shared across calls within the same process/worker) ----
-_EOMS_SESSION_CACHE_DIR = os.path.join(tempfile.gettempdir(), "eoms_sessions")
-_EOMS_SESSION_MAX_AGE = 25 * 60  # seconds – reuse within 25 minutes
+from auto_tickets.services import eoms_browser_pool, eoms_session_store
+
+# ---- Session cache (shared by all workers via the Django cache, see eoms_session_store) ----
+# Captured request headers worth replaying on the pure-HTTP path (cookies come from storage_state)
+_REPLAY_HEADERS = ("user-agent", "accept-language", "authorization", "x-csrf-token", "x-requested-with")
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
-def _session_cache_path(username: str) -> str:
-    """Per-user session cache file path."""
-    os.makedirs(_EOMS_SESSION_CACHE_DIR, exist_ok=True)
-    safe = re.sub(r'[^a-zA-Z0-9]', '_', username.lower())
-    return os.path.join(_EOMS_SESSION_CACHE_DIR, f"eoms_session_{safe}.json")
+def _load_cached_meta(username: str):
+    """Return the shared cached session dict (storage_state, def_id, headers, login_id) or None."""
+    meta = eoms_session_store.load_session(username)
+    if meta:
+        age = eoms_session_store.session_age(meta)
+        print(f"♻️ 复用缓存会话 (user={username}, age={age:.0f}s, defId={meta.get('def_id') or ''})")
+    return meta
 
 
 def _load_cached_session(username: str):
-    """Return (storage_state_path, def_id) if a valid cached session exists."""
-    path = _session_cache_path(username)
-    if not os.path.isfile(path):
+    """Return (storage_state, def_id) if a valid cached session exists."""
+    meta = _load_cached_meta(username)
+    if not meta:
         return None, None
-    try:
-        age = time.time() - os.path.getmtime(path)
-        if age > _EOMS_SESSION_MAX_AGE:
-            print(f"⏰ 缓存会话已过期 ({age:.0f}s > {_EOMS_SESSION_MAX_AGE}s)")
-            os.remove(path)
-            return None, None
-        with open(path, "r") as f:
-            meta = json.load(f)
-        ss_path = meta.get("storage_state_path")
-        def_id = meta.get("def_id") or ""
-        if ss_path and os.path.isfile(ss_path):
-            print(f"♻️ 复用缓存会话 (user={username}, age={age:.0f}s, defId={def_id})")
-            return ss_path, def_id
-    except Exception as e:
-        print(f"⚠️ 加载缓存会话失败: {e}")
-    return None, None
+    return meta["storage_state"], meta.get("def_id") or ""
 
 
-def _save_session_cache(username: str, storage_state_path: str, def_id: str):
-    """Persist session state so later calls can skip login."""
-    path = _session_cache_path(username)
-    try:
-        with open(path, "w") as f:
-            json.dump({
-                "storage_state_path": storage_state_path,
-                "def_id": def_id,
-                "saved_at": time.time(),
-            }, f)
+def _save_session_cache(username: str, storage_state: dict, def_id: str, headers: dict = None, login_id: str = None):
+    """Share the session state with every worker so later calls can skip login."""
+    replay = {k: v for k, v in (headers or {}).items() if k.lower() in _REPLAY_HEADERS}
+    if eoms_session_store.save_session(username, storage_state, def_id, replay, login_id=login_id):
         print(f"💾 会话已缓存 (user={username}, defId={def_id})")
-    except Exception as e:
-        print(f"⚠️ 保存会话缓存失败: {e}")
+    else:
+        print("⚠️ 保存会话缓存失败")
 
 
 def _invalidate_session_cache(username: str):
     """Remove cached session (e.g. after detecting it's expired)."""
-    path = _session_cache_path(username)
-    try:
-        if os.path.isfile(path):
-            os.remove(path)
-    except OSError:
-        pass
+    eoms_session_store.invalidate_session(username)
+    _drop_http_session(username)
 
 
 def _looks_like_cas_login_page(text: str) -> bool:
@@ -119,9 +103,43 @@ class EOmsClient:
         self._browser = None
         self._context = None
         self._page = None
+        self._lease = None
+
+    async def _open_context(self, headless: bool = True, storage_state: str = None):
+        """
+        Browser + context for this client: leased from the warm pool when running on
+        the pool loop (headless only), otherwise a freshly launched Chromium.
+        """
+        pool = eoms_browser_pool.get_pool() if headless else None
+        if pool is not None:
+            self._lease = await pool.acquire(storage_state=storage_state)
+            self._browser = self._lease.browser
+            self._context = self._lease.context
+            return self._browser, self._context
 
-    async def close(self):
-        """Close the Playwright browser and stop the playwright instance."""
+        p = await async_playwright().start()
+        self._playwright = p
+        browser = await p.chromium.launch(headless=headless)
+        self._browser = browser
+        context = await browser.new_context(
+            ignore_https_errors=True,
+            viewport={"width": 1280, "height": 800},
+            storage_state=storage_state,
+        )
+        self._context = context
+        return browser, context
+
+    async def close(self, discard: bool = False):
+        """Release the pooled browser, or close the browser and stop the playwright instance."""
+        if self._lease:
+            try:
+                await self._lease.release(discard=discard)
+            except Exception:
+                pass
+            self._lease = None
+            self._browser = None
+            self._context = None
+            self._page = None
         if self._browser:
             try:
                 await self._browser.close()
@@ -152,7 +170,7 @@ class EOmsClient:
         print(f"📍 当前页面 URL: {final_url}")
         if "ncas.cmhktry.com" in final_url or "/cas/login" in final_url:
             print("❌ 导航到首页后仍在 CAS 登录页，登录未成功!")
-            await browser.close()
+            await self.close()
             return {}
 
         cookies_list = await context.cookies()
@@ -187,13 +205,8 @@ class EOmsClient:
         # Cache the session for reuse by subsequent calls
         if self.username and self.def_id:
             try:
-                ss_path = os.path.join(
-                    _EOMS_SESSION_CACHE_DIR,
-                    f"eoms_ss_{re.sub(r'[^a-zA-Z0-9]', '_', self.username.lower())}.json",
-                )
-                os.makedirs(_EOMS_SESSION_CACHE_DIR, exist_ok=True)
-                await context.storage_state(path=ss_path)
-                _save_session_cache(self.username, ss_path, self.def_id)
+                state = await context.storage_state()
+                _save_session_cache(self.username, state, self.def_id, self.home_headers or self.headers)
             except Exception as e:
                 print(f"⚠️ 保存缓存会话失败: {e}")
 
@@ -211,7 +224,7 @@ class EOmsClient:
         timeout_seconds: int = 30,
         captcha_code: str = "",
         captcha_code_provider=None,
-        resume_state_path: str = None,
+        resume_state: dict = None,
     ) -> dict:
         """
         自动登录并捕获请求头和 Cookies，获取 defId
@@ -223,25 +236,18 @@ class EOmsClient:
             captcha_code: 验证码（可选，检测到验证码时使用）
             captcha_code_provider: 验证码提供函数（可选），
                 支持 sync/async callable，签名示例: lambda: "123456"
-            resume_state_path: Playwright storage_state JSON（短信第二步恢复同一会话）
+            resume_state: Playwright storage_state（短信第二步恢复同一会话，见 eoms_session_store）
         
         返回:
             包含 cookies, headers, home_headers, def_id 的字典；
             若 need_captcha 则可能含 resume_token（用于第二步请求）。
         """
         # ---- Try cached session first (skip login entirely) ----
-        if not resume_state_path and self.username:
+        if not resume_state and self.username:
             cached_ss, cached_def_id = _load_cached_session(self.username)
             if cached_ss:
                 try:
-                    p = await async_playwright().start()
-                    self._playwright = p
-                    browser = await p.chromium.launch(headless=headless)
-                    context = await browser.new_context(
-                        ignore_https_errors=True,
-                        viewport={"width": 1280, "height": 800},
-                        storage_state=cached_ss,
-                    )
+                    browser, context = await self._open_context(headless, storage_state=cached_ss)
                     page = await context.new_page()
                     await page.goto(self.home_url, wait_until="networkidle")
                     await asyncio.sleep(2)
@@ -264,30 +270,19 @@ class EOmsClient:
                     else:
                         print(f"⚠️ 缓存会话已过期 (重定向到 CAS)，将重新登录...")
                         _invalidate_session_cache(self.username)
-                        await browser.close()
-                        await p.stop()
+                        await self.close()
                 except Exception as e:
                     print(f"⚠️ 尝试复用缓存会话失败: {e}")
                     _invalidate_session_cache(self.username)
                     try:
-                        await self.close()
+                        await self.close(discard=True)
                     except Exception:
                         pass
 
         # ---- Fresh login ----
-        p = await async_playwright().start()
-        self._playwright = p
-        browser = await p.chromium.launch(headless=headless)
-
-        init_storage = None
-        if resume_state_path and os.path.isfile(resume_state_path):
-            init_storage = resume_state_path
+        init_storage = resume_state or None
 
-        context = await browser.new_context(
-            ignore_https_errors=True,
-            viewport={"width": 1280, "height": 800},
-            storage_state=init_storage,
-        )
+        browser, context = await self._open_context(headless, storage_state=init_storage)
         page = await context.new_page()
         
         captured_headers = {}
@@ -333,8 +328,7 @@ class EOmsClient:
                 )
                 if login_result.get("need_captcha"):
                     token = str(uuid.uuid4())
-                    resume_path = os.path.join(tempfile.gettempdir(), f"eoms_cas_resume_{token}.json")
-                    await context.storage_state(path=resume_path)
+                    eoms_session_store.save_resume_state(token, await context.storage_state())
                     login_result = dict(login_result)
                     login_result["resume_token"] = token
                     await self.close()
@@ -359,8 +353,7 @@ class EOmsClient:
                     )
                     if login_result.get("need_captcha"):
                         token = str(uuid.uuid4())
-                        rp = os.path.join(tempfile.gettempdir(), f"eoms_cas_resume_{token}.json")
-                        await context.storage_state(path=rp)
+                        eoms_session_store.save_resume_state(token, await context.storage_state())
                         login_result = dict(login_result)
                         login_result["resume_token"] = token
                         await self.close()
@@ -399,8 +392,7 @@ class EOmsClient:
                 )
                 if login_result.get("need_captcha"):
                     token = str(uuid.uuid4())
-                    resume_path = os.path.join(tempfile.gettempdir(), f"eoms_cas_resume_{token}.json")
-                    await context.storage_state(path=resume_path)
+                    eoms_session_store.save_resume_state(token, await context.storage_state())
                     login_result = dict(login_result)
                     login_result["resume_token"] = token
                     await self.close()
@@ -962,6 +954,233 @@ class EOmsClient:
         return json.dumps(attachments, ensure_ascii=False)
 
 
+# ---- Pure-HTTP client for cached sessions (no browser) ----
+# Idle requests.Sessions per (user, login) so repeat tickets reuse the keep-alive connection.
+# A requests.Session (its cookie jar in particular) is not thread-safe, so every call checks
+# one out for itself: create_tickets runs departments concurrently via asyncio.to_thread.
+_HTTP_SESSIONS = {}
+_HTTP_SESSIONS_LOCK = threading.Lock()
+_HTTP_SESSIONS_IDLE_MAX = 4
+
+
+def _new_http_session(meta: dict) -> requests.Session:
+    """requests.Session carrying the cached storage_state cookies and replay headers."""
+    session = requests.Session()
+    session.verify = False
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    })
+    session.headers.update(meta.get("headers") or {})
+    for c in meta["storage_state"].get("cookies", []):
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    return session
+
+
+@contextmanager
+def _http_session_for(username: str, meta: dict):
+    """Check out an idle pooled session for this login (or build one); it goes back to the pool on exit."""
+    user, key = username.lower(), meta.get("login_id")
+    stale = []
+    with _HTTP_SESSIONS_LOCK:
+        cached_key, idle = _HTTP_SESSIONS.get(user, (None, []))
+        if cached_key != key:
+            stale, idle = idle, []
+            _HTTP_SESSIONS[user] = (key, idle)
+        session = idle.pop() if idle else None
+    for old in stale:
+        old.close()
+    if session is None:
+        session = _new_http_session(meta)
+    try:
+        yield session
+    finally:
+        with _HTTP_SESSIONS_LOCK:
+            cached_key, idle = _HTTP_SESSIONS.get(user, (None, None))
+            if idle is not None and cached_key == key and len(idle) < _HTTP_SESSIONS_IDLE_MAX:
+                idle.append(session)
+                session = None
+        if session is not None:
+            session.close()
+
+
+def _storage_state_with_cookies(state: dict, jar) -> dict:
+    """``state`` with cookie values updated / added from a requests cookie jar."""
+    cookies = {(c["name"], c.get("domain"), c.get("path")): dict(c) for c in state.get("cookies", [])}
+    for c in jar:
+        entry = cookies.setdefault((c.name, c.domain, c.path), {
+            "name": c.name,
+            "domain": c.domain,
+            "path": c.path,
+            "expires": c.expires or -1,
+            "httpOnly": False,
+            "secure": bool(c.secure),
+            "sameSite": "Lax",
+        })
+        entry["value"] = c.value
+    return {**state, "cookies": list(cookies.values())}
+
+
+def _drop_http_session(username: str):
+    with _HTTP_SESSIONS_LOCK:
+        _key, idle = _HTTP_SESSIONS.pop(username.lower(), (None, []))
+    for session in idle:
+        session.close()
+
+
+class EomsHttpClient:
+    """
+    EOMS API calls over plain HTTP, replaying a cached CAS session.
+
+    Same async_upload_file / async_start_workflow / format_attachment interface
+    as EOmsClient; a CAS login page in any response is reported with
+    ``session_expired=True`` so the caller can fall back to a Playwright login.
+    Safe to share between threads: every call checks out its own pooled session.
+    """
+
+    base_url = "https://eoms2.cmhktry.com/x5"
+    home_url = "https://eoms2.cmhktry.com/x5/main/home"
+
+    def __init__(self, username: str, meta: dict):
+        self.username = username
+        self.meta = meta
+        self.def_id = meta["def_id"]
+        self.login_id = meta.get("login_id")
+
+    @classmethod
+    def from_cached_session(cls, username: str):
+        """Client for a valid cached session with a known defId, else None."""
+        if not username:
+            return None
+        meta = _load_cached_meta(username)
+        if not meta or not meta.get("def_id"):
+            return None
+        try:
+            # builds the first pooled session now so unreadable cached cookies fail here
+            with _http_session_for(username, meta):
+                pass
+            return cls(username, meta)
+        except (TypeError, ValueError, KeyError) as e:
+            print(f"⚠️ 读取缓存会话 Cookie 失败: {e}")
+            return None
+
+    @staticmethod
+    def _expired(response) -> bool:
+        return "ncas.cmhktry.com" in (response.url or "") or _looks_like_cas_login_page(response.text)
+
+    def refresh(self, username: str) -> bool:
+        """Touch the EOMS home page and re-share the (possibly renewed) cookies with a fresh TTL."""
+        try:
+            with _http_session_for(username, self.meta) as session:
+                response = session.get(self.home_url, timeout=30)
+                jar = session.cookies.copy()
+            if self._expired(response):
+                print("⚠️ 刷新缓存会话时返回 CAS 登录页，缓存已失效")
+                _invalidate_session_cache(username)
+                return False
+            state = _storage_state_with_cookies(self.meta["storage_state"], jar)
+            _save_session_cache(username, state, self.def_id, self.meta.get("headers"), login_id=self.login_id)
+            return True
+        except requests.RequestException as e:
+            print(f"⚠️ 刷新缓存会话失败: {e}")
+            return False
+        finally:
+            eoms_session_store.release_refresh(username)
+
+    def refresh_if_due(self, username: str):
+        """Refresh in the background once the session nears expiry (one worker per user)."""
+        if eoms_session_store.needs_refresh(self.meta) and eoms_session_store.claim_refresh(username):
+            threading.Thread(target=self.refresh, args=(username,), name="eoms-session-refresh", daemon=True).start()
+
+    def upload_file(self, file_path: str) -> dict:
+        import mimetypes
+
+        url = f"{self.base_url}/system/file/upload"
+        file_path = Path(file_path)
+        if not file_path.exists():
+            print(f"❌ 文件不存在: {file_path}")
+            return {"success": False, "error": "文件不存在"}
+        mime_type = mimetypes.guess_type(str(file_path))[0] or "application/octet-stream"
+
+        print(f"\n📤 [HTTP] 正在上传文件: {file_path.name}")
+        try:
+            with open(file_path, "rb") as f, _http_session_for(self.username, self.meta) as session:
+                response = session.post(
+                    url,
+                    files={"file": (file_path.name, f, mime_type)},
+                    headers={
+                        "Accept": "*/*",
+                        "Origin": "https://eoms2.cmhktry.com",
+                        "Referer": "https://eoms2.cmhktry.com/x5/system/file/uploadDialog?max=20&type=&size=0",
+                    },
+                    timeout=60,
+                )
+        except requests.RequestException as e:
+            print(f"❌ upload_file 异常: {e}")
+            return {"success": False, "error": str(e)}
+
+        preview = response.text[:800]
+        print(f"📥 响应状态码: {response.status_code}")
+        if self._expired(response):
+            return {"success": False, "session_expired": True, "error": "上传接口返回 CAS 登录页：缓存会话已过期。"}
+        if response.status_code != 200:
+            return {"success": False, "error": f"HTTP {response.status_code}", "response_preview": preview}
+        try:
+            result = response.json()
+        except ValueError as e:
+            return {"success": False, "error": str(e), "response_preview": preview}
+        if result.get("success"):
+            print(f"✅ 文件上传成功! fileId: {result.get('fileId')}")
+        return result
+
+    def start_workflow(self, config: dict, def_id: str = None) -> dict:
+        url = f"{self.base_url}/flow/instance/start"
+        form_data = {
+            "defId": def_id or self.def_id,
+            "formType": "inner",
+            "data": json.dumps({"ServiceConfig": config}, ensure_ascii=False),
+        }
+        print(f"\n📤 [HTTP] 正在发送请求到: {url} (defId: {form_data['defId']})")
+        try:
+            with _http_session_for(self.username, self.meta) as session:
+                response = session.post(
+                    url,
+                    data=form_data,
+                    headers={"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"},
+                    timeout=60,
+                )
+        except requests.RequestException as e:
+            print(f"❌ start_workflow 异常: {e}")
+            return {"result": 0, "success": False, "message": str(e)}
+
+        preview = response.text[:500]
+        print(f"📥 响应状态码: {response.status_code}")
+        print(f"📥 响应内容: {preview}...")
+        if self._expired(response):
+            return {
+                "result": 0, "success": False, "session_expired": True,
+                "message": "EOMS 返回登录页，会话无效",
+            }
+        if not response.text:
+            return {}
+        try:
+            return response.json()
+        except ValueError:
+            return {
+                "result": 0, "success": False,
+                "message": "响应不是 JSON", "raw_preview": preview,
+            }
+
+    async def async_upload_file(self, file_path: str) -> dict:
+        return await asyncio.to_thread(self.upload_file, file_path)
+
+    async def async_start_workflow(self, config: dict, def_id: str = None) -> dict:
+        return await asyncio.to_thread(self.start_workflow, config, def_id)
+
+    format_attachment = staticmethod(EOmsClient.format_attachment)
+
+
 def get_target_date(hours_ahead: int = 6) -> str:
     """获取目标日期时间，格式: 2025-12-08 15:57:55"""
     target = datetime.now() + timedelta(hours=hours_ahead)
@@ -1100,6 +1319,297 @@ DEFAULT_CONFIG = {
 }
 
 
+# Per-ticket fields accepted by create_ticket / create_tickets (None / "" -> DEFAULT_CONFIG)
+_TICKET_FIELDS = (
+    "title", "summary", "description", "originator", "originator_group", "originator_contacts",
+    "ticket_priority", "configuration_type", "network_operation_category", "need_cmcc_approval",
+)
+
+
+async def _submit_ticket(api, def_id: str, ticket: dict, on_workflow_start=None) -> dict:
+    """
+    上传附件并启动一个工单的工作流（api 为 EOmsClient 或 EomsHttpClient）。
+    ticket: target_department, file_path 以及 _TICKET_FIELDS 中的可选字段。
+    on_workflow_start: 可选 async 回调 (target_department)，在发送 startWorkflow 之前调用；
+                       开单不可重复执行，调用方据此记录"请求可能已发出"，回调抛异常则不发送。
+    """
+    target_department = ticket["target_department"]
+    dept_config = DEPARTMENTS[target_department]
+    fields = {name: ticket.get(name) or DEFAULT_CONFIG[name] for name in _TICKET_FIELDS}
+    file_path = ticket.get("file_path")
+
+    # 3. 上传附件（如果有）
+    attachment_json = ""
+    file_id = None
+    
+    if file_path:
+        print(f"\n📤 [{target_department}] 正在上传附件...")
+        upload_result = await api.async_upload_file(file_path)
+        
+        if upload_result.get("session_expired"):
+            return {"success": False, "session_expired": True, "error": upload_result.get("error")}
+        if upload_result.get("success"):
+            file_id = upload_result.get("fileId")
+            attachment_json = api.format_attachment(upload_result)
+            print(f"✅ 附件上传成功: {attachment_json}")
+        else:
+            print(f"⚠️ 附件上传失败: {upload_result}")
+    
+    # 4. 构建工单配置
+    if not def_id:
+        error_msg = "未能获取 defId"
+        print(f"❌ {error_msg}")
+        return {"success": False, "error": error_msg}
+    
+    config = build_service_config(
+        title=fields["title"],
+        summary=fields["summary"],
+        originator=fields["originator"],
+        originator_group=fields["originator_group"],
+        originator_contacts=fields["originator_contacts"],
+        requested_to=dept_config["requested_to"],
+        requested_to_id=dept_config["requested_to_id"],
+        target_node=dept_config["target_node"],
+        ticket_priority=fields["ticket_priority"],
+        configuration_type=fields["configuration_type"],
+        network_operation_category=fields["network_operation_category"],
+        need_cmcc_approval=fields["need_cmcc_approval"],
+        description_updated=fields["description"],
+        attachment_area_updated=attachment_json,
+    )
+    
+    # 5. 发送请求创建工单
+    print(f"\n📡 [{target_department}] 正在创建工单...")
+    if on_workflow_start is not None:
+        await on_workflow_start(target_department)
+    response = await api.async_start_workflow(config, def_id=def_id)
+    
+    # 6. 返回结果
+    if response.get("session_expired"):
+        return {"success": False, "session_expired": True, "error": response.get("message")}
+    if response.get("result") == 1 or response.get("success"):
+        inst_id = None
+        data_value = response.get("data")
+        
+        if isinstance(data_value, dict):
+            inst_id = data_value.get("instId") or data_value.get("id") or data_value.get("processInstanceId") or data_value.get("ticketNo") or data_value.get("orderNo")
+        elif data_value and isinstance(data_value, (str, int)) and str(data_value).isdigit():
+            inst_id = str(data_value)
+        
+        if not inst_id:
+            inst_id = response.get("instId") or response.get("id") or response.get("processInstanceId") or response.get("ticketNo") or response.get("orderNo")
+        
+        if not inst_id and file_id:
+            inst_id = file_id
+            print(f"✅ Using fileId as ticket reference: {inst_id}")
+
+        print(f"\n✅ [{target_department}] 工单创建成功!")
+        print(f"📋 Ticket ID: {inst_id}")
+        
+        try:
+            from asgiref.sync import sync_to_async
+            from auto_tickets.models import EOMS_Tickets
+            
+            @sync_to_async
+            def save_ticket():
+                EOMS_Tickets.objects.create(
+                    eoms_ticket_number=str(inst_id),
+                    department=target_department,
+                    requestor=fields["originator"],
+                )
+            
+            await save_ticket()
+            print(f"💾 Ticket saved to database: {inst_id} (Department: {target_department}, Requestor: {fields['originator']})")
+        except Exception as e:
+            print(f"⚠️ Failed to save ticket to database: {e}")
+
+        return {
+            "success": True,
+            "inst_id": inst_id,
+            "message": response.get("message", "工单创建成功"),
+            "response": response,
+        }
+    else:
+        error_msg = response.get("message") or response.get("error") or "未知错误"
+        print(f"\n❌ [{target_department}] 工单创建失败: {error_msg}")
+        return {
+            "success": False,
+            "inst_id": None,
+            "error": error_msg,
+            "response": response,
+        }
+
+
+async def create_tickets(
+    tickets: list,
+    username: str = "",
+    password: str = "",
+    captcha_code: str = "",
+    resume_token: str = "",
+    captcha_code_provider=None,
+    headless: bool = True,
+    on_workflow_start=None,
+) -> dict:
+    """
+    一次登录创建多个部门的 EOMS 工单（如 Cloud + SN）
+    
+    登录（或复用缓存会话）和 defId 查询只做一次，各工单的附件上传与工作流
+    启动通过 asyncio.gather 并发执行。
+    
+    参数:
+        tickets: 工单列表，每项为 dict: target_department（必填）、file_path，
+                 以及 create_ticket 的可选字段（title, summary, originator 等）
+        on_workflow_start: 见 _submit_ticket
+        其余参数同 create_ticket
+    
+    返回:
+        dict: {部门: 结果 dict}，结果格式同 create_ticket；
+              登录失败 / 需要验证码时每个部门得到相同的结果。
+    """
+    results = {}
+    pending = []
+
+    def fail(batch, outcome):
+        for ticket in batch:
+            results[ticket["target_department"]] = dict(outcome)
+        return results
+
+    print("\n" + "=" * 60)
+    print("EOMS 自动化开单")
+    print("=" * 60)
+    
+    # 1. 验证部门参数
+    for ticket in tickets:
+        target_department = ticket.get("target_department")
+        if target_department not in DEPARTMENTS:
+            error_msg = f"无效的部门: {target_department}，可选值: {', '.join(DEPARTMENTS.keys())}"
+            print(f"❌ {error_msg}")
+            results[target_department] = {"success": False, "error": error_msg}
+            continue
+        if any(t["target_department"] == target_department for t in pending):
+            results[target_department] = {"success": False, "error": f"重复的部门: {target_department}"}
+            continue
+        pending.append(ticket)
+        dept_config = DEPARTMENTS[target_department]
+        print(f"📍 目标部门: {target_department}")
+        print(f"   RequestedTo: {dept_config['requested_to']}")
+        print(f"   TargetNode: {dept_config['target_node']}")
+        print(f"📋 工单标题: {ticket.get('title') or DEFAULT_CONFIG['title']}")
+        if ticket.get("file_path"):
+            print(f"📎 附件: {ticket['file_path']}")
+    print("=" * 60)
+    if not pending:
+        return results
+
+    resume_state = None
+    rt = (resume_token or "").strip()
+    if rt:
+        if not re.match(
+            r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
+            rt,
+            re.I,
+        ):
+            return fail(pending, {"success": False, "error": "Invalid resume token."})
+        resume_state = eoms_session_store.load_resume_state(rt)
+        if not resume_state:
+            return fail(pending, {
+                "success": False,
+                "error": "Login session expired. Please start EOMS login again from the beginning.",
+            })
+
+    if not username or not password:
+        return fail(pending, {"success": False, "error": "Username and password are required."})
+
+    async def submit_all(api, def_id):
+        """Submit every pending ticket concurrently through ``api``; successful / final ones leave ``pending``."""
+        nonlocal pending
+        outcomes = await asyncio.gather(
+            *(_submit_ticket(api, def_id, ticket, on_workflow_start) for ticket in pending),
+            return_exceptions=True,
+        )
+        expired = []
+        for ticket, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"❌ [{ticket['target_department']}] 开单异常: {outcome}")
+                outcome = {"success": False, "error": f"开单异常: {outcome}"}
+            if outcome.get("session_expired"):
+                expired.append(ticket)
+            else:
+                results[ticket["target_department"]] = outcome
+        pending = expired
+        if rt and any(r.get("success") for r in results.values()):
+            eoms_session_store.delete_resume_state(rt)
+
+    async def via_http(skip_login_id=None):
+        """Submit over HTTP with the shared cached session; returns the session's login_id."""
+        http_client = EomsHttpClient.from_cached_session(username)
+        if http_client is None or http_client.login_id == skip_login_id:
+            return skip_login_id
+        print("⚡ 使用缓存会话直接调用 EOMS API")
+        await submit_all(http_client, http_client.def_id)
+        if pending:
+            print("⚠️ 缓存会话已失效，改用浏览器重新登录...")
+            _invalidate_session_cache(username)
+        else:
+            http_client.refresh_if_due(username)
+        return http_client.login_id
+
+    # 2. 缓存会话有效时直接走 HTTP（不启动浏览器）；返回 CAS 登录页时才回退到 Playwright 登录
+    tried_login_id = None
+    if not resume_state:
+        tried_login_id = await via_http()
+        if not pending:
+            return results
+
+    # 2b. 创建客户端并登录（同一用户同一时间只有一个 worker 登录 CAS）
+    client = EOmsClient(username=username, password=password)
+    
+    try:
+        async with eoms_session_store.login_lock(username):
+            if not resume_state:
+                # 等锁期间其他 worker 可能已完成登录
+                await via_http(skip_login_id=tried_login_id)
+                if not pending:
+                    return results
+            result = await client.login_and_capture_headers(
+                headless=headless,
+                timeout_seconds=30,
+                captcha_code=captcha_code,
+                captcha_code_provider=captcha_code_provider,
+                resume_state=resume_state,
+            )
+        
+        if not result:
+            error_msg = "登录失败，请检查用户名和密码"
+            print(f"❌ {error_msg}")
+            await client.close()
+            return fail(pending, {"success": False, "error": error_msg})
+        
+        if result.get("need_captcha"):
+            await client.close()
+            return fail(pending, {
+                "success": False,
+                "need_captcha": True,
+                "error": result.get("message", "需要验证码"),
+                "resume_token": result.get("resume_token"),
+            })
+        
+        print("✅ 登录成功")
+        
+    except Exception as e:
+        error_msg = f"登录异常: {str(e)}"
+        print(f"❌ {error_msg}")
+        await client.close(discard=True)
+        return fail(pending, {"success": False, "error": error_msg})
+    
+    try:
+        await submit_all(client, result.get("def_id"))
+        # Playwright 会话下不会出现 session_expired（不重试），按失败返回
+        return fail(pending, {"success": False, "error": "EOMS 返回登录页，会话无效"}) if pending else results
+    finally:
+        await client.close()
+
+
 async def create_ticket(
     target_department: str,
     username: str = "",
@@ -1119,6 +1629,7 @@ async def create_ticket(
     network_operation_category: str = None,
     need_cmcc_approval: str = None,
     headless: bool = True,
+    on_workflow_start=None,
 ) -> dict:
     """
     创建 EOMS 工单（可供其他模块调用）
@@ -1139,6 +1650,7 @@ async def create_ticket(
         network_operation_category: 网络操作类别，可选值: A/B/C/D
         need_cmcc_approval: 是否需要 CMCC 审批，可选值: Yes/No
         headless: 是否无头模式，默认 True
+        on_workflow_start: 可选 async 回调，发送 startWorkflow 前调用（见 _submit_ticket）
     
     返回:
         dict: 包含创建结果的字典
@@ -1161,196 +1673,31 @@ async def create_ticket(
             summary="自定义摘要",
         ))
     """
-    resume_path = None
-    rt = (resume_token or "").strip()
-    if rt:
-        if not re.match(
-            r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
-            rt,
-            re.I,
-        ):
-            return {"success": False, "error": "Invalid resume token."}
-        resume_path = os.path.join(tempfile.gettempdir(), f"eoms_cas_resume_{rt}.json")
-        if not os.path.isfile(resume_path):
-            return {
-                "success": False,
-                "error": "Login session expired. Please start EOMS login again from the beginning.",
-            }
-
-    if not username or not password:
-        return {"success": False, "error": "Username and password are required."}
-
-    _title = title or DEFAULT_CONFIG["title"]
-    _summary = summary or DEFAULT_CONFIG["summary"]
-    _username = username
-    _password = password
-    _originator = originator or DEFAULT_CONFIG["originator"]
-    _originator_group = originator_group or DEFAULT_CONFIG["originator_group"]
-    _originator_contacts = originator_contacts or DEFAULT_CONFIG["originator_contacts"]
-    _ticket_priority = ticket_priority or DEFAULT_CONFIG["ticket_priority"]
-    _configuration_type = configuration_type or DEFAULT_CONFIG["configuration_type"]
-    _network_operation_category = network_operation_category or DEFAULT_CONFIG["network_operation_category"]
-    _need_cmcc_approval = need_cmcc_approval or DEFAULT_CONFIG["need_cmcc_approval"]
-    _description = description if description else DEFAULT_CONFIG["description"]
-
-    print("\n" + "=" * 60)
-    print("EOMS 自动化开单")
-    print("=" * 60)
-    
-    # 1. 验证部门参数
-    if target_department not in DEPARTMENTS:
-        error_msg = f"无效的部门: {target_department}，可选值: {', '.join(DEPARTMENTS.keys())}"
-        print(f"❌ {error_msg}")
-        return {"success": False, "error": error_msg}
-    
-    dept_config = DEPARTMENTS[target_department]
-    print(f"📍 目标部门: {target_department}")
-    print(f"   RequestedTo: {dept_config['requested_to']}")
-    print(f"   TargetNode: {dept_config['target_node']}")
-    print(f"📋 工单标题: {_title}")
-    print(f"📋 工单摘要: {_summary}")
-    print(f"📋 工单描述: {_description}")
-    if file_path:
-        print(f"📎 附件: {file_path}")
-    print("=" * 60)
-    
-    # 2. 创建客户端并登录
-    client = EOmsClient(username=_username, password=_password)
-    
-    try:
-        result = await client.login_and_capture_headers(
-            headless=headless,
-            timeout_seconds=30,
-            captcha_code=captcha_code,
-            captcha_code_provider=captcha_code_provider,
-            resume_state_path=resume_path,
-        )
-        
-        if not result:
-            error_msg = "登录失败，请检查用户名和密码"
-            print(f"❌ {error_msg}")
-            return {"success": False, "error": error_msg}
-        
-        if result.get("need_captcha"):
-            return {
-                "success": False,
-                "need_captcha": True,
-                "error": result.get("message", "需要验证码"),
-                "resume_token": result.get("resume_token"),
-            }
-        
-        print("✅ 登录成功")
-        
-    except Exception as e:
-        error_msg = f"登录异常: {str(e)}"
-        print(f"❌ {error_msg}")
-        await client.close()
-        return {"success": False, "error": error_msg}
-    
-    try:
-        # 3. 上传附件（如果有）
-        attachment_json = ""
-        file_id = None
-        
-        if file_path:
-            print(f"\n📤 正在上传附件...")
-            upload_result = await client.async_upload_file(file_path)
-            
-            if upload_result.get("success"):
-                file_id = upload_result.get("fileId")
-                attachment_json = client.format_attachment(upload_result)
-                print(f"✅ 附件上传成功: {attachment_json}")
-            else:
-                print(f"⚠️ 附件上传失败: {upload_result}")
-        
-        # 4. 构建工单配置
-        def_id = result.get("def_id")
-        if not def_id:
-            error_msg = "未能获取 defId"
-            print(f"❌ {error_msg}")
-            return {"success": False, "error": error_msg}
-        
-        config = build_service_config(
-            title=_title,
-            summary=_summary,
-            originator=_originator,
-            originator_group=_originator_group,
-            originator_contacts=_originator_contacts,
-            requested_to=dept_config["requested_to"],
-            requested_to_id=dept_config["requested_to_id"],
-            target_node=dept_config["target_node"],
-            ticket_priority=_ticket_priority,
-            configuration_type=_configuration_type,
-            network_operation_category=_network_operation_category,
-            need_cmcc_approval=_need_cmcc_approval,
-            description_updated=_description,
-            attachment_area_updated=attachment_json,
-        )
-        
-        # 5. 发送请求创建工单
-        print(f"\n📡 正在创建工单...")
-        response = await client.async_start_workflow(config, def_id=def_id)
-        
-        # 6. 返回结果
-        if response.get("result") == 1 or response.get("success"):
-            inst_id = None
-            data_value = response.get("data")
-            
-            if isinstance(data_value, dict):
-                inst_id = data_value.get("instId") or data_value.get("id") or data_value.get("processInstanceId") or data_value.get("ticketNo") or data_value.get("orderNo")
-            elif data_value and isinstance(data_value, (str, int)) and str(data_value).isdigit():
-                inst_id = str(data_value)
-            
-            if not inst_id:
-                inst_id = response.get("instId") or response.get("id") or response.get("processInstanceId") or response.get("ticketNo") or response.get("orderNo")
-            
-            if not inst_id and file_id:
-                inst_id = file_id
-                print(f"✅ Using fileId as ticket reference: {inst_id}")
-
-            print(f"\n✅ 工单创建成功!")
-            print(f"📋 Ticket ID: {inst_id}")
-            
-            try:
-                from asgiref.sync import sync_to_async
-                from auto_tickets.models import EOMS_Tickets
-                
-                @sync_to_async
-                def save_ticket():
-                    EOMS_Tickets.objects.create(
-                        eoms_ticket_number=str(inst_id),
-                        department=target_department,
-                        requestor=_originator,
-                    )
-                
-                await save_ticket()
-                print(f"💾 Ticket saved to database: {inst_id} (Department: {target_department}, Requestor: {_originator})")
-            except Exception as e:
-                print(f"⚠️ Failed to save ticket to database: {e}")
-
-            if rt and resume_path and os.path.isfile(resume_path):
-                try:
-                    os.remove(resume_path)
-                except OSError:
-                    pass
-
-            return {
-                "success": True,
-                "inst_id": inst_id,
-                "message": response.get("message", "工单创建成功"),
-                "response": response,
-            }
-        else:
-            error_msg = response.get("message") or response.get("error") or "未知错误"
-            print(f"\n❌ 工单创建失败: {error_msg}")
-            return {
-                "success": False,
-                "inst_id": None,
-                "error": error_msg,
-                "response": response,
-            }
-    finally:
-        await client.close()
+    ticket = {
+        "target_department": target_department,
+        "file_path": file_path,
+        "title": title,
+        "summary": summary,
+        "description": description,
+        "originator": originator,
+        "originator_group": originator_group,
+        "originator_contacts": originator_contacts,
+        "ticket_priority": ticket_priority,
+        "configuration_type": configuration_type,
+        "network_operation_category": network_operation_category,
+        "need_cmcc_approval": need_cmcc_approval,
+    }
+    results = await create_tickets(
+        [ticket],
+        username=username,
+        password=password,
+        captcha_code=captcha_code,
+        resume_token=resume_token,
+        captcha_code_provider=captcha_code_provider,
+        headless=headless,
+        on_workflow_start=on_workflow_start,
+    )
+    return results[target_department]
 
 
 def create_ticket_sync(
@@ -1362,8 +1709,9 @@ def create_ticket_sync(
     """
     创建 EOMS 工单（同步版本，方便非异步环境调用）
     参数与 create_ticket 相同，参见 create_ticket 的文档。
+    在浏览器池的事件循环上运行，复用预热的 Chromium。
     """
-    return asyncio.run(create_ticket(
+    return eoms_browser_pool.run_sync(create_ticket(
         target_department=target_department,
         username=username,
         password=password,
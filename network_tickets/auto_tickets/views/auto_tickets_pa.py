@@ -1,9 +1,15 @@
 from auto_tickets.views.forms_auto_tickets_pa import AutoTicketsPaForm
 
 from django.shortcuts import render
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from auto_tickets.models import PaCommitJob
+from auto_tickets.services import pa_jobs
 from auto_tickets.tools import auto_tickets_pa_tools
 from django.contrib.auth.decorators import login_required
 import openpyxl
+import uuid
 
 @login_required
 def auto_tickets_pa(request):
@@ -29,7 +35,21 @@ def auto_tickets_pa(request):
                     firewall_username = request.user.username
                     firewall_password = "your_password_here"  # You'll need to set this
                 
-                result_list = auto_tickets_pa_tools(wb, firewall_username, firewall_password)
+                # Validate / commit run in the background once the config is pushed
+                if not request.session.session_key:
+                    request.session.save()
+                pa_jobs.fail_stale_jobs()
+                commit_job = PaCommitJob.objects.create(
+                    job_id=str(uuid.uuid4()),
+                    session_key=request.session.session_key,
+                    username=firewall_username,
+                )
+                result_list = auto_tickets_pa_tools(wb, firewall_username, firewall_password, commit_job_id=commit_job.job_id)
+                commit_job.refresh_from_db()
+                if commit_job.status == 'queued':
+                    # The run stopped before validate (errors or nothing to commit)
+                    PaCommitJob.objects.filter(job_id=commit_job.job_id).update(status='skipped')
+                    commit_job = None
 
                 # Check if we got any results
                 if result_list:
@@ -45,7 +65,9 @@ def auto_tickets_pa(request):
                     return render(request, 'auto_tickets_pa.html', {
                         'result_list': result_list,
                         'error_messages': error_messages,
-                        'has_errors': len(error_messages) > 0
+                        'has_errors': len(error_messages) > 0,
+                        'commit_job': commit_job,
+                        'commit_job_status_url': reverse('api_pa_commit_job_status', args=[commit_job.job_id]) if commit_job else '',
                     })
                 else:
                     # No results found, show error
@@ -66,4 +88,32 @@ def auto_tickets_pa(request):
             return render(request, 'auto_tickets_pa.html', {'form': form})
     else:
         form = AutoTicketsPaForm()
-        return render(request, 'auto_tickets_pa.html', {'form': form})
\ No newline at end of file
+        return render(request, 'auto_tickets_pa.html', {'form': form})
+
+
+def _pa_commit_job_to_dict(job):
+    return {
+        'job_id': job.job_id,
+        'status': job.status,
+        'validate_job_id': job.validate_job_id,
+        'commit_job_id': job.commit_job_id,
+        'log': job.log,
+        'error': job.error or '',
+        'heartbeat_at': job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        'done': job.status in ('completed', 'error', 'skipped'),
+    }
+
+
+@login_required
+@require_GET
+def api_pa_commit_job_status(request, job_id):
+    """
+    Poll a background validate + commit (DB-backed, safe across Gunicorn workers).
+
+    A job whose thread stopped sending heartbeats is reported as ``error``.
+    """
+    pa_jobs.fail_stale_jobs(job_id)
+    job = PaCommitJob.objects.filter(job_id=job_id, session_key=request.session.session_key or '').first()
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
+    return JsonResponse({'success': True, 'job': _pa_commit_job_to_dict(job)})
@@ -10,11 +10,14 @@ def get_pa_nat(request):
         if form.is_valid():
             target_ip = form.cleaned_data['target_ip']
             try:
-                res = get_nat_config_tool(target_ip)
-                if res:
+                summary = get_nat_config_tool(target_ip)
+                if summary.total:
                     return render(request, 'get_pa_nat.html', {
                         'form': form, 
-                        'res': res, 
+                        'res': summary.records,
+                        'summary': summary,
+                        'top_mappings': summary.top_mappings(),
+                        'top_applications': summary.top_applications(),
                         'success': True,
                         'target_ip': target_ip
                     })
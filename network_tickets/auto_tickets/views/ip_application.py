@@ -1,8 +1,6 @@
 from django.shortcuts import render
-from auto_tickets.tools import generate_subnet
+from auto_tickets.services.subnet_allocator import allocate_subnet
 from auto_tickets.views.forms_ipapplication import IPApplicationForm
-from auto_tickets.models import IP_Application
-import ipaddress
 from django.contrib.auth.decorators import permission_required
 
 @permission_required('auto_tickets.add_ip_application')
@@ -27,34 +25,10 @@ def ip_application(request):
             description = form.cleaned_data['description']
             staff_number = form.cleaned_data.get('staff_number') or None
 
-            if location == 'MITA':
-                if usage == 'Traffic':
-                    parent_network = f'10.1.96.0/19'
-                else:
-                    parent_network = f'10.0.192.0/21'
-            elif location == 'GNC':
-                if usage == 'Traffic':
-                    parent_network = f'10.1.1.0/21'
-                else:
-                    parent_network = f'10.0.208.0/21'
-            elif location == 'Taiping':
-                if usage == 'Traffic':
-                    parent_network = f'10.1.192.0/18'
-                else:
-                    parent_network = f'10.0.200.0/21'
-
-            existing_subnets = IP_Application.objects.filter(location=location, usage=usage)
-            # Convert existing subnets to ipaddress objects if they're strings
-            normalized_existing = []
-            if existing_subnets.exists():
-                for app in existing_subnets:
-                    if app.subnet:
-                        normalized_existing.append(ipaddress.ip_network(app.subnet, strict=False))
-
-            subnet = generate_subnet(parent_network, int(number), normalized_existing)
+            application = allocate_subnet(location, usage, int(number), description, staff_number)
+            subnet = application.subnet if application else None
 
             if subnet:
-                IP_Application.objects.create(location=location, usage=usage, number=int(number), subnet=str(subnet), description=description, staff_number=staff_number)
                 form = IPApplicationForm()  # Create fresh form with initial data
                 return render(request, 'ip_application.html', {'form': form, 'subnet': subnet})
             else:
@@ -34,50 +34,52 @@ def ip_owner_query(request):
     return render(request, 'ip_owner_query.html', {'form': form})
 
 
+def _owner_dict(record):
+    return {
+        'staff_number': record.staff_number or 'Not assigned',
+        'subnet': record.subnet,
+        'location': record.location,
+        'usage': record.usage,
+        'description': record.description
+    }
+
+
 def query_ip_owner(ip_input):
     """
     Query IP_Application table to find the owner (staff_number) for a given IP or subnet.
     Returns a dict with matching record info, or None if not found.
+
+    Uses the indexed net_start / net_end range columns; rows whose range has
+    not been populated yet (see ``manage.py backfill_ip_ranges``) are still
+    checked in Python.
     """
-    all_records = IP_Application.objects.exclude(subnet__isnull=True).exclude(subnet='')
-    
-    if '/' in ip_input:
-        try:
+    try:
+        if '/' in ip_input:
             input_network = ipaddress.ip_network(ip_input, strict=False)
-        except ValueError:
-            return None
-        
-        for record in all_records:
-            try:
-                db_network = ipaddress.ip_network(record.subnet, strict=False)
-                if input_network.overlaps(db_network) or db_network.overlaps(input_network):
-                    return {
-                        'staff_number': record.staff_number or 'Not assigned',
-                        'subnet': record.subnet,
-                        'location': record.location,
-                        'usage': record.usage,
-                        'description': record.description
-                    }
-            except ValueError:
-                continue
-    else:
-        try:
-            input_ip = ipaddress.ip_address(ip_input)
-        except ValueError:
-            return None
-        
-        for record in all_records:
-            try:
-                db_network = ipaddress.ip_network(record.subnet, strict=False)
-                if input_ip in db_network:
-                    return {
-                        'staff_number': record.staff_number or 'Not assigned',
-                        'subnet': record.subnet,
-                        'location': record.location,
-                        'usage': record.usage,
-                        'description': record.description
-                    }
-            except ValueError:
-                continue
-    
+            matches = IP_Application.objects.overlapping(input_network)
+        else:
+            input_network = ipaddress.ip_address(ip_input)
+            matches = IP_Application.objects.containing(input_network)
+    except ValueError:
+        return None
+
+    record = matches.order_by('id').first()
+    if record:
+        return _owner_dict(record)
+
+    legacy_records = (
+        IP_Application.objects.filter(net_start__isnull=True)
+        .exclude(subnet__isnull=True).exclude(subnet='')
+        .order_by('id')
+    )
+    for record in legacy_records:
+        db_network = record.network()
+        if db_network is None:
+            continue
+        if isinstance(input_network, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+            if input_network.overlaps(db_network):
+                return _owner_dict(record)
+        elif input_network in db_network:
+            return _owner_dict(record)
+
     return None
@@ -1,13 +1,18 @@
 from auto_tickets.forms_multisplit import IPDBFORM_MULTISPLIT
-from auto_tickets.models import EomsTicketCreationTask
+from auto_tickets.models import EomsTicketCreationTask, MultiSplitJob
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Q
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST, require_GET
 from django.views.decorators.csrf import csrf_exempt
-from auto_tickets.tools import tickets_split
-from auto_tickets.views.ITSR_Tools.eoms_automation_2 import create_ticket
+from auto_tickets.services import eoms_browser_pool, eoms_task_queue, ipdb_index
+from auto_tickets.tools import route_pair, route_pairs
+from auto_tickets.views.ITSR_Tools.eoms_automation_2 import create_ticket, create_tickets
 from auto_tickets.views.ITSR_Tools.itsr_create import (
     create_ticket_session as itsr_create_ticket_session,
     submit_credentials as itsr_submit_credentials,
@@ -17,8 +22,8 @@ from auto_tickets.views.ITSR_Tools.itsr_create import (
     get_session_status as itsr_get_session_status,
 )
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 import re
-import asyncio
 import json
 import logging
 import threading
@@ -28,10 +33,16 @@ import math
 import shutil
 import os
 import glob as glob_module
+import copy
+import hashlib
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
 
+_EOMS_DEPARTMENT_RESULT_KEYS = ('status', 'success', 'inst_id', 'message', 'error', 'requestor')
+
+
 def _eoms_task_row_to_dict(task):
     """Shape expected by multi_split.html poll (matches former in-memory task dict)."""
     if not task:
@@ -46,6 +57,11 @@ def _eoms_task_row_to_dict(task):
         'error': task.error or '',
         'need_captcha': task.need_captcha,
         'resume_token': task.cas_resume_token or None,
+        # Combined Cloud+SN task: outcome per department (input file paths stay server-side)
+        'departments': {
+            department: {key: entry.get(key) for key in _EOMS_DEPARTMENT_RESULT_KEYS}
+            for department, entry in (task.department_results or {}).items()
+        },
     }
 
 
@@ -83,6 +99,33 @@ def _eoms_clear_session_cooldown(django_session_key, target_department):
 # Both must exist in IPDB with the same location/device (e.g. SZ-VPN, DMZ SW01) or only the one in IPDB will appear in generated ticket files.
 VPN_SOURCE_IPS = ['10.51.203.0/24', '10.51.204.0/24']
 
+_IPV4_IN_TEXT = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+
+
+def _clean_ip(value):
+    return value.strip().replace('\u200b', '')
+
+
+def _route_all(pairs):
+    """
+    Route every (source_ip, destination_ip) pair of an upload in one batch.
+
+    Returns {} if the batch fails; the per-pair fallback in ``_pair_route``
+    then reports errors against the row that caused them.
+    """
+    try:
+        return route_pairs(pairs)
+    except Exception:
+        logger.exception('Batch routing failed, falling back to per-pair routing')
+        return {}
+
+
+def _pair_route(pair_routes, source_ip, destination_ip):
+    route = pair_routes.get((source_ip, destination_ip))
+    if route is None:
+        route = route_pair(source_ip, destination_ip)
+    return route
+
 
 def _find_ticket_title_column_1based(sheet, default_col):
     """
@@ -181,13 +224,96 @@ def _ensure_session_dir():
     os.makedirs(EOMS_SESSION_DIR, exist_ok=True)
 
 
+# EOMS templates parsed once per process (reloaded if the xlsx changes on disk)
+_EOMS_TEMPLATE_HEADER_ROWS = 3
+_eoms_template_cache = {}
+_eoms_template_lock = threading.Lock()
+
+
+def _cell_style(cell):
+    if not cell.has_style:
+        return None
+    return (
+        copy.copy(cell.font), copy.copy(cell.fill), copy.copy(cell.border),
+        copy.copy(cell.alignment), cell.number_format, copy.copy(cell.protection),
+    )
+
+
+def _load_eoms_template(template_name):
+    """
+    Header rows (values + styles), sheet title, column widths, row heights and
+    data validations of an EOMS template, parsed once per process.
+    """
+    template_path = os.path.join(EOMS_TEMPLATE_DIR, f'eoms_{template_name}_template.xlsx')
+    mtime = os.path.getmtime(template_path)
+    cached = _eoms_template_cache.get(template_name)
+    if cached is not None and cached['mtime'] == mtime:
+        return cached
+
+    with _eoms_template_lock:
+        wb = openpyxl.load_workbook(template_path)
+        sheet = wb.active
+        template = {
+            'mtime': mtime,
+            'title': sheet.title,
+            'header_rows': [
+                [(cell.value, _cell_style(cell)) for cell in row]
+                for row in sheet.iter_rows(min_row=1, max_row=_EOMS_TEMPLATE_HEADER_ROWS)
+            ],
+            'column_widths': {key: dim.width for key, dim in sheet.column_dimensions.items() if dim.width},
+            'row_heights': {key: dim.height for key, dim in sheet.row_dimensions.items() if dim.height},
+            'data_validations': list(sheet.data_validations.dataValidation),
+        }
+        _eoms_template_cache[template_name] = template
+        return template
+
+
+def _new_write_only_sheet(title, column_widths=None, row_heights=None, data_validations=()):
+    """Streaming (write-only) workbook + sheet; dimensions must be set before rows are appended."""
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet(title)
+    for key, width in (column_widths or {}).items():
+        sheet.column_dimensions[key].width = width
+    for key, height in (row_heights or {}).items():
+        sheet.row_dimensions[key].height = height
+    for validation in data_validations:
+        sheet.data_validations.append(copy.copy(validation))
+    return wb, sheet
+
+
+def _styled_row(sheet, cells):
+    row = []
+    for value, style in cells:
+        cell = WriteOnlyCell(sheet, value=value)
+        if style is not None:
+            cell.font, cell.fill, cell.border, cell.alignment, cell.number_format, cell.protection = style
+        row.append(cell)
+    return row
+
+
+def _append_data_rows(sheet, first_row, values_by_row):
+    """Append {row_num: [values]} in row order starting at first_row (gaps become blank rows)."""
+    next_row = first_row
+    for row_num in sorted(values_by_row):
+        while next_row < row_num:
+            sheet.append([])
+            next_row += 1
+        sheet.append(values_by_row[row_num])
+        next_row += 1
+
+
+def _joined(value):
+    return '\n '.join(value) if isinstance(value, list) else value
+
+
 def _write_eoms_template(template_name, source_name_dic, sip_dic, dest_name_dic, dip_dic, dport_dic, protocol_dic, requestor_dic, session_id=None):
     """
     Write data to a per-session copy of the EOMS template xlsx (Cloud or SN).
     
-    Instead of modifying the shared template in-place, this copies the template
-    to a unique per-session file and writes data there to avoid race conditions
-    when multiple users process files simultaneously.
+    The template's header rows, column widths and validations are parsed once
+    per process (_load_eoms_template); each call streams a new write-only
+    workbook with those rows followed by the populated data rows only, so
+    the cost depends on the data, not on the template file.
     
     Args:
         template_name: 'cloud' or 'sn' (used to pick the right template)
@@ -202,31 +328,29 @@ def _write_eoms_template(template_name, source_name_dic, sip_dic, dest_name_dic,
     if session_id is None:
         session_id = str(uuid.uuid4())
     
-    template_path = os.path.join(EOMS_TEMPLATE_DIR, f'eoms_{template_name}_template.xlsx')
     unique_filename = f'eoms_{template_name}_{session_id}.xlsx'
     unique_path = os.path.join(EOMS_SESSION_DIR, unique_filename)
-    
-    # Copy the clean template to a unique per-session file
-    shutil.copy2(template_path, unique_path)
-    
-    # Write data to the unique copy
-    wb = openpyxl.load_workbook(unique_path)
-    sheet = wb.active
-    # Clear existing data rows (from row 4 onwards) just in case
-    for row in range(4, sheet.max_row + 1):
-        for col in [2, 3, 4, 5, 6, 7, 8]:  # Columns B, C, D, E, F, G, H
-            sheet.cell(row=row, column=col).value = None
-    # Write new data
-    for row_num in sip_dic.keys():
-        sheet.cell(row=row_num, column=2).value = source_name_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=3).value = sip_dic[row_num]
-        sheet.cell(row=row_num, column=4).value = dest_name_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=5).value = dip_dic.get(row_num, '')
-        dport_val = dport_dic.get(row_num, '')
-        protocol_val = protocol_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=6).value = '\n '.join(dport_val) if isinstance(dport_val, list) else dport_val
-        sheet.cell(row=row_num, column=7).value = '\n '.join(protocol_val) if isinstance(protocol_val, list) else protocol_val
-        sheet.cell(row=row_num, column=8).value = requestor_dic.get(row_num, '')
+
+    template = _load_eoms_template(template_name)
+    wb, sheet = _new_write_only_sheet(
+        template['title'], template['column_widths'], template['row_heights'], template['data_validations'],
+    )
+    for cells in template['header_rows']:
+        sheet.append(_styled_row(sheet, cells))
+    # Data rows (row 4 onwards): columns B-H
+    _append_data_rows(sheet, _EOMS_TEMPLATE_HEADER_ROWS + 1, {
+        row_num: [
+            None,
+            source_name_dic.get(row_num, ''),
+            sip_dic[row_num],
+            dest_name_dic.get(row_num, ''),
+            dip_dic.get(row_num, ''),
+            _joined(dport_dic.get(row_num, '')),
+            _joined(protocol_dic.get(row_num, '')),
+            requestor_dic.get(row_num, ''),
+        ]
+        for row_num in sip_dic
+    })
     wb.save(unique_path)
     
     return unique_path
@@ -291,48 +415,39 @@ def _write_itsr_template(source_name_dic, sip_dic, dest_name_dic, dip_dic, dport
     unique_filename = f'itsr_{session_id}.xlsx'
     unique_path = os.path.join(ITSR_SESSION_DIR, unique_filename)
 
-    wb = openpyxl.Workbook()
-    sheet = wb.active
-    sheet.title = "ITSR Network Policy"
+    wb, sheet = _new_write_only_sheet("ITSR Network Policy")
 
     # Row 1: English headers
-    headers = [
+    sheet.append([
         'No.', 'Source Node Name', 'Source Node IP',
         'Destination Node Name', 'Destination Node IP',
         'Destination Port', 'Protocol', 'Staff Number',
-    ]
-    for col, header in enumerate(headers, 1):
-        sheet.cell(row=1, column=col).value = header
+    ])
 
     # Row 2: Chinese headers
-    chinese_headers = [
+    sheet.append([
         '序号', '源节点名称', '源节点IP',
         '目标节点名称', '目标节点IP',
         '目标端口', '协议', '申请人工号',
-    ]
-    for col, header in enumerate(chinese_headers, 1):
-        sheet.cell(row=2, column=col).value = header
+    ])
 
     # Row 3: reserved (example row placeholder)
-    sheet.cell(row=3, column=1).value = 'Example'
+    sheet.append(['Example'])
 
     # Data rows starting from row 4 (matching EOMS convention)
-    for row_num in sorted(sip_dic.keys()):
-        idx = row_num - 3  # 1-based index
-        sheet.cell(row=row_num, column=1).value = idx
-        sheet.cell(row=row_num, column=2).value = source_name_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=3).value = sip_dic[row_num]
-        sheet.cell(row=row_num, column=4).value = dest_name_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=5).value = dip_dic.get(row_num, '')
-        dport_val = dport_dic.get(row_num, '')
-        protocol_val = protocol_dic.get(row_num, '')
-        sheet.cell(row=row_num, column=6).value = (
-            '\n '.join(dport_val) if isinstance(dport_val, list) else dport_val
-        )
-        sheet.cell(row=row_num, column=7).value = (
-            '\n '.join(protocol_val) if isinstance(protocol_val, list) else protocol_val
-        )
-        sheet.cell(row=row_num, column=8).value = requestor_dic.get(row_num, '')
+    _append_data_rows(sheet, 4, {
+        row_num: [
+            row_num - 3,  # 1-based index
+            source_name_dic.get(row_num, ''),
+            sip_dic[row_num],
+            dest_name_dic.get(row_num, ''),
+            dip_dic.get(row_num, ''),
+            _joined(dport_dic.get(row_num, '')),
+            _joined(protocol_dic.get(row_num, '')),
+            requestor_dic.get(row_num, ''),
+        ]
+        for row_num in sip_dic
+    })
 
     wb.save(unique_path)
     # Return the absolute path so itsr_create.py can find it
@@ -456,10 +571,12 @@ def _save_vpn_consolidated_upload(sheet, consolidated_rows, processing_session_i
         return None
 
 
-def _process_itsr_file(sheet):
+def _process_itsr_file(sheet, progress=None):
     """
     Process an ITSR format Excel file.
     Returns dict with: result_list, detected_cloud, detected_sn, detected_itsr, cloud/sn/itsr dicts, staff_number.
+
+    progress: optional callable(rows_processed, result_list), called after each consolidated group.
     """
     pattern = r'[ ,\n、]'
     result_list = []
@@ -654,6 +771,15 @@ def _process_itsr_file(sheet):
                 'requestor': requestor,
             })
 
+        # Classify each distinct IP once and route each distinct pair once.
+        pairs = []
+        for item in consolidated_rows:
+            sources = [ip for ip in map(_clean_ip, item['source_ip_list']) if _IPV4_IN_TEXT.search(ip)]
+            destinations = [ip for ip in map(_clean_ip, item['destination_ip_list']) if _IPV4_IN_TEXT.search(ip)]
+            pairs.extend((source_ip, destination_ip) for source_ip in sources for destination_ip in destinations)
+        pair_routes = _route_all(pairs)
+        rows_done = 0
+
         for item in sorted(consolidated_rows, key=lambda x: min(x['row_numbers'])):
             source_name = item['source_name']
             source_ip_list = item['source_ip_list']
@@ -681,7 +807,8 @@ def _process_itsr_file(sheet):
                         if judge_destination_ip:
                             valid_destination_ips.append(destination_ip)
                             try:
-                                ticket_list = tickets_split(source_ip, destination_ip, return_list=True)
+                                route = _pair_route(pair_routes, source_ip, destination_ip)
+                                ticket_list = list(route.tickets)
                                 needs_cloud, needs_sn = _check_cloud_sn(ticket_list)
                                 needs_itsr = _check_itsr(ticket_list)
                                 if needs_cloud:
@@ -694,8 +821,7 @@ def _process_itsr_file(sheet):
                                     detected_itsr = True
                                     group_needs_itsr = True
 
-                                result_str = tickets_split(source_ip, destination_ip, return_list=False)
-                                result_list.append(result_str)
+                                result_list.append(route.message)
 
                             except Exception as e:
                                 error_msg = f"ERROR: Row(s) {row_label} - Failed to process {source_ip} to {destination_ip}: {str(e)}"
@@ -752,6 +878,10 @@ def _process_itsr_file(sheet):
                 itsr_processed_pairs.add(group_key)
                 itsr_num += 1
 
+            if progress:
+                rows_done += len(item['row_numbers'])
+                progress(rows_done, result_list)
+
     return {
         'result_list': result_list,
         'detected_cloud': detected_cloud,
@@ -774,7 +904,7 @@ def _process_itsr_file(sheet):
     }
 
 
-def _process_vpn_file(sheet):
+def _process_vpn_file(sheet, progress=None):
     """
     Process a VPN Network Ticket format Excel file.
     
@@ -790,6 +920,8 @@ def _process_vpn_file(sheet):
     Source IPs are fixed: 10.51.203.0/24, 10.51.204.0/24
     
     Returns dict with: result_list, detected_cloud, detected_sn, detected_itsr, cloud/sn/itsr dicts, staff_number.
+
+    progress: optional callable(rows_processed, result_list), called after each merged row group.
     """
     pattern = r'[ ,\n、，]'
     result_list = []
@@ -887,6 +1019,16 @@ def _process_vpn_file(sheet):
             error_msg = f"ERROR: Row {row_num} - Error processing row: {str(e)}"
             result_list.append(error_msg)
 
+    # Classify each distinct IP once and route each distinct pair once.
+    pair_routes = _route_all(
+        (source_ip, destination_ip)
+        for group in grouped_rows.values()
+        for destination_ip in map(_clean_ip, _stable_unique(group['destination_ips']))
+        if _IPV4_IN_TEXT.search(destination_ip)
+        for source_ip in VPN_SOURCE_IPS
+    )
+    rows_done = 0
+
     for _, group in grouped_rows.items():
         destination_ip_list = _stable_unique(group['destination_ips'])
         dest_name = '\n'.join(_stable_unique(group['descriptions']))
@@ -914,7 +1056,8 @@ def _process_vpn_file(sheet):
 
             for source_ip in VPN_SOURCE_IPS:
                 try:
-                    ticket_list = tickets_split(source_ip, destination_ip, return_list=True)
+                    route = _pair_route(pair_routes, source_ip, destination_ip)
+                    ticket_list = list(route.tickets)
                     needs_cloud, needs_sn = _check_cloud_sn(ticket_list)
                     needs_itsr = _check_itsr(ticket_list)
                     if needs_cloud:
@@ -961,13 +1104,16 @@ def _process_vpn_file(sheet):
                         itsr_processed_pairs.add(unique_key)
                         itsr_num += 1
 
-                    result_str = tickets_split(source_ip, destination_ip, return_list=False)
-                    result_list.append(result_str)
+                    result_list.append(route.message)
 
                 except Exception as e:
                     error_msg = f"ERROR: Row(s) {group_row_label} - Failed to process {source_ip} to {destination_ip}: {str(e)}"
                     result_list.append(error_msg)
 
+        if progress:
+            rows_done += len(group['row_numbers'])
+            progress(rows_done, result_list)
+
     return {
         'result_list': result_list,
         'detected_cloud': detected_cloud,
@@ -991,168 +1137,414 @@ def _process_vpn_file(sheet):
     }
 
 
+MULTI_SPLIT_UPLOAD_DIR = os.path.join(EOMS_TEMPLATE_DIR, 'multi_split_uploads')
+
+# Parsed + routed upload results, keyed by sheet content and IPDB version.
+# Bump _RESULT_CACHE_VERSION when the processing / routing output changes shape.
+_RESULT_CACHE_VERSION = 1
+_RESULT_CACHE_TIMEOUT = 3600
+
+
+def _sheet_fingerprint(sheet):
+    """SHA-256 over the sheet's cell values (row order kept, trailing blanks dropped)."""
+    digest = hashlib.sha256()
+    pending_blank_rows = 0
+    for row in sheet.iter_rows(values_only=True):
+        values = list(row)
+        while values and values[-1] is None:
+            values.pop()
+        if not values:
+            pending_blank_rows += 1
+            continue
+        # Blank rows only matter for the numbering of the rows after them
+        digest.update(b'\n' * pending_blank_rows)
+        pending_blank_rows = 0
+        digest.update(repr(values).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _result_cache_key(sheet, file_format):
+    return (
+        f'multi_split:result:{_RESULT_CACHE_VERSION}:{ipdb_index.get_ipdb_version()}:'
+        f'{file_format}:{_sheet_fingerprint(sheet)}'
+    )
+
+
+def _process_sheet_cached(sheet, file_format, progress=None):
+    """
+    _process_itsr_file / _process_vpn_file, memoized in the Django cache.
+
+    Re-uploading the same workbook skips parsing, consolidation and routing.
+    The key carries ipdb_index.get_ipdb_version(), which every process sees
+    change (the Redis stamp, or the table itself without a shared cache), so
+    an IPDB edit made elsewhere (admin, import_ipdb) misses the old entries.
+    """
+    try:
+        cache_key = _result_cache_key(sheet, file_format)
+        data = cache.get(cache_key)
+    except Exception:
+        logger.warning('multi_split: result cache unavailable', exc_info=True)
+        cache_key, data = None, None
+    if data is not None:
+        logger.debug('multi_split: result cache hit for %s', cache_key)
+        return data
+
+    if file_format == 'vpn':
+        data = _process_vpn_file(sheet, progress=progress)
+    else:
+        data = _process_itsr_file(sheet, progress=progress)
+
+    # Per-pair routing failures may be transient (e.g. DB unavailable): do not keep them
+    if cache_key and not any('Failed to process' in message for message in data['result_list']):
+        try:
+            cache.set(cache_key, data, _RESULT_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning('multi_split: could not store result in cache', exc_info=True)
+    return data
+
+
+def _process_upload(sheet, upload_name, processing_session_id, progress=None):
+    """
+    Classify an uploaded workbook and write the EOMS / ITSR templates.
+
+    Shared by the synchronous view and the background job worker; the
+    returned outcome is JSON-serializable so a job can store it.
+    """
+    # Auto-detect file format
+    file_format = _detect_file_format(sheet)
+    logger.debug('multi_split: detected file format %s', file_format)
+
+    # Process based on detected format (cached per sheet content)
+    data = _process_sheet_cached(sheet, file_format, progress=progress)
+
+    # Write EOMS SN template (per-session unique file)
+    eoms_sn_path = None
+    if data['sn_sip_dic']:
+        eoms_sn_path = _write_eoms_template(
+            'sn',
+            data['sn_source_name_dic'], data['sn_sip_dic'],
+            data['sn_dest_name_dic'], data['sn_dip_dic'],
+            data['sn_dport_dic'], data['sn_protocol_dic'],
+            data['sn_requestor_dic'],
+            session_id=processing_session_id
+        )
+
+    # Write EOMS Cloud template (per-session unique file)
+    eoms_cloud_path = None
+    if data['cloud_sip_dic']:
+        eoms_cloud_path = _write_eoms_template(
+            'cloud',
+            data['cloud_source_name_dic'], data['cloud_sip_dic'],
+            data['cloud_dest_name_dic'], data['cloud_dip_dic'],
+            data['cloud_dport_dic'], data['cloud_protocol_dic'],
+            data['cloud_requestor_dic'],
+            session_id=processing_session_id
+        )
+
+    # Write ITSR template (per-session unique file)
+    itsr_path = None
+    itsr_original_path = None
+    if data['itsr_sip_dic']:
+        itsr_path = _write_itsr_template(
+            data['itsr_source_name_dic'], data['itsr_sip_dic'],
+            data['itsr_dest_name_dic'], data['itsr_dip_dic'],
+            data['itsr_dport_dic'], data['itsr_protocol_dic'],
+            data['itsr_requestor_dic'],
+            session_id=processing_session_id
+        )
+        # Keep consolidated workbook as second ITSR attachment for VPN-origin tickets.
+        if file_format == 'vpn':
+            itsr_original_path = _save_vpn_consolidated_upload(
+                sheet,
+                data.get('consolidated_rows', []),
+                processing_session_id,
+                upload_name,
+            )
+
+    result_list = data['result_list']
+    # More specific error detection to avoid false positives
+    error_messages = [
+        message for message in result_list
+        if message and any(keyword in message.lower() for keyword in ['failed:', 'traceback:', 'validation failed', 'connection failed', 'error:'])
+    ]
+
+    return {
+        'result_list': result_list,
+        'error_messages': error_messages,
+        'detected_cloud': data['detected_cloud'],
+        'detected_sn': data['detected_sn'],
+        'detected_itsr': data.get('detected_itsr', False),
+        'file_format': file_format,
+        # First requestor for each department
+        'cloud_requestor': data['cloud_requestor_dic'].get(4, '') if data['cloud_requestor_dic'] else '',
+        'sn_requestor': data['sn_requestor_dic'].get(4, '') if data['sn_requestor_dic'] else '',
+        'staff_number': data.get('staff_number', ''),
+        'ticket_title': (data.get('ticket_title') or '').strip(),
+        'eoms_cloud_file_path': eoms_cloud_path,
+        'eoms_sn_file_path': eoms_sn_path,
+        'itsr_file_path': itsr_path,
+        'itsr_original_file_path': itsr_original_path,
+    }
+
+
+def _apply_outcome_to_session(session, outcome):
+    """Store a processed upload in the user's session for the ticket creation buttons."""
+    # Clean up previous session files if they exist
+    old_sn_path = session.get('eoms_sn_file_path')
+    old_cloud_path = session.get('eoms_cloud_file_path')
+    old_itsr_path = session.get('itsr_file_path')
+    old_itsr_original = session.get('itsr_original_file_path')
+    if old_sn_path and old_sn_path != outcome['eoms_sn_file_path']:
+        _cleanup_session_file(old_sn_path)
+    if old_cloud_path and old_cloud_path != outcome['eoms_cloud_file_path']:
+        _cleanup_session_file(old_cloud_path)
+    if old_itsr_path and old_itsr_path != outcome['itsr_file_path']:
+        _cleanup_itsr_session_file(old_itsr_path)
+    if old_itsr_original and old_itsr_original != outcome['itsr_original_file_path']:
+        _cleanup_itsr_session_file(old_itsr_original)
+
+    # Store results in session for ticket creation redirect
+    session['last_result_list'] = outcome['result_list']
+    session['last_error_messages'] = outcome['error_messages']
+    session['last_has_errors'] = len(outcome['error_messages']) > 0
+    session['last_show_cloud_button'] = outcome['detected_cloud']
+    session['last_show_sn_button'] = outcome['detected_sn']
+    session['last_show_itsr_button'] = outcome['detected_itsr']
+    session['last_file_format'] = outcome['file_format']
+    session['last_cloud_requestor'] = outcome['cloud_requestor']
+    session['last_sn_requestor'] = outcome['sn_requestor']
+    # Store staff number (from VPN files)
+    session['last_staff_number'] = outcome['staff_number']
+    session['last_ticket_title'] = outcome['ticket_title']
+    # Store per-session unique file paths for ticket creation
+    session['eoms_cloud_file_path'] = outcome['eoms_cloud_file_path']
+    session['eoms_sn_file_path'] = outcome['eoms_sn_file_path']
+    session['itsr_file_path'] = outcome['itsr_file_path']
+    if outcome['itsr_original_file_path']:
+        session['itsr_original_file_path'] = outcome['itsr_original_file_path']
+    else:
+        session.pop('itsr_original_file_path', None)
+    # Clear previous ticket creation state when processing new file
+    session.pop('ticket_cloud_created', None)
+    session.pop('ticket_sn_created', None)
+    session.pop('ticket_itsr_created', None)
+    session.pop('itsr_create_session_id', None)
+    session.save()
+
+
+def _outcome_context(outcome):
+    """Template context for a processed upload (results with error messages and department detection)."""
+    return {
+        'result_list': outcome['result_list'],
+        'error_messages': outcome['error_messages'],
+        'has_errors': len(outcome['error_messages']) > 0,
+        'show_cloud_button': outcome['detected_cloud'],
+        'show_sn_button': outcome['detected_sn'],
+        'show_itsr_button': outcome['detected_itsr'],
+        'cloud_ticket_created': False,
+        'sn_ticket_created': False,
+        'itsr_ticket_created': False,
+        'staff_number': outcome['staff_number'],
+        'file_format': outcome['file_format'],
+    }
+
+
+def _add_no_results_error(form, file_format):
+    # No results found — form.file.errors is rendered in the upload card (see multi_split.html)
+    if file_format == 'vpn':
+        form.add_error(
+            'file',
+            'No valid data found in the VPN Excel file. Please check that your file has '
+            'Destination IP in column B, Description in column C, Protocol in column D, '
+            'Port in column E and Staff Number in column G '
+            'starting from row 4.',
+        )
+    else:
+        form.add_error(
+            'file',
+            'No valid data found in the Excel file. Please check that your file has data in '
+            'columns C–G (source IP, destination IP, port, protocol, staff) starting from row 4, '
+            'and optional Ticket Title in the last column.',
+        )
+
+
+def _enqueue_multi_split_job(request, uploaded_file):
+    """Store the upload and queue it for manage.py run_multi_split_worker; returns the job row."""
+    os.makedirs(MULTI_SPLIT_UPLOAD_DIR, exist_ok=True)
+    if not request.session.session_key:
+        request.session.save()
+
+    job_id = str(uuid.uuid4())
+    upload_path = os.path.abspath(os.path.join(MULTI_SPLIT_UPLOAD_DIR, f'{job_id}.xlsx'))
+    with open(upload_path, 'wb') as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+
+    return MultiSplitJob.objects.create(
+        job_id=job_id,
+        session_key=request.session.session_key,
+        upload_path=upload_path,
+        upload_name=uploaded_file.name,
+    )
+
+
+def _multi_split_job_to_dict(job):
+    data = {
+        'job_id': job.job_id,
+        'status': job.status,
+        'rows_total': job.rows_total,
+        'rows_processed': job.rows_processed,
+        'partial_results': job.partial_results,
+        'error': job.error or '',
+    }
+    if job.status == 'completed':
+        data['result_url'] = f"{reverse('multi_split')}?job={job.job_id}"
+    return data
+
+
+_JOB_PROGRESS_INTERVAL = 1.0
+
+
+def run_multi_split_job(job_id):
+    """Worker side: process one claimed MultiSplitJob (see manage.py run_multi_split_worker)."""
+    from django.db import close_old_connections
+
+    close_old_connections()
+    upload_path = None
+    try:
+        job = MultiSplitJob.objects.get(job_id=job_id)
+        upload_path = job.upload_path
+        wb = openpyxl.load_workbook(upload_path)
+        sheet = wb.active
+        MultiSplitJob.objects.filter(job_id=job_id).update(rows_total=max(sheet.max_row - 3, 0))
+
+        last_update = [0.0]
+
+        def _progress(rows_processed, result_list):
+            now = time.monotonic()
+            if now - last_update[0] < _JOB_PROGRESS_INTERVAL:
+                return
+            last_update[0] = now
+            MultiSplitJob.objects.filter(job_id=job_id).update(
+                rows_processed=rows_processed,
+                partial_results=list(result_list),
+            )
+
+        _cleanup_old_session_files()
+        _cleanup_old_itsr_session_files()
+        outcome = _process_upload(sheet, job.upload_name, job_id, progress=_progress)
+        MultiSplitJob.objects.filter(job_id=job_id).update(
+            status='completed',
+            rows_processed=max(sheet.max_row - 3, 0),
+            partial_results=outcome['result_list'],
+            result=outcome,
+            error='',
+        )
+    except Exception as e:
+        logger.exception('multi_split job %s failed', job_id)
+        MultiSplitJob.objects.filter(job_id=job_id).update(status='error', error=f'Error processing file: {str(e)}')
+    finally:
+        if upload_path:
+            try:
+                os.remove(upload_path)
+            except OSError:
+                pass
+        close_old_connections()
+
+
+def sweep_multi_split_jobs(job_id=None):
+    """
+    Requeue or fail jobs no live worker is handling; returns the count.
+
+    A processing job whose heartbeat is older than MULTI_SPLIT_JOB_STALE_AFTER
+    lost its worker: processing only writes files, so it is queued again while
+    it has attempts left and its upload is still on disk, otherwise it fails.
+    A job still queued after MULTI_SPLIT_JOB_QUEUE_TIMEOUT fails, as no worker
+    is running.  Limited to ``job_id`` when given.
+    """
+    now = timezone.now()
+    jobs = MultiSplitJob.objects.all() if job_id is None else MultiSplitJob.objects.filter(job_id=job_id)
+    stale = jobs.filter(
+        Q(heartbeat_at__lt=now - timedelta(seconds=settings.MULTI_SPLIT_JOB_STALE_AFTER)) | Q(heartbeat_at__isnull=True),
+        status='processing',
+    )
+    retry_ids, fail_ids = [], []
+    for job in stale.only('job_id', 'attempts', 'upload_path'):
+        if job.attempts < settings.MULTI_SPLIT_JOB_MAX_ATTEMPTS and os.path.exists(job.upload_path):
+            retry_ids.append(job.job_id)
+        else:
+            fail_ids.append(job.job_id)
+    requeued = stale.filter(job_id__in=retry_ids).update(status='queued', heartbeat_at=None)
+    failed = stale.filter(job_id__in=fail_ids).update(
+        status='error',
+        error='The multi_split worker stopped while processing this file. Please upload it again.',
+    )
+    failed += jobs.filter(
+        status='queued',
+        created_at__lt=now - timedelta(seconds=settings.MULTI_SPLIT_JOB_QUEUE_TIMEOUT),
+    ).update(
+        status='error',
+        error='No multi_split worker picked up this file. Please upload it again without background processing.',
+    )
+    if requeued or failed:
+        logger.warning('multi_split jobs: %s stale job(s) requeued, %s failed', requeued, failed)
+    return requeued + failed
+
+
+def _render_multi_split_job(request, job_id):
+    """GET multi_split/?job=<id>: show a completed background job's results."""
+    form = IPDBFORM_MULTISPLIT()
+    job = MultiSplitJob.objects.filter(job_id=job_id, session_key=request.session.session_key or '').first()
+    if job is None:
+        return render(request, 'multi_split.html', {'form': form})
+    if job.status == 'error':
+        return render(request, 'multi_split.html', {'form': form, 'error_messages': [job.error], 'has_errors': True})
+    if job.status != 'completed':
+        return render(request, 'multi_split.html', {'form': form, 'job': _multi_split_job_to_dict(job)})
+
+    outcome = job.result
+    if not outcome['result_list']:
+        _add_no_results_error(form, outcome['file_format'])
+        return render(request, 'multi_split.html', {'form': form})
+    # Only the first view of a finished job replaces the session's current upload
+    if MultiSplitJob.objects.filter(pk=job.pk, session_applied=False).update(session_applied=True):
+        _apply_outcome_to_session(request.session, outcome)
+    return render(request, 'multi_split.html', _outcome_context(outcome))
+
+
 def multi_split(request):
     if request.method == 'POST':
         # File processing logic (supports both ITSR and VPN formats)
         form = IPDBFORM_MULTISPLIT(request.POST, request.FILES)
         if form.is_valid():
             uploaded_file = request.FILES['file']
+            if request.POST.get('async') == '1':
+                # Opt-in background mode: returns a job id to poll via api_multi_split_job_status
+                job = _enqueue_multi_split_job(request, uploaded_file)
+                return JsonResponse({
+                    'success': True,
+                    'job_id': job.job_id,
+                    'status_url': reverse('api_multi_split_job_status', args=[job.job_id]),
+                }, status=202)
             try:
                 wb = openpyxl.load_workbook(uploaded_file)
                 sheet = wb.active
 
-                # Auto-detect file format
-                file_format = _detect_file_format(sheet)
-                print(f"[DEBUG] Detected file format: {file_format}")
-
-                # Process based on detected format
-                if file_format == 'vpn':
-                    data = _process_vpn_file(sheet)
-                else:
-                    data = _process_itsr_file(sheet)
-
-                result_list = data['result_list']
-                detected_cloud = data['detected_cloud']
-                detected_sn = data['detected_sn']
-                detected_itsr = data.get('detected_itsr', False)
-                staff_number = data.get('staff_number', '')
-                ticket_title = (data.get('ticket_title') or '').strip()
-
                 # Opportunistically clean up old session files
                 _cleanup_old_session_files()
                 _cleanup_old_itsr_session_files()
 
                 # Generate a unique session ID for this file processing request
                 processing_session_id = str(uuid.uuid4())
-
-                # Clean up previous session files if they exist
-                old_sn_path = request.session.get('eoms_sn_file_path')
-                old_cloud_path = request.session.get('eoms_cloud_file_path')
-                old_itsr_path = request.session.get('itsr_file_path')
-                old_itsr_original = request.session.get('itsr_original_file_path')
-                if old_sn_path:
-                    _cleanup_session_file(old_sn_path)
-                if old_cloud_path:
-                    _cleanup_session_file(old_cloud_path)
-                if old_itsr_path:
-                    _cleanup_itsr_session_file(old_itsr_path)
-                if old_itsr_original:
-                    _cleanup_itsr_session_file(old_itsr_original)
-
-                # Write EOMS SN template (per-session unique file)
-                eoms_sn_path = None
-                if data['sn_sip_dic']:
-                    eoms_sn_path = _write_eoms_template(
-                        'sn',
-                        data['sn_source_name_dic'], data['sn_sip_dic'],
-                        data['sn_dest_name_dic'], data['sn_dip_dic'],
-                        data['sn_dport_dic'], data['sn_protocol_dic'],
-                        data['sn_requestor_dic'],
-                        session_id=processing_session_id
-                    )
-
-                # Write EOMS Cloud template (per-session unique file)
-                eoms_cloud_path = None
-                if data['cloud_sip_dic']:
-                    eoms_cloud_path = _write_eoms_template(
-                        'cloud',
-                        data['cloud_source_name_dic'], data['cloud_sip_dic'],
-                        data['cloud_dest_name_dic'], data['cloud_dip_dic'],
-                        data['cloud_dport_dic'], data['cloud_protocol_dic'],
-                        data['cloud_requestor_dic'],
-                        session_id=processing_session_id
-                    )
-
-                # Write ITSR template (per-session unique file)
-                itsr_path = None
-                itsr_original_path = None
-                if data['itsr_sip_dic']:
-                    itsr_path = _write_itsr_template(
-                        data['itsr_source_name_dic'], data['itsr_sip_dic'],
-                        data['itsr_dest_name_dic'], data['itsr_dip_dic'],
-                        data['itsr_dport_dic'], data['itsr_protocol_dic'],
-                        data['itsr_requestor_dic'],
-                        session_id=processing_session_id
-                    )
-                    # Keep consolidated workbook as second ITSR attachment for VPN-origin tickets.
-                    if file_format == 'vpn':
-                        itsr_original_path = _save_vpn_consolidated_upload(
-                            sheet,
-                            data.get('consolidated_rows', []),
-                            processing_session_id,
-                            uploaded_file.name,
-                        )
+                outcome = _process_upload(sheet, uploaded_file.name, processing_session_id)
 
                 # Check if we got any results
-                if result_list:
-                    # Process the result list to separate errors from other messages
-                    error_messages = []
-                    
-                    for message in result_list:
-                        # More specific error detection to avoid false positives
-                        if message and any(keyword in message.lower() for keyword in ['failed:', 'traceback:', 'validation failed', 'connection failed', 'error:']):
-                            error_messages.append(message)
-                    
-                    # Store results in session for ticket creation redirect
-                    request.session['last_result_list'] = result_list
-                    request.session['last_error_messages'] = error_messages
-                    request.session['last_has_errors'] = len(error_messages) > 0
-                    request.session['last_show_cloud_button'] = detected_cloud
-                    request.session['last_show_sn_button'] = detected_sn
-                    request.session['last_show_itsr_button'] = detected_itsr
-                    request.session['last_file_format'] = file_format
-                    # Store first requestor for each department
-                    request.session['last_cloud_requestor'] = data['cloud_requestor_dic'].get(4, '') if data['cloud_requestor_dic'] else ''
-                    request.session['last_sn_requestor'] = data['sn_requestor_dic'].get(4, '') if data['sn_requestor_dic'] else ''
-                    # Store staff number (from VPN files)
-                    request.session['last_staff_number'] = staff_number
-                    request.session['last_ticket_title'] = ticket_title
-                    # Store per-session unique file paths for ticket creation
-                    request.session['eoms_cloud_file_path'] = eoms_cloud_path
-                    request.session['eoms_sn_file_path'] = eoms_sn_path
-                    request.session['itsr_file_path'] = itsr_path
-                    if itsr_original_path:
-                        request.session['itsr_original_file_path'] = itsr_original_path
-                    else:
-                        request.session.pop('itsr_original_file_path', None)
-                    # Clear previous ticket creation state when processing new file
-                    request.session.pop('ticket_cloud_created', None)
-                    request.session.pop('ticket_sn_created', None)
-                    request.session.pop('ticket_itsr_created', None)
-                    request.session.pop('itsr_create_session_id', None)
-                    request.session.save()
-                    
-                    # Return results with error messages and department detection
-                    return render(request, 'multi_split.html', {
-                        'result_list': result_list,
-                        'error_messages': error_messages,
-                        'has_errors': len(error_messages) > 0,
-                        'show_cloud_button': detected_cloud,
-                        'show_sn_button': detected_sn,
-                        'show_itsr_button': detected_itsr,
-                        'cloud_ticket_created': False,
-                        'sn_ticket_created': False,
-                        'itsr_ticket_created': False,
-                        'staff_number': staff_number,
-                        'file_format': file_format,
-                    })
+                if outcome['result_list']:
+                    _apply_outcome_to_session(request.session, outcome)
+                    return render(request, 'multi_split.html', _outcome_context(outcome))
                 else:
-                    # No results found — form.file.errors is rendered in the upload card (see multi_split.html)
-                    if file_format == 'vpn':
-                        form.add_error(
-                            'file',
-                            'No valid data found in the VPN Excel file. Please check that your file has '
-                            'Destination IP in column B, Description in column C, Protocol in column D, '
-                            'Port in column E and Staff Number in column G '
-                            'starting from row 4.',
-                        )
-                    else:
-                        form.add_error(
-                            'file',
-                            'No valid data found in the Excel file. Please check that your file has data in '
-                            'columns C–G (source IP, destination IP, port, protocol, staff) starting from row 4, '
-                            'and optional Ticket Title in the last column.',
-                        )
+                    _add_no_results_error(form, outcome['file_format'])
                     return render(request, 'multi_split.html', {'form': form})
             
             except Exception as e:
@@ -1168,12 +1560,26 @@ def multi_split(request):
             # Form is not valid, render with errors
             return render(request, 'multi_split.html', {'form': form})
     else:
+        if request.GET.get('job'):
+            return _render_multi_split_job(request, request.GET['job'])
         # GET request - always show empty form for fresh uploads
         # Results will be shown after POST file processing
         form = IPDBFORM_MULTISPLIT()
         return render(request, 'multi_split.html', {'form': form})
 
 
+@require_GET
+def api_multi_split_job_status(request, job_id):
+    """
+    Poll a background multi_split job: rows processed so far and partial results (DB-backed).
+    """
+    sweep_multi_split_jobs(job_id)
+    job = MultiSplitJob.objects.filter(job_id=job_id, session_key=request.session.session_key or '').first()
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
+    return JsonResponse({'success': True, 'job': _multi_split_job_to_dict(job)})
+
+
 # ============================================================
 # AJAX API Endpoints for ticket creation with background processing
 # ============================================================
@@ -1188,14 +1594,20 @@ def _run_ticket_creation(
     password,
     captcha_code,
     resume_token,
+    queued=False,
 ):
-    """Background worker: Playwright EOMS create (runs in a daemon thread)."""
+    """
+    Background worker: Playwright EOMS create (runs on the browser pool loop).
+
+    Called from a daemon thread, or by run_eoms_ticket_task for queued tasks
+    (``queued=True``), whose unexpected errors are retried per the queue policy.
+    """
     from django.db import close_old_connections
 
     close_old_connections()
     try:
         excel_title = _session_get_ticket_title(django_session_key)
-        result = asyncio.run(
+        result = eoms_browser_pool.run_sync(
             create_ticket(
                 target_department=target_department,
                 file_path=file_path,
@@ -1205,11 +1617,13 @@ def _run_ticket_creation(
                 captcha_code=captcha_code or '',
                 resume_token=resume_token or '',
                 title=excel_title or None,
+                on_workflow_start=_workflow_sent_recorder(task_id),
             )
         )
 
         if result.get('need_captcha'):
-            EomsTicketCreationTask.objects.filter(task_id=task_id).update(
+            eoms_task_queue.update_task(
+                task_id,
                 status='need_captcha',
                 success=False,
                 need_captcha=True,
@@ -1220,7 +1634,8 @@ def _run_ticket_creation(
             return
 
         if result.get('success'):
-            EomsTicketCreationTask.objects.filter(task_id=task_id).update(
+            eoms_task_queue.update_task(
+                task_id,
                 status='completed',
                 success=True,
                 need_captcha=False,
@@ -1232,7 +1647,8 @@ def _run_ticket_creation(
             # Same as error/captcha paths: release cooldown so another EOMS (e.g. after ITSR) is not blocked
             _eoms_clear_session_cooldown(django_session_key, target_department)
         else:
-            EomsTicketCreationTask.objects.filter(task_id=task_id).update(
+            eoms_task_queue.update_task(
+                task_id,
                 status='error',
                 success=False,
                 need_captcha=False,
@@ -1241,17 +1657,181 @@ def _run_ticket_creation(
             _eoms_clear_session_cooldown(django_session_key, target_department)
     except Exception as e:
         logger.exception('EOMS background task %s failed', task_id)
-        EomsTicketCreationTask.objects.filter(task_id=task_id).update(
+        if queued and eoms_task_queue.schedule_retry(task_id, e):
+            return
+        eoms_task_queue.update_task(
+            task_id,
             status='error',
             success=False,
             need_captcha=False,
-            error=str(e),
+            error=_eoms_failure_message(task_id, e),
         )
         _eoms_clear_session_cooldown(django_session_key, target_department)
     finally:
         close_old_connections()
 
 
+def _workflow_sent_recorder(task_id):
+    """on_workflow_start callback: note the department in the task row before its startWorkflow goes out."""
+    from asgiref.sync import sync_to_async
+
+    record = sync_to_async(eoms_task_queue.mark_workflow_sent)
+
+    async def on_workflow_start(department):
+        await record(task_id, department)
+
+    return on_workflow_start
+
+
+def _eoms_failure_message(task_id, error):
+    """Error text for a run that raised; warns when EOMS may already have the ticket."""
+    try:
+        sent = eoms_task_queue.workflow_was_sent(task_id)
+    except Exception:
+        sent = True
+    if sent:
+        return f'{error} - the ticket may already have been created. Check EOMS before submitting again.'
+    return str(error)
+
+
+def _run_combined_ticket_creation(
+    task_id,
+    targets,
+    django_session_key,
+    username,
+    password,
+    captcha_code,
+    resume_token,
+    queued=False,
+):
+    """
+    Background worker for a combined Cloud+SN task: one EOMS login, both workflows started concurrently.
+
+    ``targets`` maps department -> {'file_path', 'requestor'}; each department's
+    outcome goes into ``department_results`` of the single task row.
+    """
+    from django.db import close_old_connections
+
+    close_old_connections()
+    departments = list(targets)
+    try:
+        excel_title = _session_get_ticket_title(django_session_key)
+        results = eoms_browser_pool.run_sync(
+            create_tickets(
+                [
+                    {
+                        'target_department': department,
+                        'file_path': target['file_path'],
+                        'originator': target.get('requestor') or None,
+                        'title': excel_title or None,
+                    }
+                    for department, target in targets.items()
+                ],
+                username=username,
+                password=password,
+                captcha_code=captcha_code or '',
+                resume_token=resume_token or '',
+                on_workflow_start=_workflow_sent_recorder(task_id),
+            )
+        )
+
+        department_results = {}
+        for department in departments:
+            result = results.get(department) or {'success': False, 'error': 'No result from EOMS'}
+            if result.get('need_captcha'):
+                status = 'need_captcha'
+            elif result.get('success'):
+                status = 'completed'
+                _cleanup_session_file(targets[department]['file_path'])
+            else:
+                status = 'error'
+            department_results[department] = {
+                'file_path': targets[department]['file_path'],
+                'requestor': targets[department].get('requestor') or '',
+                'status': status,
+                'success': bool(result.get('success')),
+                'inst_id': str(result.get('inst_id') or ''),
+                'message': result.get('message') or '',
+                'error': '' if result.get('success') else (result.get('error') or result.get('message') or 'Ticket creation failed'),
+                'resume_token': result.get('resume_token') or '',
+            }
+
+        captcha = next((department_results[d] for d in departments if department_results[d]['status'] == 'need_captcha'), None)
+        created = [d for d in departments if department_results[d]['success']]
+        if captcha:
+            eoms_task_queue.update_task(
+                task_id,
+                status='need_captcha',
+                success=False,
+                need_captcha=True,
+                error=captcha['error'] or 'Captcha required',
+                cas_resume_token=captcha['resume_token'],
+                department_results=department_results,
+            )
+        else:
+            failed = [d for d in departments if d not in created]
+            eoms_task_queue.update_task(
+                task_id,
+                status='error' if failed else 'completed',
+                success=not failed,
+                need_captcha=False,
+                inst_id=', '.join(department_results[d]['inst_id'] for d in created),
+                message='; '.join(f"{d}: {department_results[d]['message']}" for d in created),
+                error='; '.join(f"{d}: {department_results[d]['error']}" for d in failed),
+                department_results=department_results,
+            )
+    except Exception as e:
+        logger.exception('EOMS combined background task %s failed', task_id)
+        if queued and eoms_task_queue.schedule_retry(task_id, e):
+            return
+        eoms_task_queue.update_task(
+            task_id,
+            status='error',
+            success=False,
+            need_captcha=False,
+            error=_eoms_failure_message(task_id, e),
+        )
+    finally:
+        for department in departments:
+            _eoms_clear_session_cooldown(django_session_key, department)
+        close_old_connections()
+
+
+def run_eoms_ticket_task(task_id):
+    """Worker side: run one claimed EomsTicketCreationTask (see manage.py run_eoms_ticket_worker)."""
+    task = EomsTicketCreationTask.objects.filter(task_id=task_id).first()
+    if task is None:
+        return
+    credentials = eoms_task_queue.load_credentials(task_id)
+    if not credentials:
+        eoms_task_queue.update_task(
+            task_id,
+            status='error',
+            success=False,
+            error='The queued request expired before it could run. Please submit it again.',
+        )
+        for department in task.department_results or [task.department]:
+            _eoms_clear_session_cooldown(task.session_key, department)
+        return
+    if task.department_results:
+        target, args = _run_combined_ticket_creation, (task_id, task.department_results)
+    else:
+        target, args = _run_ticket_creation, (task_id, task.department, task.file_path, task.requestor)
+    try:
+        target(
+            *args,
+            task.session_key,
+            credentials['username'],
+            credentials['password'],
+            credentials['captcha_code'],
+            credentials['resume_token'],
+            queued=True,
+        )
+    finally:
+        if not EomsTicketCreationTask.objects.filter(task_id=task_id, status='queued').exists():
+            eoms_task_queue.clear_credentials(task_id)
+
+
 def _parse_eoms_create_payload(request):
     """Support JSON (modal) and form POST (legacy)."""
     ct = (request.content_type or '').lower()
@@ -1266,7 +1846,8 @@ def _parse_eoms_create_payload(request):
 @require_POST
 def api_create_eoms_ticket(request):
     """
-    Start EOMS ticket creation in a background thread; returns task_id for polling.
+    Queue EOMS ticket creation (or, with EOMS_TASK_QUEUE off, start a background thread);
+    returns task_id for polling.
 
     JSON body (preferred):
         username, password, target_department ("Cloud" | "SN"),
@@ -1287,16 +1868,23 @@ def api_create_eoms_ticket(request):
         )
 
 
-def _api_create_eoms_ticket_impl(request):
+def _api_create_eoms_ticket_impl(request, combined=False):
     data = _parse_eoms_create_payload(request)
-    target_department = (data.get('target_department') or '').strip()
     username = (data.get('username') or '').strip()
     password = (data.get('password') or '').strip()
     captcha_code = (data.get('captcha_code') or '').strip()
     resume_token = (data.get('resume_token') or '').strip()
 
-    if target_department not in ['Cloud', 'SN']:
-        return JsonResponse({'success': False, 'error': 'Invalid department'}, status=400)
+    if combined:
+        # Departments whose ticket was already created (e.g. by an earlier partial run) are skipped
+        departments = [d for d in ('Cloud', 'SN') if not request.session.get(f'ticket_{d.lower()}_created')]
+        if not departments:
+            return JsonResponse({'success': False, 'error': 'Both EOMS tickets have already been created.'}, status=400)
+    else:
+        target_department = (data.get('target_department') or '').strip()
+        if target_department not in ['Cloud', 'SN']:
+            return JsonResponse({'success': False, 'error': 'Invalid department'}, status=400)
+        departments = [target_department]
 
     if not username or not password:
         return JsonResponse(
@@ -1304,57 +1892,90 @@ def _api_create_eoms_ticket_impl(request):
             status=400,
         )
 
-    cooldown_key = f'ticket_creation_{target_department.lower()}_timestamp'
-    last_creation_time = request.session.get(cooldown_key, 0)
     current_time = time.time()
     cooldown_seconds = 30
+    for department in departments:
+        cooldown_key = f'ticket_creation_{department.lower()}_timestamp'
+        last_creation_time = request.session.get(cooldown_key, 0)
+        elapsed = current_time - last_creation_time
+        if elapsed < cooldown_seconds:
+            # ceil avoids "wait 0 seconds" when e.g. 29.9s elapsed (int() would truncate to 0)
+            remaining_time = max(1, int(math.ceil(cooldown_seconds - elapsed)))
+            return JsonResponse({
+                'success': False,
+                'error': f'Please wait {remaining_time} seconds before creating another ticket.',
+                'cooldown': True,
+                'remaining': remaining_time,
+            })
 
-    elapsed = current_time - last_creation_time
-    if elapsed < cooldown_seconds:
-        # ceil avoids "wait 0 seconds" when e.g. 29.9s elapsed (int() would truncate to 0)
-        remaining_time = max(1, int(math.ceil(cooldown_seconds - elapsed)))
-        return JsonResponse({
-            'success': False,
-            'error': f'Please wait {remaining_time} seconds before creating another ticket.',
-            'cooldown': True,
-            'remaining': remaining_time,
-        })
-
-    request.session[cooldown_key] = current_time
+    for department in departments:
+        request.session[f'ticket_creation_{department.lower()}_timestamp'] = current_time
     request.session.save()
 
-    if target_department == 'Cloud':
-        file_path = request.session.get('eoms_cloud_file_path')
-        requestor = request.session.get('last_cloud_requestor', '')
-    else:
-        file_path = request.session.get('eoms_sn_file_path')
-        requestor = request.session.get('last_sn_requestor', '')
+    targets = {}
+    for department in departments:
+        if department == 'Cloud':
+            file_path = request.session.get('eoms_cloud_file_path')
+            requestor = request.session.get('last_cloud_requestor', '')
+        else:
+            file_path = request.session.get('eoms_sn_file_path')
+            requestor = request.session.get('last_sn_requestor', '')
 
-    if not file_path or not os.path.exists(file_path):
-        request.session.pop(cooldown_key, None)
-        request.session.save()
-        return JsonResponse({
-            'success': False,
-            'error': 'Session expired or file not found. Please re-upload and process the file.',
-        }, status=400)
+        if not file_path or not os.path.exists(file_path):
+            for d in departments:
+                request.session.pop(f'ticket_creation_{d.lower()}_timestamp', None)
+            request.session.save()
+            return JsonResponse({
+                'success': False,
+                'error': 'Session expired or file not found. Please re-upload and process the file.',
+            }, status=400)
+        targets[department] = {'file_path': file_path, 'requestor': requestor or ''}
 
     task_id = str(uuid.uuid4())
+    django_session_key = getattr(request.session, 'session_key', None) or ''
+    if combined:
+        department_label = '+'.join(departments)
+        file_path, requestor = '', ', '.join(t['requestor'] for t in targets.values() if t['requestor'])
+        department_results = targets
+    else:
+        department_label = departments[0]
+        file_path, requestor = targets[department_label]['file_path'], targets[department_label]['requestor']
+        department_results = {}
+
+    if eoms_task_queue.enabled() and eoms_task_queue.enqueue(
+        task_id,
+        department_label,
+        requestor,
+        file_path,
+        django_session_key,
+        department_results=department_results,
+        username=username,
+        password=password,
+        captcha_code=captcha_code,
+        resume_token=resume_token,
+    ):
+        return JsonResponse({
+            'success': True,
+            'task_id': task_id,
+            'message': 'Ticket creation queued',
+        })
+
     EomsTicketCreationTask.objects.create(
         task_id=task_id,
         status='processing',
-        department=target_department,
-        requestor=requestor or '',
+        department=department_label,
+        requestor=requestor,
+        department_results=department_results,
     )
+    eoms_task_queue.bump_version(task_id)
 
-    django_session_key = getattr(request.session, 'session_key', None) or ''
-
+    if combined:
+        target, args = _run_combined_ticket_creation, (task_id, targets)
+    else:
+        target, args = _run_ticket_creation, (task_id, department_label, file_path, requestor)
     thread = threading.Thread(
-        target=_run_ticket_creation,
-        args=(
-            task_id,
-            target_department,
-            file_path,
-            requestor,
+        target=target,
+        args=args + (
             django_session_key,
             username,
             password,
@@ -1372,31 +1993,82 @@ def _api_create_eoms_ticket_impl(request):
     })
 
 
-@require_GET
-def api_check_ticket_status(request, task_id):
+@require_POST
+def api_create_eoms_ticket_combined(request):
     """
-    Poll background EOMS task status (DB-backed — safe across Gunicorn workers).
+    Create the Cloud and SN tickets in one task: one EOMS login / defId lookup,
+    both workflows started concurrently. Same body and polling as api_create_eoms_ticket
+    (without target_department); per-department status is in task.departments.
     """
     try:
-        try:
-            row = EomsTicketCreationTask.objects.get(task_id=task_id)
-        except EomsTicketCreationTask.DoesNotExist:
-            return JsonResponse({'success': False, 'error': 'Task not found'}, status=404)
+        return _api_create_eoms_ticket_impl(request, combined=True)
+    except Exception:
+        logger.exception('api_create_eoms_ticket_combined failed')
+        return JsonResponse(
+            {
+                'success': False,
+                'error': 'An unexpected server error occurred. Refresh the page and try again, or check server logs.',
+            },
+            status=500,
+        )
+
+
+def _long_poll_wait(request):
+    """Seconds a status request may be held (``?wait=``, capped by EOMS_STATUS_LONG_POLL_MAX); 0 answers at once."""
+    try:
+        wait = float(request.GET.get('wait') or 0)
+    except ValueError:
+        return 0
+    return max(0, min(wait, settings.EOMS_STATUS_LONG_POLL_MAX))
 
-        task = _eoms_task_row_to_dict(row)
 
-        if row.status == 'completed' and row.success:
-            dept_lower = row.department.lower()
+def _ticket_status_response(request, task_id, version):
+    """Read the task row once and mark the session's created departments (sync part of api_check_ticket_status)."""
+    try:
+        row = EomsTicketCreationTask.objects.get(task_id=task_id)
+    except EomsTicketCreationTask.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Task not found'}, status=404)
+
+    task = _eoms_task_row_to_dict(row)
+
+    if row.department_results:
+        created = [d for d, entry in row.department_results.items() if entry.get('success')]
+    else:
+        created = [row.department] if row.status == 'completed' and row.success else []
+    if created:
+        for department in created:
+            dept_lower = department.lower()
             request.session[f'ticket_{dept_lower}_created'] = True
             file_key = f'eoms_{dept_lower}_file_path'
             request.session.pop(file_key, None)
-            request.session.modified = True
-            request.session.save()
+        request.session.modified = True
+        request.session.save()
 
-        return JsonResponse({
-            'success': True,
-            'task': task,
-        })
+    return JsonResponse({
+        'success': True,
+        'task': task,
+        'version': version,
+    })
+
+
+@require_GET
+async def api_check_ticket_status(request, task_id):
+    """
+    Poll background EOMS task status (DB-backed — safe across Gunicorn workers).
+
+    Long-poll: with ``?wait=<s>&version=<v>`` (``version`` from the previous
+    answer) the request is held until the task's status version changes or
+    ``wait`` seconds pass, so the page needs no timer of its own.  The view
+    is async so a held request waits on the event loop instead of a worker
+    thread; the row and session are still read through sync_to_async.
+    """
+    from asgiref.sync import sync_to_async
+
+    try:
+        since = request.GET.get('version')
+        wait = _long_poll_wait(request) if since else 0
+        version = await eoms_task_queue.wait_for_change(task_id, since, wait)
+        return await sync_to_async(_ticket_status_response)(request, task_id, version)
     except Exception as e:
         logger.exception('api_check_ticket_status failed for task_id=%s', task_id)
         return JsonResponse(
@@ -1458,7 +2130,7 @@ def api_create_eoms_ticket_v2(request):
             }, status=400)
 
         excel_title = (request.session.get('last_ticket_title') or '').strip()
-        result = asyncio.run(create_ticket(
+        result = eoms_browser_pool.run_sync(create_ticket(
             target_department=target_department,
             file_path=file_path,
             username=username,
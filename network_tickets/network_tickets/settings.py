@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -234,4 +235,78 @@ ELASTIC_INDEX_PATTERN = os.getenv("ELASTIC_INDEX_PATTERN", "cisco-logs-*,panw-lo
 ELASTIC_MAX_RESULTS = int(os.getenv("ELASTIC_MAX_RESULTS", "200"))
 
 # Internal bearer token for machine-to-machine API calls (e.g. OpenClaw exec)
-OPENCLAW_INTERNAL_TOKEN = os.getenv("OPENCLAW_INTERNAL_TOKEN", "")
\ No newline at end of file
+OPENCLAW_INTERNAL_TOKEN = os.getenv("OPENCLAW_INTERNAL_TOKEN", "")
+# ---------------------------------------------------------------------------
+# Palo Alto firewall automation (auto_tickets_pa)
+# ---------------------------------------------------------------------------
+PA_FIREWALL_HOST = os.getenv("PA_FIREWALL_HOST", "10.254.0.14")
+PA_FIREWALL_PORT = int(os.getenv("PA_FIREWALL_PORT", "22"))
+PA_VIRTUAL_ROUTER = os.getenv("PA_VIRTUAL_ROUTER", "vr_vsys1")
+# IP -> egress interface and interface -> zone results are reused across runs for this long (seconds)
+PA_ZONE_CACHE_TTL = int(os.getenv("PA_ZONE_CACHE_TTL", "3600"))
+# Each run's FIB / interface-zone snapshot is saved here for offline replay (empty, the default: do not save);
+# only the newest PA_FIB_SNAPSHOT_KEEP snapshot files are kept
+PA_FIB_SNAPSHOT_DIR = os.getenv("PA_FIB_SNAPSHOT_DIR", "")
+PA_FIB_SNAPSHOT_KEEP = int(os.getenv("PA_FIB_SNAPSHOT_KEEP", "20"))
+# Planned address / group / service / rule commands are pushed in send_config_set batches of this size
+PA_CONFIG_BATCH_SIZE = int(os.getenv("PA_CONFIG_BATCH_SIZE", "200"))
+# validate / commit job polling: first check after PA_JOB_POLL_INITIAL s, doubling up to PA_JOB_POLL_MAX s
+PA_JOB_POLL_INITIAL = int(os.getenv("PA_JOB_POLL_INITIAL", "3"))
+PA_JOB_POLL_MAX = int(os.getenv("PA_JOB_POLL_MAX", "60"))
+PA_JOB_TIMEOUT = int(os.getenv("PA_JOB_TIMEOUT", "1800"))
+# A background validate / commit with no progress for this long (its web worker died) is marked failed
+PA_COMMIT_JOB_STALE_AFTER = int(os.getenv("PA_COMMIT_JOB_STALE_AFTER", "300"))
+# Pooled PA SSH sessions (per credential): size, idle close and wait-for-free-session timeouts (seconds)
+PA_SESSION_POOL_SIZE = int(os.getenv("PA_SESSION_POOL_SIZE", "2"))
+PA_SESSION_IDLE_TIMEOUT = int(os.getenv("PA_SESSION_IDLE_TIMEOUT", "300"))
+PA_SESSION_ACQUIRE_TIMEOUT = int(os.getenv("PA_SESSION_ACQUIRE_TIMEOUT", "120"))
+# NAT lookups keep at most this many individual session records (counts cover all of them)
+PA_NAT_RESULT_LIMIT = int(os.getenv("PA_NAT_RESULT_LIMIT", "200"))
+# auto_tickets_pa run log: one file shared by all workers (rotated by logrotate, not by Django),
+# last N lines kept in memory for the result page
+PA_LOG_DIR = os.getenv("PA_LOG_DIR", "/it_network/network_tickets/logs")
+PA_LOG_CAPTURE_LINES = int(os.getenv("PA_LOG_CAPTURE_LINES", "2000"))
+# Forward netmiko's DEBUG logging / write a raw SSH transcript (both cost I/O per command; off by default)
+PA_NETMIKO_DEBUG = os.getenv("PA_NETMIKO_DEBUG", "0") == "1"
+PA_NETMIKO_SESSION_LOG = os.getenv("PA_NETMIKO_SESSION_LOG", "")
+
+# multi_split uploads posted with async=1 (manage.py run_multi_split_worker): a processing job whose worker
+# heartbeat stopped for STALE_AFTER s is queued again, up to MAX_ATTEMPTS runs, then failed; a job no worker
+# claimed within QUEUE_TIMEOUT s fails (no worker running)
+MULTI_SPLIT_JOB_STALE_AFTER = int(os.getenv("MULTI_SPLIT_JOB_STALE_AFTER", "300"))
+MULTI_SPLIT_JOB_MAX_ATTEMPTS = int(os.getenv("MULTI_SPLIT_JOB_MAX_ATTEMPTS", "2"))
+MULTI_SPLIT_JOB_QUEUE_TIMEOUT = int(os.getenv("MULTI_SPLIT_JOB_QUEUE_TIMEOUT", "600"))
+
+# ---------------------------------------------------------------------------
+# EOMS automation (Playwright)
+# ---------------------------------------------------------------------------
+# Warm headless Chromium per process (0 disables pooling); a browser is relaunched after N leases
+EOMS_BROWSER_POOL_SIZE = int(os.getenv("EOMS_BROWSER_POOL_SIZE", "2"))
+EOMS_BROWSER_MAX_USES = int(os.getenv("EOMS_BROWSER_MAX_USES", "50"))
+EOMS_BROWSER_ACQUIRE_TIMEOUT = int(os.getenv("EOMS_BROWSER_ACQUIRE_TIMEOUT", "300"))
+# Logged-in CAS sessions / SMS resume state shared through the default cache (Redis): TTLs in seconds.
+# Without REDIS_URL they are kept as files in EOMS_SESSION_DIR, shared by the workers on this host.
+# A session older than EOMS_SESSION_REFRESH_AFTER is refreshed by its next user before it expires.
+EOMS_SESSION_DIR = os.getenv("EOMS_SESSION_DIR", os.path.join(tempfile.gettempdir(), "eoms_sessions"))
+EOMS_SESSION_TTL = int(os.getenv("EOMS_SESSION_TTL", str(25 * 60)))
+EOMS_SESSION_REFRESH_AFTER = int(os.getenv("EOMS_SESSION_REFRESH_AFTER", str(18 * 60)))
+EOMS_RESUME_TTL = int(os.getenv("EOMS_RESUME_TTL", "900"))
+# Per-user single-flight CAS login lock: held at most LOCK_TIMEOUT s, others wait up to LOCK_WAIT s
+EOMS_LOGIN_LOCK_TIMEOUT = int(os.getenv("EOMS_LOGIN_LOCK_TIMEOUT", "180"))
+EOMS_LOGIN_LOCK_WAIT = int(os.getenv("EOMS_LOGIN_LOCK_WAIT", "120"))
+# 1: api_create_eoms_ticket only queues the task and manage.py run_eoms_ticket_worker runs it.
+# Deploy that worker (systemd / supervisor, next to Gunicorn) and set REDIS_URL before turning this on;
+# with a per-process cache or no live worker heartbeat the view keeps creating tickets in-process.
+EOMS_TASK_QUEUE = os.getenv("EOMS_TASK_QUEUE", "0") == "1"
+# A run that raised before any startWorkflow was sent is retried after RETRY_DELAY s (doubling) up to
+# MAX_ATTEMPTS runs in total; a task whose worker heartbeat stopped for STALE_AFTER s (dead worker) is
+# queued again on the same terms, otherwise failed with "check EOMS"
+EOMS_TASK_MAX_ATTEMPTS = int(os.getenv("EOMS_TASK_MAX_ATTEMPTS", "3"))
+EOMS_TASK_RETRY_DELAY = int(os.getenv("EOMS_TASK_RETRY_DELAY", "15"))
+EOMS_TASK_STALE_AFTER = int(os.getenv("EOMS_TASK_STALE_AFTER", "900"))
+# Queued tasks keep their EOMS credentials in the cache (never the DB) for at most this long
+EOMS_TASK_CREDENTIALS_TTL = int(os.getenv("EOMS_TASK_CREDENTIALS_TTL", "3600"))
+# api_check_ticket_status long-poll: a request with ?wait= is held at most
+# LONG_POLL_MAX s until the task's status changes (0: answer at once); the EOMS wait re-reads the cache every POLL_INTERVAL s
+EOMS_STATUS_LONG_POLL_MAX = int(os.getenv("EOMS_STATUS_LONG_POLL_MAX", "25"))
+EOMS_STATUS_POLL_INTERVAL = float(os.getenv("EOMS_STATUS_POLL_INTERVAL", "0.5"))
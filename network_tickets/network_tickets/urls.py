@@ -25,7 +25,7 @@ from auto_tickets.views.qyt_department_addstudent import single_split
 from auto_tickets.views.multi_split import (
     multi_split, api_create_eoms_ticket, api_check_ticket_status,
     api_create_itsr_ticket, api_submit_itsr_sms, api_check_itsr_create_status,
-    api_create_eoms_ticket_v2,
+    api_create_eoms_ticket_v2, api_multi_split_job_status, api_create_eoms_ticket_combined,
 )
 from auto_tickets.views.download_ITSRsample import download_ITSRsample
 from auto_tickets.views.ip_application import ip_application
@@ -33,7 +33,7 @@ from auto_tickets.views.ip_deletion import ip_deletion
 from auto_tickets.views.login import login_view, logout_view
 from auto_tickets.views.get_pa_nat import get_pa_nat
 from auto_tickets.views.ip_owner_query import ip_owner_query
-from auto_tickets.views.auto_tickets_pa import auto_tickets_pa
+from auto_tickets.views.auto_tickets_pa import auto_tickets_pa, api_pa_commit_job_status
 from auto_tickets.views.auto_vpnnet import auto_vpnnet
 from auto_tickets.views.ticket_management import ticket_management
 from auto_tickets.views.ticket_detail_search import ticket_detail_search
@@ -69,8 +69,10 @@ urlpatterns = [
     path('ip_deletion/', ip_deletion, name='ip_deletion'),
     path('single_split/', single_split, name='single_split'),
     path('multi_split/', multi_split, name='multi_split'),
+    path('api/multi_split_job/<str:job_id>/', api_multi_split_job_status, name='api_multi_split_job_status'),
     path('api/create_eoms_ticket/', api_create_eoms_ticket, name='api_create_eoms_ticket'),
     path('api/create_eoms_ticket_v2/', api_create_eoms_ticket_v2, name='api_create_eoms_ticket_v2'),
+    path('api/create_eoms_ticket_combined/', api_create_eoms_ticket_combined, name='api_create_eoms_ticket_combined'),
     path('api/check_ticket_status/<str:task_id>/', api_check_ticket_status, name='api_check_ticket_status'),
     # ITSR Create API endpoints
     path('api/create_itsr_ticket/', api_create_itsr_ticket, name='api_create_itsr_ticket'),
@@ -82,6 +84,7 @@ urlpatterns = [
     path('get_pa_nat/', get_pa_nat, name='get_pa_nat'),
     path('ip_owner_query/', ip_owner_query, name='ip_owner_query'),
     path('auto_tickets_pa/', auto_tickets_pa, name='auto_tickets_pa'),
+    path('api/pa_commit_job/<str:job_id>/', api_pa_commit_job_status, name='api_pa_commit_job_status'),
     path('auto_vpnnet/', auto_vpnnet, name='auto_vpnnet'),
     path('ticket_management/', ticket_management, name='ticket_management'),
     path('ticket_detail_search/', ticket_detail_search, name='ticket_detail_search'),